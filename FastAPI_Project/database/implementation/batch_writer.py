@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+
+from mysql.connector import Error
+
+BATCH_SIZE = int(os.getenv("DB_BATCH_SIZE", 500))
+FLUSH_INTERVAL = float(os.getenv("DB_FLUSH_INTERVAL", 5))
+
+
+class BatchWriter:
+    """
+    Accumulate the rows of one parameterized INSERT and write them with
+    `executemany`, committing once per batch.
+
+    A batch is written when it holds `batch_size` rows, when a row is added
+    more than `flush_interval` seconds after the last write, and on `flush`
+    or `close`. Use it as a context manager so the last batch is written.
+    The interval is only checked by `add`: nothing writes in the background,
+    since the connection is shared with the caller, so a producer that goes
+    quiet should call `flush` itself.
+
+    If a batch fails (e.g. one row breaks a unique index), it is rolled back
+    and its rows are written one by one, so only the offending rows are lost.
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+    query : str
+        The INSERT query, with one %s placeholder per column.
+    batch_size : int, optional
+        The number of rows per write.
+    flush_interval : float, optional
+        The longest time in seconds rows wait for a full batch.
+    """
+
+    def __init__(self, connection, query, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.connection = connection
+        self.query = query
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows = []
+        self.written = 0
+        self.failed = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, row):
+        """
+        Queue a row, writing the batch if it is full or overdue.
+
+        Parameters
+        ----------
+        row : tuple
+            The values of the query placeholders.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self.rows.append(row)
+            if len(self.rows) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def flush(self):
+        """
+        Write the queued rows.
+
+        Returns
+        -------
+        int
+            The number of rows written.
+        """
+        with self._lock:
+            return self._flush()
+
+    def _flush(self):
+        rows, self.rows = self.rows, []
+        self._last_flush = time.monotonic()
+        if not rows:
+            return 0
+        cursor = self.connection.cursor()
+        try:
+            cursor.executemany(self.query, rows)
+            self.connection.commit()
+        except Error as e:
+            self.connection.rollback()
+            print(f"The error '{e}' occurred, writing the {len(rows)} rows one by one")
+            return self._write_rows(cursor, rows)
+        finally:
+            cursor.close()
+        self.written += len(rows)
+        return len(rows)
+
+    def _write_rows(self, cursor, rows):
+        written = 0
+        for row in rows:
+            try:
+                cursor.execute(self.query, row)
+                self.connection.commit()
+            except Error as e:
+                self.connection.rollback()
+                self.failed += 1
+                print(f"The error '{e}' occurred, the row was not written")
+                continue
+            written += 1
+        self.written += written
+        return written
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
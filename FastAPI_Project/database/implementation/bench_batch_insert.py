@@ -0,0 +1,152 @@
+"""
+Rows per second inserted into a news-shaped table by the write patterns of
+these scripts: a new connection and a commit per row (scrape_and_insert_news
+before the pool), one connection with a commit per row (execute_query), and
+BatchWriter at several batch sizes.
+
+Runs against a SQLite file standing in for MySQL by default, or against the
+database of the .env file with --mysql (a bench_news table is created and
+dropped).
+
+    python bench_batch_insert.py --rows 5000 --batch-size 100 500 1000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import time
+
+from batch_writer import BatchWriter
+from news_insert import execute_query
+
+CREATE_TABLE = """
+CREATE TABLE bench_news (
+    id INTEGER PRIMARY KEY {autoincrement},
+    category_id INT,
+    author_id INT,
+    editor_id INT,
+    datetime DATETIME,
+    title VARCHAR(255) NOT NULL,
+    body TEXT,
+    link VARCHAR(255)
+)
+"""
+
+INSERT = """
+INSERT INTO bench_news (category_id, author_id, editor_id, datetime, title, body, link)
+VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+class SQLiteConnection:
+    """A sqlite3 connection taking mysql.connector's %s placeholders."""
+
+    def __init__(self, path):
+        self._connection = sqlite3.connect(path)
+
+    def cursor(self, buffered=False):
+        return SQLiteCursor(self._connection.cursor())
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        self._connection.close()
+
+
+class SQLiteCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, data=()):
+        self._cursor.execute(query.replace("%s", "?"), data)
+
+    def executemany(self, query, rows):
+        self._cursor.executemany(query.replace("%s", "?"), rows)
+
+    def close(self):
+        self._cursor.close()
+
+
+def make_rows(count, body_words):
+    body = " ".join(["শব্দ"] * body_words)
+    return [
+        (1, 1, 1, "2024-10-12 00:00:00", f"Title {i}", body, f"https://dailyamardesh.com/national/{i}")
+        for i in range(count)
+    ]
+
+
+def connect_per_row(connect, rows, batch_size):
+    for row in rows:
+        connection = connect()
+        execute_query(connection, INSERT, row)
+        connection.close()
+
+
+def commit_per_row(connect, rows, batch_size):
+    connection = connect()
+    for row in rows:
+        execute_query(connection, INSERT, row)
+    connection.close()
+
+
+def batch_writer(connect, rows, batch_size):
+    connection = connect()
+    with BatchWriter(connection, INSERT, batch_size=batch_size, flush_interval=60) as writer:
+        for row in rows:
+            writer.add(row)
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mysql", action="store_true", help="use the database configured in .env")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--body-words", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[50, 500, 2000])
+    args = parser.parse_args()
+
+    if args.mysql:
+        from db_connection import create_db_connection, get_pooled_connection
+
+        connect_new, connect_pooled = create_db_connection, get_pooled_connection
+        autoincrement = "AUTO_INCREMENT"
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "bench.sqlite")
+        connect_new = connect_pooled = lambda: SQLiteConnection(path)
+        autoincrement = ""
+
+    rows = make_rows(args.rows, args.body_words)
+    runs = [("connection per row", connect_per_row, connect_new, None),
+            ("commit per row", commit_per_row, connect_pooled, None)]
+    runs += [(f"BatchWriter({size})", batch_writer, connect_pooled, size) for size in args.batch_size]
+
+    print(f"{args.rows} rows of {args.body_words} words, {'MySQL' if args.mysql else 'SQLite'}")
+    print(f"{'writer':<22}{'seconds':>9}{'rows/s':>10}")
+    for name, write, connect, batch_size in runs:
+        connection = connect()
+        cursor = connection.cursor()
+        cursor.execute("DROP TABLE IF EXISTS bench_news")
+        cursor.execute(CREATE_TABLE.format(autoincrement=autoincrement))
+        connection.commit()
+        connection.close()
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            write(connect, rows, batch_size)
+        seconds = time.perf_counter() - started
+        print(f"{name:<22}{seconds:>9.2f}{len(rows) / seconds:>10.0f}")
+
+    connection = connect_pooled()
+    connection.cursor().execute("DROP TABLE IF EXISTS bench_news")
+    connection.commit()
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
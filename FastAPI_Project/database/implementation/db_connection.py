@@ -1,11 +1,17 @@
 import os
+import threading
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+
+_pool = None
+_pool_lock = threading.Lock()
+
 def create_db_connection():
     """
     Create a database connection to the MySQL database specified by the db_name.
@@ -28,6 +34,46 @@ def create_db_connection():
         print(f"The error '{e}' occurred")
         return None
     
+def get_connection_pool():
+    """
+    Return the connection pool shared by the scripts of this package,
+    creating it on the first call.
+
+    Returns
+    -------
+    mysql.connector.pooling.MySQLConnectionPool
+        A pool of DB_POOL_SIZE connections to the database.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = pooling.MySQLConnectionPool(
+                pool_name="news",
+                pool_size=DB_POOL_SIZE,
+                host=os.getenv("DB_HOST"),
+                user=os.getenv("DB_USER"),
+                passwd=os.getenv("DB_PASS"),
+                database=os.getenv("DB_NAME")
+            )
+        return _pool
+
+
+def get_pooled_connection():
+    """
+    Borrow a connection from the shared pool. Closing it returns it to the
+    pool instead of disconnecting.
+
+    Returns
+    -------
+    mysql.connector.pooling.PooledMySQLConnection or None
+        The connection, or None if it could not be obtained.
+    """
+    try:
+        return get_connection_pool().get_connection()
+    except Error as e:
+        print(f"The error '{e}' occurred")
+        return None
+
 
 if __name__ == '__main__':
     create_db_connection()
\ No newline at end of file
@@ -1,7 +1,7 @@
 import os
 import mysql.connector
 from mysql.connector import Error
-from db_connection import create_db_connection
+from db_connection import get_pooled_connection
 
 def execute_query(connection, query):
     """
@@ -25,6 +25,8 @@ def execute_query(connection, query):
         print(f"{query}\nQuery successful")
     except Error as e:
         print(f"The error '{e}' occurred")
+    finally:
+        cursor.close()
 
 def execute_read_query(connection, query):
     """
@@ -50,6 +52,8 @@ def execute_read_query(connection, query):
     except Error as e:
         print(f"The error '{e}' occurred")
         return []
+    finally:
+        cursor.close()
 
 def create_tables(connection):
     """
@@ -132,9 +136,219 @@ def add_column(connection):
     """
     execute_query(connection, pub)
 
+def add_news_datetime_index(connection):
+    """
+    Add the (datetime, id) index used by keyset pagination of the news list.
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+
+    Returns
+    -------
+    None
+    """
+    index = """
+    CREATE INDEX ix_news_datetime_id ON news (datetime, id);
+    """
+    execute_query(connection, index)
+
+def add_news_search_column(connection):
+    """
+    Add the normalized search document column of the news table and its
+    FULLTEXT index, used by GET /news/search. Existing rows are filled in by
+    `crud.backfill_search_text` in the API.
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+
+    Returns
+    -------
+    None
+    """
+    column = """
+    ALTER TABLE news ADD COLUMN search_text MEDIUMTEXT;
+    """
+    index = """
+    CREATE FULLTEXT INDEX ix_news_search_text ON news (search_text);
+    """
+    execute_query(connection, column)
+    execute_query(connection, index)
+
+def add_summary_metrics_columns(connection):
+    """
+    Add the columns recording how each summary was generated: in one call
+    or map-reduce over chunks of a long article, the LLM calls and tokens it
+    took, and its latency. Summaries stored before have NULL there.
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+
+    Returns
+    -------
+    None
+    """
+    columns = """
+    ALTER TABLE summaries
+        ADD COLUMN strategy VARCHAR(10) NULL,
+        ADD COLUMN llm_calls INT NULL,
+        ADD COLUMN prompt_tokens INT NULL,
+        ADD COLUMN completion_tokens INT NULL,
+        ADD COLUMN latency_ms INT NULL;
+    """
+    execute_query(connection, columns)
+
+def create_scrape_job_tables(connection):
+    """
+    Create the tables backing the background scrape jobs of
+    POST /news/scrape/ (see app/jobs.py in the API).
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+
+    Returns
+    -------
+    None
+    """
+    jobs = """
+    CREATE TABLE IF NOT EXISTS scrape_jobs (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        status VARCHAR(20) DEFAULT 'queued',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        finished_at DATETIME NULL,
+        attempts INT DEFAULT 0,
+        heartbeat_at DATETIME NULL,
+        error VARCHAR(255) NULL,
+        INDEX ix_scrape_jobs_status (status)
+    );
+    """
+    items = """
+    CREATE TABLE IF NOT EXISTS scrape_job_items (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        job_id INT,
+        position INT,
+        url VARCHAR(2048),
+        status VARCHAR(20) DEFAULT 'pending',
+        news_id INT NULL,
+        error VARCHAR(255) NULL,
+        INDEX ix_scrape_job_items_job_id (job_id),
+        FOREIGN KEY (job_id) REFERENCES scrape_jobs(id),
+        FOREIGN KEY (news_id) REFERENCES news(id)
+    );
+    """
+    execute_query(connection, jobs)
+    execute_query(connection, items)
+
+def add_scrape_job_lease_columns(connection):
+    """
+    Add the attempt count, heartbeat and error of scrape jobs to a
+    scrape_jobs table created before them. Workers lease the jobs they run
+    through the heartbeat, and give up on a job after SCRAPE_JOB_MAX_ATTEMPTS.
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+
+    Returns
+    -------
+    None
+    """
+    columns = """
+    ALTER TABLE scrape_jobs
+        ADD COLUMN attempts INT DEFAULT 0,
+        ADD COLUMN heartbeat_at DATETIME NULL,
+        ADD COLUMN error VARCHAR(255) NULL;
+    """
+    execute_query(connection, columns)
+
+def add_news_link_unique_index(connection):
+    """
+    Add the unique index on news.link that backs the skip-known-URLs check
+    of POST /news/scrape/. Nothing is changed while duplicate links exist;
+    they are printed so they can be merged first.
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+
+    Returns
+    -------
+    None
+    """
+    duplicates_query = """
+    SELECT link, COUNT(*) FROM news GROUP BY link HAVING COUNT(*) > 1;
+    """
+    duplicates = execute_read_query(connection, duplicates_query)
+    if duplicates:
+        print(f"{len(duplicates)} links are stored more than once, not adding the index:")
+        for link, count in duplicates:
+            print(f"  {count}x {link}")
+        return
+    index = """
+    CREATE UNIQUE INDEX ux_news_link ON news (link);
+    """
+    execute_query(connection, index)
+
+def create_crawl_watermark_table(connection):
+    """
+    Create the table holding the high-water mark of every section crawled
+    by section_crawler.crawl_sections.
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+
+    Returns
+    -------
+    None
+    """
+    watermarks = """
+    CREATE TABLE IF NOT EXISTS crawl_watermarks (
+        section VARCHAR(255) PRIMARY KEY,
+        newest_link VARCHAR(2048),
+        newest_datetime DATETIME NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    );
+    """
+    execute_query(connection, watermarks)
+
+def add_summary_content_hash_column(connection):
+    """
+    Add the content hash of the summaries table and the (news_id,
+    content_hash) index used by POST /summaries/ to reuse a stored summary.
+    Summaries stored before have no hash and are generated again once.
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+
+    Returns
+    -------
+    None
+    """
+    column = """
+    ALTER TABLE summaries ADD COLUMN content_hash CHAR(64) NULL;
+    """
+    index = """
+    CREATE INDEX ix_summaries_news_id_content_hash ON summaries (news_id, content_hash);
+    """
+    execute_query(connection, column)
+    execute_query(connection, index)
+
 # Example usage
 if __name__ == "__main__":
-    conn = create_db_connection()
+    conn = get_pooled_connection()
     if conn is not None:
         # create_tables(conn)
         add_column(conn)
@@ -1,12 +1,47 @@
 import os
 import mysql.connector
 from mysql.connector import Error
-from db_connection import create_db_connection
+from db_connection import get_pooled_connection
+from batch_writer import BatchWriter
 import cloudscraper
 from bs4 import BeautifulSoup
 import re
 import datetime
-import html5lib
+from urllib.parse import urljoin
+
+
+INSERT_CATEGORY_QUERY = """
+INSERT INTO categories (name, description)
+VALUES (%s, %s)
+"""
+
+INSERT_AUTHOR_QUERY = """
+INSERT INTO authors (name, email)
+VALUES (%s, %s)
+"""
+
+INSERT_EDITOR_QUERY = """
+INSERT INTO editors (name, email)
+VALUES (%s, %s)
+"""
+
+# A rerun re-reads whole listings; an article already stored (unique link)
+# is left as it is instead of failing its batch.
+INSERT_NEWS_QUERY = """
+INSERT INTO news (category_id, author_id, editor_id, datetime, title, body, link)
+VALUES (%s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE id = id
+"""
+
+INSERT_IMAGE_QUERY = """
+INSERT INTO images (news_id, image_url)
+VALUES (%s, %s)
+"""
+
+INSERT_SUMMARY_QUERY = """
+INSERT INTO summaries (news_id, summary_text)
+VALUES (%s, %s)
+"""
 
 
 def execute_query(connection, query, data=None):
@@ -35,7 +70,10 @@ def execute_query(connection, query, data=None):
         connection.commit()
         print("Query successful")
     except Error as e:
+        connection.rollback()
         print(f"The error '{e}' occurred")
+    finally:
+        cursor.close()
 
 
 def insert_category(connection, name, description):
@@ -55,10 +93,7 @@ def insert_category(connection, name, description):
     -------
     None
     """
-    query = """
-    INSERT INTO categories (name, description)
-    VALUES (%s, %s)
-    """
+    query = INSERT_CATEGORY_QUERY
     data = (name, description)
     execute_query(connection, query, data)
 
@@ -80,10 +115,7 @@ def insert_author(connection, name, email):
     -------
     None
     """
-    query = """
-    INSERT INTO authors (name, email)
-    VALUES (%s, %s)
-    """
+    query = INSERT_AUTHOR_QUERY
     data = (name, email)
     execute_query(connection, query, data)
 
@@ -105,10 +137,7 @@ def insert_editor(connection, name, email):
     -------
     None
     """
-    query = """
-    INSERT INTO editors (name, email)
-    VALUES (%s, %s)
-    """
+    query = INSERT_EDITOR_QUERY
     data = (name, email)
     execute_query(connection, query, data)
 
@@ -140,10 +169,7 @@ def insert_news(connection, category_id, author_id, editor_id, datetime, title,
     -------
     None
     """
-    query = """
-    INSERT INTO news (category_id, author_id, editor_id, datetime, title, body, link)
-    VALUES (%s, %s, %s, %s, %s, %s, %s)
-    """
+    query = INSERT_NEWS_QUERY
     data = (category_id, author_id, editor_id, datetime, title, body, link)
     execute_query(connection, query, data)
 
@@ -165,10 +191,7 @@ def insert_image(connection, news_id, image_url):
     -------
     None
     """
-    query = """
-    INSERT INTO images (news_id, image_url)
-    VALUES (%s, %s)
-    """
+    query = INSERT_IMAGE_QUERY
     data = (news_id, image_url)
     execute_query(connection, query, data)
 
@@ -190,14 +213,145 @@ def insert_summary(connection, news_id, summary_text):
     -------
     None
     """
-    query = """
-    INSERT INTO summaries (news_id, summary_text)
-    VALUES (%s, %s)
-    """
+    query = INSERT_SUMMARY_QUERY
     data = (news_id, summary_text)
     execute_query(connection, query, data)
 
 
+BASE_URL = "https://dailyamardesh.com"
+
+CATEGORIES_SELECTOR = "body > div.mb-10.lg\\:mb-8 > div.wrapper.z-\\[999\\].bg-white > div:nth-child(2) > div > div > div.flex.flex-row.gap-6.overflow-x-scroll.lg\\:overflow-x-visible"
+
+EDITOR_SELECTOR = "footer > div.flex.border-t.border-gray-300.py-1.lg\\:py-3.justify-center.md\\:justify-start.font-normal.text-center.md\\:text-left > div > div.flex.flex-col.gap-3 > div.flex.font-semibold > span"
+
+
+def find_categories(soup):
+    """
+    Find the category links of the navigation bar of the home page.
+
+    Parameters
+    ----------
+    soup : bs4.BeautifulSoup
+        The parsed home page.
+
+    Returns
+    -------
+    list of tuple or None
+        (name, absolute url) pairs in navigation order, or None if the
+        navigation bar could not be located.
+    """
+    categories_div = soup.select_one(CATEGORIES_SELECTOR)
+    if categories_div is None:
+        return None
+    return [
+        (category.get_text(strip=True), urljoin(BASE_URL, category.get("href", "")))
+        for category in categories_div.find_all("a")
+    ]
+
+
+def find_editor_name(soup):
+    """
+    Find the name after 'সম্পাদক ও প্রকাশক, ' in the footer of the home page.
+
+    Parameters
+    ----------
+    soup : bs4.BeautifulSoup
+        The parsed home page.
+
+    Returns
+    -------
+    str or None
+        The name, or None if the footer or the name could not be found.
+    """
+    editor_span = soup.select_one(EDITOR_SELECTOR)
+    if editor_span is None:
+        return None
+    match = re.search(r"সম্পাদক ও প্রকাশক,\s*(.*)", editor_span.get_text(strip=True))
+    return match.group(1) if match else None
+
+
+def parse_bengali_date(bengali_date_str):
+    """
+    Convert a date such as 'শনিবার, ১২ অক্টোবর ২০২৪' to MySQL datetime format.
+
+    Parameters
+    ----------
+    bengali_date_str : str
+        The date line of an article page.
+
+    Returns
+    -------
+    str or None
+        'YYYY-MM-DD HH:MM:SS', or None if the date could not be parsed.
+    """
+    # Mapping of Bengali months to English months
+    bengali_to_english_months = {
+        "জানুয়ারি": "January",
+        "ফেব্রুয়ারি": "February",
+        "মার্চ": "March",
+        "এপ্রিল": "April",
+        "মে": "May",
+        "জুন": "June",
+        "জুলাই": "July",
+        "আগস্ট": "August",
+        "সেপ্টেম্বর": "September",
+        "অক্টোবর": "October",
+        "নভেম্বর": "November",
+        "ডিসেম্বর": "December",
+    }
+
+    # Convert Bengali numbers to English numbers
+    bengali_to_english_numbers = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
+
+    try:
+        # Split the date string to extract the day, month, and year
+        parts = bengali_date_str.split(",")[1].strip().split(" ")
+        day = parts[0].translate(bengali_to_english_numbers)
+        month = bengali_to_english_months[parts[1]]
+        year = parts[2].translate(bengali_to_english_numbers)
+
+        # Construct a datetime object
+        date_obj = datetime.datetime.strptime(f"{day} {month} {year}", "%d %B %Y")
+        return date_obj.strftime("%Y-%m-%d %H:%M:%S")  # Convert to MySQL datetime format
+    except Exception as e:
+        print(f"Error parsing date: {e}")
+        return None
+
+
+def parse_article(content):
+    """
+    Extract the body and publication date of an article page.
+
+    Parameters
+    ----------
+    content : bytes
+        The article page.
+
+    Returns
+    -------
+    tuple or None
+        (body, publish_date), or None if the page has no article body.
+    """
+    soap_sub_article = BeautifulSoup(content, "lxml")
+
+    # Get the article content (body of the article)
+    body = soap_sub_article.find_all("div", class_="block-full_richtext")
+    if not body:
+        return None
+    paragraphs = body[0].find_all("p")
+
+    # Unifying the paragraphs into one final body text
+    list_paragraphs = [p.get_text() for p in paragraphs]
+    final_body = " ".join(list_paragraphs)
+
+    date_publish_baseline = soap_sub_article.find_all("div", class_="text-sm")
+    if date_publish_baseline:
+        publish_date = parse_bengali_date(date_publish_baseline[0].get_text())
+    else:
+        publish_date = None  # Or use a default value
+    return final_body, publish_date
+
+
 def scrape_and_insert_categories():
     """
     Scrapes categories from the website and inserts them into the database.
@@ -209,40 +363,32 @@ def scrape_and_insert_categories():
     # Initialize cloudscraper
     scraper = cloudscraper.create_scraper()
 
-    # Base URL
-    base_url = "https://dailyamardesh.com"
-
     # Fetch the webpage
-    response = scraper.get(base_url)
+    response = scraper.get(BASE_URL)
     if response.status_code == 200:
         soup = BeautifulSoup(response.content, "html.parser")
 
-        # Locate the div containing categories
-        categories_div = soup.select_one(
-            "body > div.mb-10.lg\\:mb-8 > div.wrapper.z-\\[999\\].bg-white > div:nth-child(2) > div > div > div.flex.flex-row.gap-6.overflow-x-scroll.lg\\:overflow-x-visible"
-        )
-        if categories_div:
-            # Extract category elements
-            category_elements = categories_div.find_all("a")
-            if category_elements:
-                # Establish database connection
-                connection = create_db_connection()
-                if connection is not None:
-                    for category in category_elements:
-                        # Extract category name
-                        category_name = category.get_text(strip=True)
+        # Locate the categories in the navigation bar
+        categories = find_categories(soup)
+        if categories is None:
+            print("The specified div could not be located on the page.")
+        elif categories:
+            # Borrow a connection from the pool
+            connection = get_pooled_connection()
+            if connection is not None:
+                with BatchWriter(connection, INSERT_CATEGORY_QUERY) as writer:
+                    for category_name, _ in categories:
                         # Create a description
                         description = f"{category_name} description"
 
-                        # Insert into the database
+                        # Queue the row; it is written with the rest of the batch
                         print(f"Inserting Category: {category_name}, Description: {description}")
-                        insert_category(connection, category_name, description)
-                else:
-                    print("Failed to connect to the database.")
+                        writer.add((category_name, description))
+                connection.close()
             else:
-                print("No categories found inside the specified div.")
+                print("Failed to connect to the database.")
         else:
-            print("The specified div could not be located on the page.")
+            print("No categories found inside the specified div.")
     else:
         print(f"Failed to fetch the page. Status code: {response.status_code}")
 
@@ -257,41 +403,27 @@ def scrape_and_insert_author():
     # Initialize cloudscraper
     scraper = cloudscraper.create_scraper()
 
-    # Base URL
-    base_url = "https://dailyamardesh.com"
-
     # Default email for author
     default_email = "test@example.com"
 
     # Fetch the webpage
-    response = scraper.get(base_url)
+    response = scraper.get(BASE_URL)
     if response.status_code == 200:
         soup = BeautifulSoup(response.content, "html.parser")
 
-        # Locate the span containing author info
-        author_span = soup.select_one(
-            "footer > div.flex.border-t.border-gray-300.py-1.lg\\:py-3.justify-center.md\\:justify-start.font-normal.text-center.md\\:text-left > div > div.flex.flex-col.gap-3 > div.flex.font-semibold > span"
-        )
-        if author_span:
-            # Extract the full text
-            full_text = author_span.get_text(strip=True)
-
-            # Use regex to extract the author part after 'সম্পাদক ও প্রকাশক, '
-            match = re.search(r"সম্পাদক ও প্রকাশক,\s*(.*)", full_text)
-            if match:
-                author_name = match.group(1)
-                print(f"Author Name: {author_name}")
-
-                # Insert author into the database
-                connection = create_db_connection()
-                if connection is not None:
-                    insert_author(connection, author_name, default_email)
-                else:
-                    print("Failed to connect to the database.")
+        author_name = find_editor_name(soup)
+        if author_name:
+            print(f"Author Name: {author_name}")
+
+            # Insert author into the database
+            connection = get_pooled_connection()
+            if connection is not None:
+                insert_author(connection, author_name, default_email)
+                connection.close()
             else:
-                print("Author name not found.")
+                print("Failed to connect to the database.")
         else:
-            print("The specified span for the author info could not be located.")
+            print("Author name not found.")
     else:
         print(f"Failed to fetch the page. Status code: {response.status_code}")
 
@@ -307,41 +439,27 @@ def scrape_and_insert_editor():
     # Initialize cloudscraper
     scraper = cloudscraper.create_scraper()
 
-    # Base URL
-    base_url = "https://dailyamardesh.com"
-
     # Default email for editor
     default_email = "test@example.com"
 
     # Fetch the webpage
-    response = scraper.get(base_url)
+    response = scraper.get(BASE_URL)
     if response.status_code == 200:
         soup = BeautifulSoup(response.content, "html.parser")
 
-        # Locate the span containing editor info
-        editor_span = soup.select_one(
-            "footer > div.flex.border-t.border-gray-300.py-1.lg\\:py-3.justify-center.md\\:justify-start.font-normal.text-center.md\\:text-left > div > div.flex.flex-col.gap-3 > div.flex.font-semibold > span"
-        )
-        if editor_span:
-            # Extract the full text
-            full_text = editor_span.get_text(strip=True)
-
-            # Use regex to extract the editor part after 'সম্পাদক ও প্রকাশক, '
-            match = re.search(r"সম্পাদক ও প্রকাশক,\s*(.*)", full_text)
-            if match:
-                editor_name = match.group(1)
-                print(f"Editor Name: {editor_name}")
-
-                # Insert editor into the database
-                connection = create_db_connection()
-                if connection is not None:
-                    insert_editor(connection, editor_name, default_email)
-                else:
-                    print("Failed to connect to the database.")
+        editor_name = find_editor_name(soup)
+        if editor_name:
+            print(f"Editor Name: {editor_name}")
+
+            # Insert editor into the database
+            connection = get_pooled_connection()
+            if connection is not None:
+                insert_editor(connection, editor_name, default_email)
+                connection.close()
             else:
-                print("Editor name not found.")
+                print("Failed to connect to the database.")
         else:
-            print("The specified span for the editor info could not be located.")
+            print("Editor name not found.")
     else:
         print(f"Failed to fetch the page. Status code: {response.status_code}")
 
@@ -349,104 +467,62 @@ def scrape_and_insert_news():
     """
     Scrapes news articles from the website and inserts them into the database.
 
+    Only the first page of the national section is read. See
+    section_crawler.crawl_sections for an incremental crawl of every section.
+
     Returns
     -------
     None
     """
-    import datetime
-
-    def parse_bengali_date(bengali_date_str):
-        # Mapping of Bengali months to English months
-        bengali_to_english_months = {
-            "জানুয়ারি": "January",
-            "ফেব্রুয়ারি": "February",
-            "মার্চ": "March",
-            "এপ্রিল": "April",
-            "মে": "May",
-            "জুন": "June",
-            "জুলাই": "July",
-            "আগস্ট": "August",
-            "সেপ্টেম্বর": "September",
-            "অক্টোবর": "October",
-            "নভেম্বর": "November",
-            "ডিসেম্বর": "December",
-        }
-
-        # Convert Bengali numbers to English numbers
-        bengali_to_english_numbers = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
-
-        try:
-            # Split the date string to extract the day, month, and year
-            parts = bengali_date_str.split(",")[1].strip().split(" ")
-            day = parts[0].translate(bengali_to_english_numbers)
-            month = bengali_to_english_months[parts[1]]
-            year = parts[2].translate(bengali_to_english_numbers)
-
-            # Construct a datetime object
-            date_obj = datetime.datetime.strptime(f"{day} {month} {year}", "%d %B %Y")
-            return date_obj.strftime("%Y-%m-%d %H:%M:%S")  # Convert to MySQL datetime format
-        except Exception as e:
-            print(f"Error parsing date: {e}")
-            return None
-
     # Initialize cloudscraper
     scraper = cloudscraper.create_scraper()
 
-    # Base URL and target page
-    base_url = "https://dailyamardesh.com"
-    url = "https://dailyamardesh.com/national"
+    # Target page
+    url = f"{BASE_URL}/national"
 
     # Default IDs for category, author, and editor
     default_category_id = 4  # Replace with actual category_id from your database
     default_author_id = 2    # Replace with actual author_id from your database
     default_editor_id = 1    # Replace with actual editor_id from your database
 
+    # Borrow one connection for the whole run; the rows are written in batches
+    connection = get_pooled_connection()
+    if connection is None:
+        print("Failed to connect to the database.")
+        return
+
     # Fetch the webpage
     response = scraper.get(url)
     if response.status_code == 200:
-        soup = BeautifulSoup(response.content, "html.parser")
+        soup = BeautifulSoup(response.content, "lxml")
 
         # Find all links using the CSS selector for the articles
         all_cover_articles = soup.select("h2.text-contrast1 > a")
 
         # Scrape all the articles
-        for article in all_cover_articles:
-            # Getting the links (relative URLs)
-            relative_link = article.get("href")
-            full_url = base_url + relative_link
-
-            # Getting the titles
-            title = article.get_text()
-
-            # Now, go to the detail view of the article
-            article_response = scraper.get(full_url)
-            if article_response.status_code == 200:
-                soap_sub_article = BeautifulSoup(article_response.content, "html5lib")
-
-                # Get the article content (body of the article)
-                body = soap_sub_article.find_all("div", class_="block-full_richtext")
-                paragraphs = body[0].find_all("p")
-
-                # Unifying the paragraphs into one final body text
-                list_paragraphs = [p.get_text() for p in paragraphs]
-                final_body = " ".join(list_paragraphs)
-
-                # Initialize `date_publish_baseline` before checking
-                date_publish_baseline = soap_sub_article.find_all("div", class_="text-sm")
-                if date_publish_baseline:
-                    bengali_date = date_publish_baseline[0].get_text()
-                    publish_date = parse_bengali_date(bengali_date)
-                else:
-                    publish_date = None  # Or use a default value
-
-                # Print article details (for debugging)
-                print(f"Inserting news: {title}, Date: {publish_date}")
-
-                # Insert news into the database
-                connection = create_db_connection()
-                if connection is not None:
-                    insert_news(
-                        connection,
+        with BatchWriter(connection, INSERT_NEWS_QUERY) as writer:
+            for article in all_cover_articles:
+                # Getting the links (relative URLs)
+                relative_link = article.get("href")
+                full_url = BASE_URL + relative_link
+
+                # Getting the titles
+                title = article.get_text()
+
+                # Now, go to the detail view of the article
+                article_response = scraper.get(full_url)
+                if article_response.status_code == 200:
+                    parsed = parse_article(article_response.content)
+                    if parsed is None:
+                        print(f"No article body found at {full_url}")
+                        continue
+                    final_body, publish_date = parsed
+
+                    # Print article details (for debugging)
+                    print(f"Inserting news: {title}, Date: {publish_date}")
+
+                    # Queue the news row for the next batch insert
+                    writer.add((
                         default_category_id,
                         default_author_id,
                         default_editor_id,
@@ -454,17 +530,17 @@ def scrape_and_insert_news():
                         title,
                         final_body,
                         full_url
-                    )
-                else:
-                    print("Failed to connect to the database.")
+                    ))
+        print(f"Inserted {writer.written} news, {writer.failed} failed")
     else:
         print(f"Failed to fetch the page. Status code: {response.status_code}")
+    connection.close()
 
 
 
 # Example usage
 if __name__ == "__main__":
-    conn = create_db_connection()
+    conn = get_pooled_connection()
     if conn is not None:
         # scrape_and_insert_categories()
         # scrape_and_insert_author()
@@ -1,7 +1,7 @@
 import os
 import mysql.connector
 from mysql.connector import Error
-from db_connection import create_db_connection
+from db_connection import get_pooled_connection
 
 
 def execute_query(connection, query, data=None):
@@ -30,7 +30,10 @@ def execute_query(connection, query, data=None):
         connection.commit()
         print("Query successful")
     except Error as e:
+        connection.rollback()
         print(f"The error '{e}' occurred")
+    finally:
+        cursor.close()
 
 def insert_category(connection, name, description):
     """
@@ -188,7 +191,7 @@ def insert_summary(connection, news_id, summary_text):
 
 # Example usage
 if __name__ == "__main__":
-    conn = create_db_connection()
+    conn = get_pooled_connection()
     if conn is not None:
         insert_category(conn, "Politics", "All news related to politics")
         insert_reporter(conn, "John Doe", "test@example.com")
@@ -0,0 +1,386 @@
+import datetime
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import cloudscraper
+from bs4 import BeautifulSoup
+from mysql.connector import Error
+
+from db_connection import get_pooled_connection
+from news_insert import BASE_URL, find_categories, find_editor_name, parse_article
+
+# The API's search document, so crawled articles are found by GET /news/search.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "fastapi-news"))
+from app.search import search_document  # noqa: E402
+
+# Listing page `page` of a section; page 1 is the section page itself.
+PAGE_URL = os.getenv("CRAWLER_PAGE_URL", "{section}?page={page}")
+MAX_PAGES = int(os.getenv("CRAWLER_MAX_PAGES", 50))
+WORKERS = int(os.getenv("CRAWLER_WORKERS", 8))
+TIMEOUT = int(os.getenv("CRAWLER_TIMEOUT", 30))
+
+ARTICLE_SELECTOR = "h2.text-contrast1 > a"
+
+_local = threading.local()
+
+
+def get_scraper():
+    """
+    Return the cloudscraper session of the calling thread.
+
+    Returns
+    -------
+    cloudscraper.CloudScraper
+        A session created on the first call from each thread.
+    """
+    if not hasattr(_local, "scraper"):
+        _local.scraper = cloudscraper.create_scraper()
+    return _local.scraper
+
+
+def fetch(url):
+    """
+    Fetch a page.
+
+    Parameters
+    ----------
+    url : str
+        The page to fetch.
+
+    Returns
+    -------
+    bytes or None
+        The page content, or None if the request failed.
+    """
+    try:
+        response = get_scraper().get(url, timeout=TIMEOUT)
+    except Exception as e:
+        print(f"Failed to fetch {url}: {e}")
+        return None
+    if response.status_code != 200:
+        print(f"Failed to fetch {url}. Status code: {response.status_code}")
+        return None
+    return response.content
+
+
+def page_url(section_url, page):
+    return section_url if page == 1 else PAGE_URL.format(section=section_url, page=page)
+
+
+def find_articles(content):
+    """
+    Find the article links of a section listing page.
+
+    Parameters
+    ----------
+    content : bytes
+        The listing page.
+
+    Returns
+    -------
+    list of tuple
+        (absolute link, title) pairs, newest first.
+    """
+    soup = BeautifulSoup(content, "lxml")
+    return [
+        (urljoin(BASE_URL, article.get("href")), article.get_text(strip=True))
+        for article in soup.select(ARTICLE_SELECTOR)
+        if article.get("href")
+    ]
+
+
+def get_or_create_id(connection, table, name, **fields):
+    """
+    Return the id of the row of `table` called `name`, inserting it with
+    `fields` if there is none. Nothing is committed, so a new row is part
+    of the caller's transaction. When a concurrent insert of the same name
+    wins, ON DUPLICATE KEY UPDATE hands back the id of its row.
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+    table : str
+        categories, reporters or publishers.
+    name : str
+        The name of the row.
+    **fields
+        The other columns of a new row.
+
+    Returns
+    -------
+    int
+        The id of the row.
+    """
+    cursor = connection.cursor(buffered=True)
+    cursor.execute(f"SELECT id FROM {table} WHERE name = %s", (name,))
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+    columns = ", ".join(["name", *fields])
+    placeholders = ", ".join(["%s"] * (len(fields) + 1))
+    cursor.execute(
+        f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)",
+        (name, *fields.values()),
+    )
+    return cursor.lastrowid
+
+
+def to_datetime(value):
+    """
+    Return `value` as a datetime.
+
+    Parameters
+    ----------
+    value : datetime.datetime, str or None
+        A stored datetime, or a 'YYYY-MM-DD HH:MM:SS' string of
+        parse_bengali_date.
+
+    Returns
+    -------
+    datetime.datetime or None
+    """
+    if isinstance(value, str):
+        return datetime.datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def get_watermark(connection, section_url):
+    """
+    Return the high-water mark of a section.
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+    section_url : str
+        The section listing URL.
+
+    Returns
+    -------
+    tuple
+        (newest link, newest datetime) seen by the last complete crawl, or
+        (None, None) if the section was never crawled.
+    """
+    cursor = connection.cursor(buffered=True)
+    cursor.execute("SELECT newest_link, newest_datetime FROM crawl_watermarks WHERE section = %s", (section_url,))
+    return cursor.fetchone() or (None, None)
+
+
+def get_known_links(connection, links):
+    """
+    Return the subset of `links` already stored in the news table.
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+    links : list of str
+        The links to look up.
+
+    Returns
+    -------
+    set of str
+    """
+    if not links:
+        return set()
+    cursor = connection.cursor()
+    placeholders = ", ".join(["%s"] * len(links))
+    cursor.execute(f"SELECT link FROM news WHERE link IN ({placeholders})", tuple(links))
+    return {link for (link,) in cursor.fetchall()}
+
+
+def find_new_articles(connection, section_url, watermark_link):
+    """
+    Walk the listing pages of a section, newest first, until known content.
+
+    The walk stops at the watermark link, at a page whose links are all
+    stored already, at a page repeating earlier links (past the last page),
+    or after MAX_PAGES pages. A section that did not change since the last
+    crawl therefore costs one listing request. Only the first three reach
+    known content; a walk that ends on a failed listing request or at
+    MAX_PAGES may have missed articles between its last page and the
+    watermark.
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+    section_url : str
+        The section listing URL.
+    watermark_link : str or None
+        The newest link of the last complete crawl.
+
+    Returns
+    -------
+    tuple
+        (new articles as (link, title) pairs newest first, newest link
+        listed, number of listing requests, whether the walk reached known
+        content).
+    """
+    new_articles, seen = [], set()
+    newest_link = None
+    requests = 0
+    for page in range(1, MAX_PAGES + 1):
+        content = fetch(page_url(section_url, page))
+        requests += 1
+        if content is None:
+            return new_articles, newest_link, requests, False
+        articles = [(link, title) for link, title in find_articles(content) if link not in seen]
+        if not articles:
+            return new_articles, newest_link, requests, True
+        seen.update(link for link, _ in articles)
+        newest_link = newest_link or articles[0][0]
+
+        links = [link for link, _ in articles]
+        reached_watermark = watermark_link in links
+        if reached_watermark:
+            articles = articles[:links.index(watermark_link)]
+        known = get_known_links(connection, [link for link, _ in articles])
+        unknown = [(link, title) for link, title in articles if link not in known]
+        new_articles.extend(unknown)
+        if reached_watermark or not unknown:
+            return new_articles, newest_link, requests, True
+    return new_articles, newest_link, requests, False
+
+
+def crawl_section(connection, executor, name, section_url, reporter_id, publisher_id):
+    """
+    Store the articles of a section published since its last crawl.
+
+    Article pages are fetched concurrently on `executor`. The articles (with
+    their search document), a new category and the new watermark are
+    committed together; the watermark only moves when the listing walk reached
+    known content and every new article page could be fetched, so neither a
+    failed request nor a walk cut short at MAX_PAGES leaves a gap behind it.
+
+    Parameters
+    ----------
+    connection : mysql.connector.connection.MySQLConnection
+        The connection object to the database.
+    executor : concurrent.futures.ThreadPoolExecutor
+        Runs the article page requests.
+    name : str
+        The category name of the section.
+    section_url : str
+        The section listing URL.
+    reporter_id : int
+        The ID of the reporter stored with the articles.
+    publisher_id : int
+        The ID of the publisher stored with the articles.
+
+    Returns
+    -------
+    dict
+        Counts of listing requests, stored, unparsable and unfetched articles.
+        Articles stored by someone else in the meantime are not counted.
+    """
+    watermark_link, watermark_datetime = get_watermark(connection, section_url)
+    watermark_datetime = to_datetime(watermark_datetime)
+    articles, newest_link, requests, complete = find_new_articles(connection, section_url, watermark_link)
+    stats = {"requests": requests, "stored": 0, "unparsable": 0, "unfetched": 0}
+    if newest_link is None or newest_link == watermark_link:
+        print(f"{name}: no new articles ({requests} listing requests)")
+        return stats
+
+    rows = []
+    newest_datetime = watermark_datetime
+    for (link, title), content in zip(articles, executor.map(fetch, [link for link, _ in articles])):
+        stats["requests"] += 1
+        if content is None:
+            stats["unfetched"] += 1
+            continue
+        parsed = parse_article(content)
+        if parsed is None:
+            print(f"No article body found at {link}")
+            stats["unparsable"] += 1
+            continue
+        body, publish_date = parsed
+        publish_date = to_datetime(publish_date)
+        rows.append((reporter_id, publisher_id, publish_date, title, body, link, search_document(title, body)))
+        if publish_date and (newest_datetime is None or publish_date > newest_datetime):
+            newest_datetime = publish_date
+
+    cursor = connection.cursor()
+    try:
+        if rows:
+            category_id = get_or_create_id(connection, "categories", name, description=f"{name} description")
+            # A concurrent crawl or the API may have stored some of them
+            # meanwhile; those are left alone. Without CLIENT_FOUND_ROWS
+            # (not set by the pool) such a row counts 0 affected rows.
+            cursor.executemany(
+                """
+                INSERT INTO news
+                    (category_id, reporter_id, publisher_id, datetime, title, body, link, search_text)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE id = id
+                """,
+                [(category_id, *row) for row in rows],
+            )
+            stats["stored"] = cursor.rowcount
+        if complete and not stats["unfetched"]:
+            cursor.execute(
+                """
+                INSERT INTO crawl_watermarks (section, newest_link, newest_datetime)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE newest_link = VALUES(newest_link), newest_datetime = VALUES(newest_datetime)
+                """,
+                (section_url, newest_link, newest_datetime),
+            )
+        connection.commit()
+    except Error as e:
+        connection.rollback()
+        print(f"The error '{e}' occurred")
+        stats["stored"] = 0
+        return stats
+    print(
+        f"{name}: {stats['stored']} stored, {stats['unparsable']} unparsable, "
+        f"{stats['unfetched']} unfetched ({stats['requests']} requests)"
+    )
+    return stats
+
+
+def crawl_sections():
+    """
+    Incrementally crawl every section listed in the navigation bar of the
+    home page (the categories of scrape_and_insert_categories).
+
+    Returns
+    -------
+    None
+    """
+    content = fetch(BASE_URL)
+    if content is None:
+        return
+    soup = BeautifulSoup(content, "html.parser")
+    sections = find_categories(soup)
+    if not sections:
+        print("No categories found on the home page.")
+        return
+
+    connection = get_pooled_connection()
+    if connection is None:
+        print("Failed to connect to the database.")
+        return
+
+    publisher = BASE_URL.split("/")[2].split(".")[-2]
+    publisher_id = get_or_create_id(connection, "publishers", publisher, email=f"{publisher}@gmail.com")
+    reporter = find_editor_name(soup) or publisher
+    reporter_id = get_or_create_id(connection, "reporters", reporter, email=f"{reporter}@gmail.com")
+    connection.commit()
+
+    totals = {"requests": 1, "stored": 0, "unparsable": 0, "unfetched": 0}
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        for name, section_url in sections:
+            stats = crawl_section(connection, executor, name, section_url, reporter_id, publisher_id)
+            for key, value in stats.items():
+                totals[key] += value
+    connection.close()
+    print(f"Crawled {len(sections)} sections: {totals}")
+
+
+if __name__ == "__main__":
+    crawl_sections()
@@ -0,0 +1,103 @@
+"""
+Awaitable versions of the crud functions used by the routers.
+
+Each takes either session kind handed out by `dependencies.get_session`:
+
+* AsyncSession (DB_ASYNC on): the sync crud function runs through
+  `AsyncSession.run_sync`, i.e. on the event loop against the asyncio driver,
+  with no thread involved and no second copy of the query logic.
+* Session (DB_ASYNC off): the sync crud function runs in Starlette's
+  threadpool, exactly as the former `def` handlers did.
+
+Whatever is returned has everything the response schemas read already
+loaded, because lazy loads cannot happen once we are back on the event loop.
+"""
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from . import crud, schemas
+
+
+async def run(db, fn, *args, **kwargs):
+    """Call the sync `fn(session, *args, **kwargs)` without blocking the event loop."""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def end_transaction(db):
+    """
+    End the session's transaction, which returns its connection to the pool
+    until the next query. Call it before awaiting something slow that needs
+    no database, such as the LLM. Loaded objects are expired.
+    """
+    if isinstance(db, AsyncSession):
+        await db.rollback()
+    else:
+        await run_in_threadpool(db.rollback)
+
+
+async def get_news(db, news_id: int, view: schemas.NewsView = schemas.NewsView.full):
+    return await run(db, crud.get_news, news_id=news_id, view=view)
+
+
+async def get_news_list(
+    db,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    view: schemas.NewsView = schemas.NewsView.full,
+):
+    return await run(db, crud.get_news_list, skip=skip, limit=limit, cursor=cursor, view=view)
+
+
+async def search_news(
+    db,
+    q: str,
+    skip: int = 0,
+    limit: int = 10,
+    view: schemas.NewsView = schemas.NewsView.full,
+):
+    return await run(db, crud.search_news, q=q, skip=skip, limit=limit, view=view)
+
+
+async def bulk_create_news(db, records):
+    return await run(db, crud.bulk_create_news, records=records)
+
+
+async def insert_summary(db, news_id: int, summary_text: str, content_hash: Optional[str] = None, metrics: Optional[dict] = None):
+    return await run(db, crud.insert_summary, news_id=news_id, summary_text=summary_text, content_hash=content_hash, metrics=metrics)
+
+
+async def get_summary(db, summary_id: int):
+    return await run(db, crud.get_summary, summary_id=summary_id)
+
+
+async def get_news_bodies(db, news_ids: List[int]):
+    return await run(db, crud.get_news_bodies, news_ids=news_ids)
+
+
+async def get_unsummarized_news_bodies(db, since, limit: int):
+    return await run(db, crud.get_unsummarized_news_bodies, since=since, limit=limit)
+
+
+async def get_summary_ids_by_hash(db, content_hashes: dict):
+    return await run(db, crud.get_summary_ids_by_hash, content_hashes=content_hashes)
+
+
+async def insert_summaries(db, summaries: List[dict]):
+    return await run(db, crud.insert_summaries, summaries=summaries)
+
+
+async def get_summary_by_hash(db, news_id: int, content_hash: str):
+    return await run(db, crud.get_summary_by_hash, news_id=news_id, content_hash=content_hash)
+
+
+async def create_scrape_job(db, urls: List[str]):
+    return await run(db, crud.create_scrape_job, urls=urls)
+
+
+async def get_scrape_job(db, job_id: int):
+    return await run(db, crud.get_scrape_job, job_id=job_id)
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple
+
+from . import config
+
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire `ttl` seconds after they
+    were stored. Keys are tuples whose first item names the kind of entry,
+    which lets `invalidate` drop a whole family of keys at once.
+
+    A disabled cache keeps counting misses but never stores anything, so the
+    same code path can be measured with and without it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, enabled: bool = True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled and maxsize > 0
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Tuple[Hashable, ...]):
+        """Return the cached value or `MISSING`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Tuple[Hashable, ...], value: Any):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *prefix: Hashable):
+        """Drop every entry whose key starts with `prefix`."""
+        size = len(prefix)
+        with self._lock:
+            stale = [key for key in self._entries if key[:size] == prefix]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Keys: ("news", news_id, view), ("news_list", skip, limit, cursor, view),
+# ("summary", summary_id). Values are conditional.Representation objects
+# (response schemas plus validators), never ORM objects, so nothing cached is
+# tied to the session that loaded it.
+news_cache = TTLCache(
+    maxsize=config.NEWS_CACHE_SIZE,
+    ttl=config.NEWS_CACHE_TTL,
+    enabled=config.NEWS_CACHE_ENABLED,
+)
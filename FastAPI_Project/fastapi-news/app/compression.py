@@ -0,0 +1,118 @@
+import gzip
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+# Bodies that are already compressed, or that must reach the client as they are produced.
+SKIP_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+def negotiate(accept_encoding: str):
+    """
+    Pick "br" or "gzip" from an Accept-Encoding header, or None for
+    identity: the accepted coding of highest quality, brotli on a tie.
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    def quality(coding):
+        return qualities.get(coding, qualities.get("*", 0.0))
+
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best = max(offered, key=quality)
+    return best if quality(best) > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    Brotli / gzip compression of complete response bodies of at least
+    `minimum_size` bytes.
+
+    Streamed responses (more than one body message, e.g. NDJSON or SSE) pass
+    through untouched so they are never buffered. A strong ETag is weakened on
+    compressed responses, as the bytes differ per encoding; the app's
+    If-None-Match check uses weak comparison, so revalidation keeps working.
+
+    Bodies of at least `thread_size` bytes are compressed in a worker thread,
+    so a large page does not stall the event loop for the other requests.
+    """
+
+    def __init__(
+        self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4, thread_size: int = 64 * 1024,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_size = thread_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or headers.get("content-type", "").startswith(SKIP_CONTENT_TYPES)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= self.thread_size:
+                body = await anyio.to_thread.run_sync(self.compress, body, encoding)
+            else:
+                body = self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
@@ -0,0 +1,93 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, NamedTuple, Optional
+
+from fastapi import Request, Response
+
+from . import schemas
+
+
+class Representation(NamedTuple):
+    """A validated response body together with its validators."""
+    body: Any
+    etag: str
+    last_modified: Optional[datetime] = None
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the given values, e.g. the columns a response is built from."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(repr(part).encode())
+        digest.update(b"\x1f")
+    return f'"{digest.hexdigest()}"'
+
+
+def _row_parts(row, *columns):
+    return (None,) if row is None else tuple(getattr(row, column) for column in columns)
+
+
+def news_etag(news, view: schemas.NewsView) -> str:
+    """ETag of one article as rendered by `view`, computed from the loaded row."""
+    if view == schemas.NewsView.compact:
+        return make_etag(view.value, news.id, news.title, news.link, news.datetime)
+    return make_etag(
+        view.value, news.id, news.title, news.link, news.datetime, news.body,
+        _row_parts(news.category, "id", "name", "description"),
+        _row_parts(news.reporter, "id", "name", "email"),
+        _row_parts(news.publisher, "id", "name", "email", "website"),
+    )
+
+
+def summary_etag(summary) -> str:
+    return make_etag(summary.id, summary.news_id, summary.summary_text)
+
+
+def http_date(value: datetime) -> str:
+    # Stored datetimes are naive; they are only ever compared with values we sent.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison function (RFC 9110 13.1.2).
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def is_not_modified(request: Request, representation: Representation) -> bool:
+    """True when the client's validators show it already holds `representation`."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, representation.etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or representation.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    last_modified = representation.last_modified
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution.
+    return last_modified.replace(microsecond=0) <= since
+
+
+def validator_headers(representation: Representation) -> dict:
+    headers = {"ETag": representation.etag}
+    if representation.last_modified is not None:
+        headers["Last-Modified"] = http_date(representation.last_modified)
+    return headers
+
+
+def not_modified(representation: Representation, headers: Optional[dict] = None) -> Response:
+    """An empty 304 carrying the validators, so the body is never serialized."""
+    return Response(status_code=304, headers={**validator_headers(representation), **(headers or {})})
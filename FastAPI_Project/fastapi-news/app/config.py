@@ -0,0 +1,120 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off", "")
+
+
+# Clients and caches lifespan.warm_up prepares before the first request, as a
+# comma-separated subset of "db", "dimensions", "scraper" and "llm". Anything
+# not listed is created on first use instead.
+APP_WARMUP = [name.strip() for name in os.getenv("APP_WARMUP", "db,dimensions").split(",") if name.strip()]
+
+# Serve requests from an asyncio engine (aiomysql) instead of running the
+# blocking mysqlconnector engine in the threadpool. See app/async_crud.py.
+DB_ASYNC = env_bool("DB_ASYNC", True)
+
+# Connection pool of both engines (see app/pool.py). Recycle well below
+# MySQL's wait_timeout so the server never closes a pooled connection first.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = env_bool("DB_POOL_PRE_PING", True)
+
+# Read-through cache for news and summary reads (see app/cache.py).
+NEWS_CACHE_ENABLED = env_bool("NEWS_CACHE_ENABLED", True)
+NEWS_CACHE_SIZE = int(os.getenv("NEWS_CACHE_SIZE", "1024"))
+NEWS_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "300"))
+
+# Response compression (see app/compression.py). Brotli is offered only when
+# the brotli package is installed; quality 4 compresses about as fast as gzip
+# level 6 while producing noticeably smaller article pages. Bodies of at least
+# COMPRESSION_THREAD_SIZE bytes are compressed off the event loop.
+COMPRESSION_ENABLED = env_bool("COMPRESSION_ENABLED", True)
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_THREAD_SIZE = int(os.getenv("COMPRESSION_THREAD_SIZE", str(64 * 1024)))
+
+# POST /news/scrape/ fetches pages concurrently (see scraper.fetch_pages);
+# the per-host limit keeps a batch from hammering a single publisher.
+SCRAPER_MAX_WORKERS = int(os.getenv("SCRAPER_MAX_WORKERS", "16"))
+SCRAPER_PER_HOST_LIMIT = int(os.getenv("SCRAPER_PER_HOST_LIMIT", "4"))
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "30"))
+
+# Scrape jobs extract articles in a process pool of this size (0: on the
+# fetch threads) and keep at most SCRAPER_PIPELINE_DEPTH URLs between fetch
+# and insert (see scraper.scrape_pages). With a single core the pool only
+# adds pickling, so it defaults to one process per core from two cores up.
+_cpus = os.cpu_count() or 1
+SCRAPER_PARSE_PROCESSES = int(os.getenv("SCRAPER_PARSE_PROCESSES", str(_cpus if _cpus > 1 else 0)))
+SCRAPER_PIPELINE_DEPTH = int(os.getenv("SCRAPER_PIPELINE_DEPTH", "32"))
+
+# Background scrape jobs (see app/jobs.py), SCRAPE_WORKERS threads per
+# process. Items are fetched and stored SCRAPE_JOB_BATCH URLs at a time. A
+# running job without a heartbeat for SCRAPE_JOB_LEASE seconds is claimed
+# again, and one claimed SCRAPE_JOB_MAX_ATTEMPTS times is marked failed.
+SCRAPE_WORKERS = int(os.getenv("SCRAPE_WORKERS", "2"))
+SCRAPE_JOB_BATCH = int(os.getenv("SCRAPE_JOB_BATCH", "20"))
+SCRAPE_JOB_POLL_INTERVAL = float(os.getenv("SCRAPE_JOB_POLL_INTERVAL", "5"))
+SCRAPE_JOB_LEASE = float(os.getenv("SCRAPE_JOB_LEASE", "300"))
+SCRAPE_JOB_MAX_ATTEMPTS = int(os.getenv("SCRAPE_JOB_MAX_ATTEMPTS", "3"))
+
+# Article extraction backend: "lxml" (precompiled XPath) or "bs4", the
+# original BeautifulSoup code kept as the reference implementation.
+SCRAPER_PARSER = os.getenv("SCRAPER_PARSER", "lxml")
+
+# Name -> id cache of the category, reporter and publisher tables (see
+# app/dimensions.py). Names beyond the size limit are looked up every time.
+DIMENSION_CACHE_ENABLED = env_bool("DIMENSION_CACHE_ENABLED", True)
+DIMENSION_CACHE_SIZE = int(os.getenv("DIMENSION_CACHE_SIZE", "10000"))
+
+# POST /news/bulk stores records BULK_BATCH_SIZE at a time and reports a
+# single NDJSON line longer than BULK_MAX_RECORD_BYTES as invalid.
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+BULK_MAX_RECORD_BYTES = int(os.getenv("BULK_MAX_RECORD_BYTES", str(8 * 1024 * 1024)))
+
+# POST /summaries/ returns the stored summary of an article whose body and
+# summarization settings (model, prompt, sampling) hash to the same value,
+# instead of calling the LLM again (see app/summaries.py).
+SUMMARY_CACHE_ENABLED = env_bool("SUMMARY_CACHE_ENABLED", True)
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "llama-3.3-70b-versatile")
+
+# Summarization client (see utility.get_llm). GROQ_BASE_URL points it at an
+# OpenAI-compatible stand-in, e.g. benchmarks/fake_llm.py. At most
+# SUMMARY_MAX_CONCURRENCY completions are in flight per process; each
+# attempt may take SUMMARY_TIMEOUT seconds and is retried (429s included,
+# honouring Retry-After) SUMMARY_MAX_RETRIES times. 3-5 bullet points need
+# far fewer than SUMMARY_MAX_TOKENS output tokens.
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+SUMMARY_MAX_CONCURRENCY = int(os.getenv("SUMMARY_MAX_CONCURRENCY", "8"))
+SUMMARY_TIMEOUT = float(os.getenv("SUMMARY_TIMEOUT", "60"))
+SUMMARY_MAX_RETRIES = int(os.getenv("SUMMARY_MAX_RETRIES", "2"))
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "1024"))
+
+# POST /summaries/batch summarizes at most SUMMARY_BATCH_MAX_SIZE articles
+# per request, SUMMARY_BATCH_CONCURRENCY of them at a time (a request may
+# ask for fewer). Calls still share the SUMMARY_MAX_CONCURRENCY limit, so a
+# full batch takes minutes; keep it well within the client's timeout. The
+# summaries are stored SUMMARY_BATCH_INSERT_SIZE at a time as they finish,
+# so a request that dies part way keeps what was already generated.
+SUMMARY_BATCH_MAX_SIZE = int(os.getenv("SUMMARY_BATCH_MAX_SIZE", "500"))
+SUMMARY_BATCH_CONCURRENCY = int(os.getenv("SUMMARY_BATCH_CONCURRENCY", str(SUMMARY_MAX_CONCURRENCY)))
+SUMMARY_BATCH_INSERT_SIZE = int(os.getenv("SUMMARY_BATCH_INSERT_SIZE", "50"))
+
+# Articles estimated above SUMMARY_CHUNK_THRESHOLD tokens (see app/tokens.py)
+# are summarized map-reduce style: chunks of about SUMMARY_CHUNK_TOKENS are
+# summarized in parallel, in at most SUMMARY_CHUNK_MAX_TOKENS each, and the
+# partial summaries merged by one more call (see summaries.plan).
+SUMMARY_CHUNK_THRESHOLD = int(os.getenv("SUMMARY_CHUNK_THRESHOLD", "6000"))
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+SUMMARY_CHUNK_MAX_TOKENS = int(os.getenv("SUMMARY_CHUNK_MAX_TOKENS", "512"))
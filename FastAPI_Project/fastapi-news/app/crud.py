@@ -1,93 +1,535 @@
-from sqlalchemy.orm import Session
-from . import models, schemas
+import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, insert, or_
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, load_only, raiseload, selectinload
+from . import dimensions, models, schemas, pagination, search
+from .cache import news_cache
 
-def get_news(db: Session, news_id: int):
-    return db.query(models.News).filter(models.News.id == news_id).first()
+# Relationships rendered by schemas.News. Loading them up front keeps the
+# number of statements per request constant instead of 1 + 3 * rows.
+NEWS_RELATIONS = (models.News.category, models.News.reporter, models.News.publisher)
 
-def get_news_list(db: Session, skip: int = 0, limit: int = 10):
-    print(db, skip, limit)
-    return db.query(models.News).order_by(models.News.datetime.desc()).offset(skip).limit(limit).all()
 
+def news_detail_options():
+    # A single row: join the three many-to-one tables into the same SELECT.
+    return [joinedload(relation) for relation in NEWS_RELATIONS]
 
-def get_or_create_category(db: Session, name: str, description: str):
-    # print(db, name, description)
-    category = db.query(models.Category).filter(models.Category.name == name).first()
-    # print("DB Response: ", category)
-    if category is None:
-        category = models.Category(name=name, description=description)
-        db.add(category)
-        db.commit()
-        db.refresh(category)
-    return category
-
-def get_or_create_reporter(db: Session, name: str, email: str):
-    reporter = db.query(models.Reporter).filter(models.Reporter.name == name).first()
-    if reporter is None:
-        reporter = models.Reporter(name=name, email=email)
-        db.add(reporter)
-        db.commit()
-        db.refresh(reporter)
-    return reporter
-
-def get_or_create_publisher(db: Session, name: str, website: str):
-    publisher = db.query(models.Publisher).filter(models.Publisher.name == name).first()
-    if publisher is None:
-        publisher = models.Publisher(name=name, website=website)
-        db.add(publisher)
+
+def news_list_options():
+    # A page of rows: keep the paginated SELECT narrow and fetch each related
+    # table once with an IN (...) over the distinct foreign keys.
+    return [selectinload(relation) for relation in NEWS_RELATIONS]
+
+
+def news_compact_options():
+    # schemas.NewsCompact only: the body Text column and the related tables
+    # are never selected, and touching them raises instead of lazy loading.
+    return [
+        load_only(
+            models.News.id, models.News.title, models.News.link, models.News.datetime,
+            raiseload=True,
+        ),
+        raiseload("*"),
+    ]
+
+
+def get_news(db: Session, news_id: int, view: schemas.NewsView = schemas.NewsView.full):
+    options = news_compact_options() if view == schemas.NewsView.compact else news_detail_options()
+    return (
+        db.query(models.News)
+        .options(*options)
+        .filter(models.News.id == news_id)
+        .first()
+    )
+
+def keyset_filter(news_datetime, news_id: int):
+    """
+    Rows that come strictly after (news_datetime, news_id) in
+    (datetime DESC, id DESC) order, written so the leading `datetime <=`
+    bound lets the database seek into ix_news_datetime_id.
+
+    NULL datetimes sort last in descending order on both MySQL and SQLite and
+    are not matched here; `get_news_list` walks that tail by id on its own.
+    """
+    if news_datetime is None:
+        return and_(models.News.datetime.is_(None), models.News.id < news_id)
+    return and_(
+        models.News.datetime <= news_datetime,
+        or_(models.News.datetime < news_datetime, models.News.id < news_id),
+    )
+
+
+def get_news_list(
+    db: Session,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    view: schemas.NewsView = schemas.NewsView.full,
+):
+    """
+    Newest news first. With `cursor` the page starts right after the position
+    it encodes and `skip` is ignored, so every page costs the same index range
+    scan; without it the classic OFFSET pagination is used.
+    """
+    options = news_compact_options() if view == schemas.NewsView.compact else news_list_options()
+    query = (
+        db.query(models.News)
+        .options(*options)
+        .order_by(models.News.datetime.desc(), models.News.id.desc())
+    )
+    if not cursor:
+        return query.offset(skip).limit(limit).all()
+
+    news_datetime, news_id = pagination.decode_cursor(cursor)
+    news_list = query.filter(keyset_filter(news_datetime, news_id)).limit(limit).all()
+    if news_datetime is not None and len(news_list) < limit:
+        # Ran off the dated rows: continue into the undated tail.
+        news_list += (
+            query.filter(models.News.datetime.is_(None))
+            .limit(limit - len(news_list))
+            .all()
+        )
+    return news_list
+
+
+def next_news_cursor(news_list, limit: int):
+    """Cursor for the page after `news_list`, or None when it was the last one."""
+    if not news_list or len(news_list) < limit:
+        return None
+    last = news_list[-1]
+    return pagination.encode_cursor(last.datetime, last.id)
+
+
+def search_news(
+    db: Session,
+    q: str,
+    skip: int = 0,
+    limit: int = 10,
+    view: schemas.NewsView = schemas.NewsView.full,
+):
+    """
+    News whose title or body contain the words of `q`, best match first.
+
+    On MySQL this is a FULLTEXT natural-language search over the normalized
+    `News.search_text`, ranked by relevance. Other databases (SQLite in tests
+    and benchmarks) fall back to requiring every word, newest first.
+    """
+    words = search.tokenize(q)
+    if not words:
+        return []
+    options = news_compact_options() if view == schemas.NewsView.compact else news_list_options()
+    query = db.query(models.News).options(*options)
+    if db.get_bind().dialect.name == "mysql":
+        relevance = match(models.News.search_text, against=" ".join(words)).in_natural_language_mode()
+        query = query.filter(relevance).order_by(relevance.desc(), models.News.id.desc())
+    else:
+        query = query.filter(
+            *(models.News.search_text.contains(word, autoescape=True) for word in words)
+        ).order_by(models.News.datetime.desc(), models.News.id.desc())
+    return query.offset(skip).limit(limit).all()
+
+
+def backfill_search_text(db: Session, batch_size: int = 500):
+    """Fill `News.search_text` for rows stored before it existed. Returns the number of rows updated."""
+    updated = 0
+    while True:
+        batch = (
+            db.query(models.News.id, models.News.title, models.News.body)
+            .filter(models.News.search_text.is_(None))
+            .order_by(models.News.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            return updated
+        db.bulk_update_mappings(models.News, [
+            {"id": news_id, "search_text": search.search_document(title, body)}
+            for news_id, title, body in batch
+        ])
         db.commit()
-        db.refresh(publisher)
-    return publisher
+        updated += len(batch)
+
+
+def get_or_create_category(db: Session, name: str, description: str) -> int:
+    return dimensions.get_or_create_id(db, models.Category, name, description=description)
+
+def get_or_create_reporter(db: Session, name: str, email: str) -> int:
+    return dimensions.get_or_create_id(db, models.Reporter, name, email=email)
+
+def get_or_create_publisher(db: Session, name: str, website: str) -> int:
+    return dimensions.get_or_create_id(db, models.Publisher, name, website=website)
 
 
 def get_news_existance(db: Session, news_title: str):
     return db.query(models.News).filter(models.News.title == news_title).first()
 
 
+def get_news_by_link(db: Session, link: str):
+    return db.query(models.News).filter(models.News.link == link).first()
+
+
+def get_existing_links(db: Session, links: List[str], chunk_size: int = 1000, locking: bool = False):
+    """
+    Map each of `links` that is already stored to its news id, in one query
+    per `chunk_size` links. A locking read also sees rows committed after
+    this transaction's snapshot was taken (MySQL REPEATABLE READ).
+    """
+    links = list(dict.fromkeys(links))
+    existing = {}
+    for start in range(0, len(links), chunk_size):
+        query = db.query(models.News.link, models.News.id).filter(models.News.link.in_(links[start:start + chunk_size]))
+        if locking:
+            query = query.with_for_update(read=True)
+        existing.update(query.all())
+    return existing
+
+
+def is_duplicate_key(error: IntegrityError) -> bool:
+    """Whether `error` violated a unique index, as opposed to e.g. a foreign key."""
+    orig = error.orig
+    code = getattr(orig, "errno", None) or (orig.args[0] if orig.args else None)
+    return code == 1062 or "UNIQUE constraint failed" in str(orig)
+
+
+def insert_news_rows(db: Session, rows: List[dict]) -> dict:
+    """
+    Insert `rows` of the news table without committing and return {link:
+    news id} of those this statement stored. Rows whose link another
+    transaction stored first are left out; any other error is raised.
+
+    All rows go in with one multi-row INSERT. Only if that hits a duplicate
+    link are they inserted one by one, to tell the winners from the losers.
+    """
+    try:
+        with db.begin_nested():
+            db.execute(insert(models.News), rows)
+    except IntegrityError as e:
+        if not is_duplicate_key(e):
+            raise
+    else:
+        return get_existing_links(db, [row["link"] for row in rows])
+
+    inserted = {}
+    for row in rows:
+        try:
+            with db.begin_nested():
+                result = db.execute(insert(models.News).values(**row))
+        except IntegrityError as e:
+            if not is_duplicate_key(e):
+                raise
+            continue
+        inserted[row["link"]] = result.inserted_primary_key[0]
+    return inserted
+
+
 def create_image(db: Session, news_id: int, url: str):
     db_image = models.Image(news_id=news_id, url=url)
     db.add(db_image)
     db.commit()
     db.refresh(db_image)
+    news_cache.invalidate("news", news_id)
     return db_image
 
+
+def create_images(db: Session, news_id: int, urls: List[str]):
+    """Insert the images of an article in one statement, without committing."""
+    if urls:
+        db.execute(insert(models.Image), [{"news_id": news_id, "url": url} for url in urls])
+
 def create_news(db: Session, news: schemas.NewsCreate):
-    category = get_or_create_category(db, news.news_category, f"{news.news_category} description")
-    reporter = get_or_create_reporter(db, news.news_reporter, f"{news.news_reporter}@gmail.com")
-    publisher = get_or_create_publisher(db, news.news_publisher, f"https://{news.publisher_website}.com")
-    news_exist = get_news_existance(db, news_title=news.title)
+    db_news, _ = create_news_with_status(db, news)
+    return db_news
 
-    print(category.name, reporter.name, publisher.name)
+
+def create_news_with_status(db: Session, news: schemas.NewsCreate):
+    """Like create_news, but returns (news, created); created is False for an existing article."""
+    # Checked first so a known article does not create category, reporter or publisher rows.
+    news_exist = get_news_by_link(db, news.link) or get_news_existance(db, news_title=news.title)
     if news_exist:
-        return news_exist
-
-    db_news = models.News(
-        publisher_website=news.publisher_website,
-        title=news.title,
-        datetime=news.datetime,
-        body=news.body,
-        link = news.link,
-        category_id=category.id,
-        reporter_id=reporter.id,
-        publisher_id=publisher.id
-    )
-    print(db_news)
-    db.add(db_news)
-    db.commit()
-    db.refresh(db_news)
+        return news_exist, False
 
-    for image_url in news.images:
-        create_image(db, news_id=db_news.id, url=image_url)
+    # The article, its new category/reporter/publisher rows and its images
+    # are written in one transaction; flush() hands out the ids in between.
+    try:
+        category_id = get_or_create_category(db, news.news_category, f"{news.news_category} description")
+        reporter_id = get_or_create_reporter(db, news.news_reporter, f"{news.news_reporter}@gmail.com")
+        publisher_id = get_or_create_publisher(db, news.news_publisher, f"https://{news.publisher_website}.com")
 
-    return db_news
+        db_news = models.News(
+            publisher_website=news.publisher_website,
+            title=news.title,
+            datetime=news.datetime,
+            body=news.body,
+            link = news.link,
+            search_text=search.search_document(news.title, news.body),
+            category_id=category_id,
+            reporter_id=reporter_id,
+            publisher_id=publisher_id
+        )
+        db.add(db_news)
+        db.flush()
+        create_images(db, db_news.id, news.images)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # Any cached page may now be missing this article; single articles are unaffected.
+    news_cache.invalidate("news_list")
+
+    return db_news, True
+
+
+def bulk_create_news(db: Session, records: List[Tuple[int, schemas.NewsCreate]]):
+    """
+    Store a batch of (line, article) pairs in one transaction and return an
+    outcome dict per record: created or duplicate, with the news id.
+
+    Articles whose link or title is already stored, or which repeat a link
+    earlier in the batch, are duplicates and left unchanged. The rest go in
+    with insert_news_rows, followed by one INSERT for the images of the
+    rows it stored; a row whose link a concurrent writer stored first is a
+    duplicate of that article.
+    """
+    outcomes = {}
+    fresh = {}
+    repeated = []
+    for line, news in records:
+        if news.link in fresh:
+            repeated.append((line, news.link))
+        else:
+            fresh[news.link] = (line, news)
+    link_ids = {}
+
+    existing = get_existing_links(db, list(fresh))
+    titles = [news.title for _, news in fresh.values()]
+    existing_titles = dict(
+        db.query(models.News.title, models.News.id).filter(models.News.title.in_(titles)).all()
+    ) if titles else {}
+    for link, (line, news) in list(fresh.items()):
+        news_id = existing.get(link) or existing_titles.get(news.title)
+        if news_id is not None:
+            outcomes[line] = {"line": line, "status": "duplicate", "id": news_id}
+            link_ids[link] = news_id
+            del fresh[link]
+
+    rows = []
+    inserted = {}
+    try:
+        for link, (line, news) in fresh.items():
+            rows.append({
+                "publisher_website": news.publisher_website,
+                "title": news.title,
+                "datetime": news.datetime,
+                "body": news.body,
+                "link": link,
+                "search_text": search.search_document(news.title, news.body),
+                "category_id": get_or_create_category(db, news.news_category, f"{news.news_category} description"),
+                "reporter_id": get_or_create_reporter(db, news.news_reporter, f"{news.news_reporter}@gmail.com"),
+                "publisher_id": get_or_create_publisher(db, news.news_publisher, f"https://{news.publisher_website}.com"),
+            })
+        if rows:
+            inserted = insert_news_rows(db, rows)
+            images = [
+                {"news_id": inserted[link], "url": url}
+                for link, (_, news) in fresh.items() if link in inserted
+                for url in news.images
+            ]
+            if images:
+                db.execute(insert(models.Image), images)
+            lost = [link for link in fresh if link not in inserted]
+            link_ids.update(get_existing_links(db, lost, locking=True) if lost else {})
+            link_ids.update(inserted)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
 
+    if rows:
+        news_cache.invalidate("news_list")
+    for link, (line, _) in fresh.items():
+        status = "created" if link in inserted else "duplicate"
+        outcomes[line] = {"line": line, "status": status, "id": link_ids.get(link)}
+    for line, link in repeated:
+        outcomes[line] = {"line": line, "status": "duplicate", "id": link_ids.get(link)}
+    return [outcomes[line] for line, _ in records]
 
-def insert_summary(db: Session, news_id: int, summary_text: str):
-    db_summary = models.Summary(news_id=news_id, summary_text=summary_text)
+
+def insert_summary(db: Session, news_id: int, summary_text: str, content_hash: Optional[str] = None, metrics: Optional[dict] = None):
+    db_summary = models.Summary(news_id=news_id, summary_text=summary_text, content_hash=content_hash, **(metrics or {}))
     db.add(db_summary)
     db.commit()
     db.refresh(db_summary)
+    news_cache.invalidate("summary", db_summary.id)
     return db_summary
 
 
 def get_summary(db: Session, summary_id: int):
-    return db.query(models.Summary).filter(models.Summary.id == summary_id).first()
\ No newline at end of file
+    return db.query(models.Summary).filter(models.Summary.id == summary_id).first()
+
+
+def get_news_bodies(db: Session, news_ids: List[int]) -> dict:
+    """{id: body} of the articles among `news_ids` that exist."""
+    return dict(db.query(models.News.id, models.News.body).filter(models.News.id.in_(news_ids)).all())
+
+
+def get_unsummarized_news_bodies(db: Session, since: datetime.datetime, limit: int) -> dict:
+    """{id: body} of the oldest `limit` articles published since `since` that have no summary."""
+    summarized = db.query(models.Summary.id).filter(models.Summary.news_id == models.News.id).exists()
+    rows = (
+        db.query(models.News.id, models.News.body)
+        .filter(models.News.datetime >= since, ~summarized)
+        .order_by(models.News.datetime, models.News.id)
+        .limit(limit)
+        .all()
+    )
+    return dict(rows)
+
+
+def get_summary_ids_by_hash(db: Session, content_hashes: dict) -> dict:
+    """
+    {news_id: summary id} of the newest stored summary of each article in
+    `content_hashes` ({news_id: content hash}) generated from that content.
+    """
+    if not content_hashes:
+        return {}
+    rows = (
+        db.query(models.Summary.id, models.Summary.news_id, models.Summary.content_hash)
+        .filter(
+            models.Summary.news_id.in_(list(content_hashes)),
+            models.Summary.content_hash.in_(set(content_hashes.values())),
+        )
+        .order_by(models.Summary.id)
+        .all()
+    )
+    return {
+        news_id: summary_id for summary_id, news_id, content_hash in rows if content_hashes[news_id] == content_hash
+    }
+
+
+def insert_summaries(db: Session, summaries: List[dict]) -> dict:
+    """
+    Store `summaries` (news_id, summary_text, content_hash and the
+    SummaryRun.metrics columns each) with one multi-row INSERT. Returns
+    {news_id: summary id}.
+    """
+    if not summaries:
+        return {}
+    try:
+        db.execute(insert(models.Summary), summaries)
+        ids = get_summary_ids_by_hash(db, {row["news_id"]: row["content_hash"] for row in summaries})
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return ids
+
+
+def get_summary_by_hash(db: Session, news_id: int, content_hash: str):
+    """The newest summary of `news_id` generated from content hashing to `content_hash`."""
+    return (
+        db.query(models.Summary)
+        .filter(models.Summary.news_id == news_id, models.Summary.content_hash == content_hash)
+        .order_by(models.Summary.id.desc())
+        .first()
+    )
+
+def create_scrape_job(db: Session, urls: List[str]):
+    """
+    Queue `urls` for scraping. URLs that are already stored are marked
+    skipped right away and never fetched.
+    """
+    existing = get_existing_links(db, urls)
+    db_job = models.ScrapeJob(status="queued")
+    db_job.items = [
+        models.ScrapeJobItem(position=position, url=url, status="skipped", news_id=existing[url])
+        if url in existing
+        else models.ScrapeJobItem(position=position, url=url)
+        for position, url in enumerate(urls)
+    ]
+    if len(existing) == len(set(urls)):
+        db_job.status, db_job.finished_at = "done", datetime.datetime.now()
+    db.add(db_job)
+    db.commit()
+    return get_scrape_job(db, db_job.id)
+
+
+def get_scrape_job(db: Session, job_id: int):
+    return (
+        db.query(models.ScrapeJob)
+        .options(selectinload(models.ScrapeJob.items))
+        .filter(models.ScrapeJob.id == job_id)
+        .first()
+    )
+
+
+def claim_scrape_job(db: Session, lease_seconds: float, max_attempts: int):
+    """
+    Mark the oldest claimable job running and return its id and attempt
+    number, or None if there is none. A job is claimable while queued, or
+    while running without a heartbeat for `lease_seconds` (its worker died).
+    A job already claimed `max_attempts` times is marked failed instead. The
+    conditional UPDATE makes sure two workers never claim the same job; the
+    attempt number identifies this claim to update_claimed_scrape_job.
+    """
+    now = datetime.datetime.now()
+    job = models.ScrapeJob
+    expired = and_(job.status == "running", job.heartbeat_at < now - datetime.timedelta(seconds=lease_seconds))
+    candidates = (
+        db.query(job.id, job.status, job.heartbeat_at, job.attempts)
+        .filter(or_(job.status == "queued", expired))
+        .order_by(job.id)
+        .limit(10)
+        .all()
+    )
+    for job_id, status, heartbeat_at, attempts in candidates:
+        unchanged = db.query(job).filter(
+            job.id == job_id,
+            job.status == status,
+            job.heartbeat_at.is_(None) if heartbeat_at is None else job.heartbeat_at == heartbeat_at,
+        )
+        if (attempts or 0) >= max_attempts:
+            unchanged.update(
+                {"status": "failed", "finished_at": now, "error": f"gave up after {attempts} attempts"},
+                synchronize_session=False,
+            )
+            db.commit()
+            continue
+        claimed = unchanged.update(
+            {"status": "running", "heartbeat_at": now, "attempts": (attempts or 0) + 1},
+            synchronize_session=False,
+        )
+        db.commit()
+        if claimed:
+            return job_id, (attempts or 0) + 1
+    return None
+
+
+def update_claimed_scrape_job(db: Session, job_id: int, attempts: int, values: dict) -> bool:
+    """
+    Set `values` on a job only while it is still running under the claim
+    that set `attempts`. Returns False when another worker has claimed it
+    since (this worker's lease expired); the caller must then stop working
+    on it. Does not commit.
+    """
+    job = models.ScrapeJob
+    updated = db.query(job).filter(job.id == job_id, job.attempts == attempts, job.status == "running").update(
+        values, synchronize_session=False
+    )
+    return updated == 1
+
+
+def release_scrape_job(db: Session, job_id: int, attempts: int, error: str, max_attempts: int):
+    """
+    Return a job whose run raised to the queue, or mark it failed once it has
+    been tried `max_attempts` times. Returns the new status, or None when
+    the claim that set `attempts` no longer holds the job.
+    """
+    if attempts >= max_attempts:
+        values = {"status": "failed", "finished_at": datetime.datetime.now()}
+    else:
+        values = {"status": "queued", "heartbeat_at": None}
+    released = update_claimed_scrape_job(db, job_id, attempts, {**values, "error": error[:255]})
+    db.commit()
+    return values["status"] if released else None
@@ -1,10 +1,12 @@
 import os
+import threading
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from urllib.parse import quote_plus
 from dotenv import load_dotenv
-# from .models import * 
+from . import pool
+# from .models import *
 
 # Load environment variables
 load_dotenv()
@@ -12,15 +14,77 @@ host=os.getenv("DB_HOST")
 user=os.getenv("DB_USER")
 passwd=os.getenv("DB_PASS")
 database=os.getenv("DB_NAME")
-encoded_passwd = quote_plus(passwd)
+encoded_passwd = quote_plus(passwd or "")
 
 
-SQLALCHEMY_DATABASE_URL = f"mysql+mysqlconnector://{user}:{encoded_passwd}@{host}/{database}"
+# DATABASE_URL / ASYNC_DATABASE_URL override the MySQL URLs, e.g. for benchmarks.
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL") or f"mysql+mysqlconnector://{user}:{encoded_passwd}@{host}/{database}"
+ASYNC_SQLALCHEMY_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or f"mysql+aiomysql://{user}:{encoded_passwd}@{host}/{database}"
 
-print(SQLALCHEMY_DATABASE_URL)
+# The engines (and with them the DB drivers) are only created on first use,
+# or by lifespan.warm_up, so importing the app stays cheap.
+_engines = {}
+_engines_lock = threading.Lock()
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+def get_engine():
+    engine = _engines.get("sync")
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get("sync")
+            if engine is None:
+                engine = create_engine(SQLALCHEMY_DATABASE_URL, **pool.engine_options(SQLALCHEMY_DATABASE_URL))
+                _engines["sync"] = engine
+    return engine
+
+
+def get_async_engine():
+    engine = _engines.get("async")
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get("async")
+            if engine is None:
+                from sqlalchemy.ext.asyncio import create_async_engine
+
+                engine = create_async_engine(
+                    ASYNC_SQLALCHEMY_DATABASE_URL,
+                    **pool.engine_options(ASYNC_SQLALCHEMY_DATABASE_URL, is_async=True),
+                )
+                _engines["async"] = engine
+    return engine
+
+
+def created_engines():
+    """The engines that exist so far, keyed "sync" / "async"."""
+    return dict(_engines)
+
+
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+
 
+def SessionLocal(**kwargs):
+    return _session_factory(bind=get_engine(), **kwargs)
+
+
+_async_session_factory = None
+
+
+def AsyncSessionLocal(**kwargs):
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        # Rows are handed to response serialization after the commit, outside
+        # the session's greenlet, so they must not expire and lazy load there.
+        _async_session_factory = async_sessionmaker(autoflush=False, expire_on_commit=False)
+    return _async_session_factory(bind=get_async_engine(), **kwargs)
+
+
+async def dispose_engines():
+    engines = created_engines()
+    if "sync" in engines:
+        engines["sync"].dispose()
+    if "async" in engines:
+        await engines["async"].dispose()
+
+Base = declarative_base()
@@ -1,4 +1,5 @@
-from .database import SessionLocal
+from . import config
+from .database import AsyncSessionLocal, SessionLocal
 
 def get_db():
     db = SessionLocal()
@@ -6,3 +7,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# The session the routers depend on: an AsyncSession when DB_ASYNC is on,
+# otherwise a plain Session. app.async_crud accepts either.
+get_session = get_async_db if config.DB_ASYNC else get_db
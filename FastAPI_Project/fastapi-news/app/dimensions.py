@@ -0,0 +1,144 @@
+"""
+Name -> id cache for the category, reporter and publisher tables.
+
+Every ingested article needs the ids of its three dimension rows, and those
+tables are tiny and almost never change, so `get_or_create_id` answers from
+memory and only goes to the database for a name it has not seen.
+
+Ids of rows inserted by a transaction are cached only once that
+transaction commits (see the session hooks below), so a rollback never
+leaves the cache pointing at a row that does not exist. Unknown names are
+inserted under a SAVEPOINT; when a concurrent transaction wins the race for
+the unique name, the IntegrityError is absorbed and its row is read back.
+"""
+import threading
+
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import config, models
+
+DIMENSIONS = (models.Category, models.Reporter, models.Publisher)
+
+
+class DimensionCache:
+    """Thread-safe {table: {name: id}} with hit/miss counters per table."""
+
+    def __init__(self, maxsize: int, enabled: bool = True):
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self._ids = {model.__tablename__: {} for model in DIMENSIONS}
+        self._counters = {
+            model.__tablename__: {"hits": 0, "misses": 0, "inserts": 0, "conflicts": 0} for model in DIMENSIONS
+        }
+        self._lock = threading.Lock()
+
+    def get(self, model, name: str):
+        """The cached id of `name`, or None."""
+        table = model.__tablename__
+        with self._lock:
+            dimension_id = self._ids[table].get(name)
+            self._counters[table]["hits" if dimension_id is not None else "misses"] += 1
+            return dimension_id
+
+    def set(self, model, name: str, dimension_id: int):
+        if not self.enabled:
+            return
+        ids = self._ids[model.__tablename__]
+        with self._lock:
+            if name in ids or len(ids) < self.maxsize:
+                ids[name] = dimension_id
+
+    def count(self, model, counter: str):
+        with self._lock:
+            self._counters[model.__tablename__][counter] += 1
+
+    def load(self, model, rows):
+        for name, dimension_id in rows:
+            self.set(model, name, dimension_id)
+
+    def clear(self):
+        with self._lock:
+            for ids in self._ids.values():
+                ids.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {}
+            for table, counters in self._counters.items():
+                lookups = counters["hits"] + counters["misses"]
+                stats[table] = {
+                    "size": len(self._ids[table]),
+                    **counters,
+                    "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+                }
+            return {"enabled": self.enabled, "maxsize": self.maxsize, "tables": stats}
+
+
+dimension_cache = DimensionCache(maxsize=config.DIMENSION_CACHE_SIZE, enabled=config.DIMENSION_CACHE_ENABLED)
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_committed_dimensions(session):
+    # after_commit also fires when a SAVEPOINT is released; those rows are
+    # only durable once the outermost transaction commits.
+    if session.in_nested_transaction():
+        return
+    for model, name, dimension_id in session.info.pop("new_dimensions", ()):
+        dimension_cache.set(model, name, dimension_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_rolled_back_dimensions(session, transaction):
+    # Whatever is still pending when the outermost transaction ends was
+    # rolled back (or closed without a commit).
+    if transaction.parent is None:
+        session.info.pop("new_dimensions", None)
+
+
+def find_id(db: Session, model, name: str, locking: bool = False):
+    query = db.query(model.id).filter(model.name == name)
+    if locking:
+        # A locking read sees rows committed after this transaction's
+        # snapshot was taken (MySQL REPEATABLE READ); SQLite ignores it.
+        query = query.with_for_update(read=True)
+    return query.scalar()
+
+
+def get_or_create_id(db: Session, model, name: str, **fields) -> int:
+    """
+    The id of the `model` row called `name`, inserting it with `fields` if
+    there is none. Nothing is committed.
+    """
+    dimension_id = dimension_cache.get(model, name)
+    if dimension_id is not None:
+        return dimension_id
+
+    dimension_id = find_id(db, model, name)
+    if dimension_id is not None:
+        dimension_cache.set(model, name, dimension_id)
+        return dimension_id
+
+    row = model(name=name, **fields)
+    try:
+        with db.begin_nested():
+            db.add(row)
+    except IntegrityError:
+        dimension_id = find_id(db, model, name, locking=True)
+        if dimension_id is None:
+            # Another unique column (e.g. a reporter's email) clashed.
+            raise
+        dimension_cache.count(model, "conflicts")
+        dimension_cache.set(model, name, dimension_id)
+        return dimension_id
+
+    dimension_cache.count(model, "inserts")
+    db.info.setdefault("new_dimensions", []).append((model, name, row.id))
+    return row.id
+
+
+def warm(db: Session):
+    """Load every dimension row into the cache."""
+    for model in DIMENSIONS:
+        dimension_cache.load(model, db.execute(select(model.name, model.id).limit(dimension_cache.maxsize)))
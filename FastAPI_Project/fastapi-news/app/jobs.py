@@ -0,0 +1,157 @@
+"""
+Background processing of scrape jobs.
+
+POST /news/scrape/ only stores a job and its URLs (crud.create_scrape_job).
+Worker threads started by the lifespan claim queued jobs and run their items
+SCRAPE_JOB_BATCH URLs at a time through scraper.scrape_pages, committing the
+status of every item as they go. The queue lives in the database, so it is
+shared by every process running workers.
+
+A claimed job is leased: its worker refreshes heartbeat_at with every
+commit, and a job whose heartbeat is older than SCRAPE_JOB_LEASE seconds
+(its process died) can be claimed again, resuming with the items that were
+not finished yet. Every commit of a worker only goes through while the job
+is still held by its own claim, so a worker that stalled past its lease
+stops instead of racing the one that took the job over. A job that raises
+is requeued; one claimed SCRAPE_JOB_MAX_ATTEMPTS times ends failed instead
+of looping forever.
+"""
+import datetime
+import threading
+
+from sqlalchemy.exc import IntegrityError
+
+from . import config, crud, models, scraper
+from .database import SessionLocal
+
+FINISHED = ("stored", "duplicate", "failed", "skipped")
+
+_workers = []
+_stop = threading.Event()
+_wake = threading.Event()
+
+
+def notify():
+    """Wake an idle worker instead of letting it wait out the poll interval."""
+    _wake.set()
+
+
+class LeaseLost(Exception):
+    """Another worker claimed the job after this worker's lease expired."""
+
+
+def store_item(db, item, news_data):
+    if news_data is None:
+        item.status, item.error = "failed", "could not parse the page"
+        return
+    try:
+        news, created = crud.create_news_with_status(db, news_data)
+    except IntegrityError as e:
+        db.rollback()
+        # A concurrent writer stored the same link between the check and the insert.
+        existing = crud.get_existing_links(db, [news_data.link], locking=True) if crud.is_duplicate_key(e) else {}
+        if news_data.link in existing:
+            item.status, item.news_id = "duplicate", existing[news_data.link]
+        else:
+            item.status, item.error = "failed", str(e)[:255]
+        return
+    except Exception as e:
+        db.rollback()
+        item.status, item.error = "failed", str(e)[:255]
+        return
+    item.status = "stored" if created else "duplicate"
+    item.news_id = news.id
+
+
+def process_job(session_factory, job_id: int, attempts: int):
+    with session_factory() as db:
+
+        def commit(**values):
+            # Renews the lease together with the item changes, or drops them.
+            values["heartbeat_at"] = datetime.datetime.now()
+            if not crud.update_claimed_scrape_job(db, job_id, attempts, values):
+                db.rollback()
+                raise LeaseLost(f"scrape job {job_id} was claimed again")
+            db.commit()
+
+        while True:
+            items = (
+                db.query(models.ScrapeJobItem)
+                .filter(models.ScrapeJobItem.job_id == job_id, models.ScrapeJobItem.status.notin_(FINISHED))
+                .order_by(models.ScrapeJobItem.position)
+                .limit(config.SCRAPE_JOB_BATCH)
+                .all()
+            )
+            if not items:
+                break
+
+            # Another job may have stored some of these since this one was queued.
+            existing = crud.get_existing_links(db, [item.url for item in items])
+            for item in items:
+                if item.url in existing:
+                    item.status, item.news_id = "skipped", existing[item.url]
+            items = [item for item in items if item.url not in existing]
+            urls = [item.url for item in items]
+            commit()
+
+            # Fetching and parsing of the next items overlap with storing this one.
+            for item, result in zip(items, scraper.scrape_pages(urls)):
+                if not result.fetched:
+                    item.status, item.error = "failed", "could not fetch the page"
+                    commit()
+                    continue
+                item.status = "fetched"
+                commit()
+                store_item(db, item, result.news)
+                commit()
+
+        commit(status="done", finished_at=datetime.datetime.now())
+
+
+def run_next_job(session_factory=SessionLocal):
+    """Claim and process the oldest claimable job. Returns its id, or None if there was none."""
+    with session_factory() as db:
+        claim = crud.claim_scrape_job(db, config.SCRAPE_JOB_LEASE, config.SCRAPE_JOB_MAX_ATTEMPTS)
+    if claim is None:
+        return None
+    job_id, attempts = claim
+    try:
+        process_job(session_factory, job_id, attempts)
+    except LeaseLost as e:
+        print(f"Stopped working on scrape job {job_id}: {e}")
+    except Exception as e:
+        with session_factory() as db:
+            status = crud.release_scrape_job(
+                db, job_id, attempts, str(e) or type(e).__name__, config.SCRAPE_JOB_MAX_ATTEMPTS
+            )
+        print(f"Scrape job {job_id} failed, now {status}: {e}")
+    return job_id
+
+
+def worker_loop():
+    while not _stop.is_set():
+        try:
+            job_id = run_next_job()
+        except Exception as e:
+            # E.g. the database is unreachable; a claimed job's lease expires.
+            print(f"Scrape worker failed: {e}")
+            job_id = None
+        if job_id is None:
+            _wake.wait(config.SCRAPE_JOB_POLL_INTERVAL)
+            _wake.clear()
+
+
+def start_workers(count: int):
+    _stop.clear()
+    for number in range(count):
+        worker = threading.Thread(target=worker_loop, name=f"scrape-worker-{number}", daemon=True)
+        worker.start()
+        _workers.append(worker)
+
+
+def stop_workers(timeout: float = 5):
+    _stop.set()
+    _wake.set()
+    for worker in _workers:
+        worker.join(timeout)
+    _workers.clear()
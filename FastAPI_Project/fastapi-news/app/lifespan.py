@@ -0,0 +1,74 @@
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from . import config, database, dimensions, jobs, scraper, utility
+
+
+async def warm_db():
+    # Creating the engine imports the driver; the first checkout opens a pooled connection.
+    if config.DB_ASYNC:
+        async with database.get_async_engine().connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    else:
+        with database.get_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+
+async def warm_dimensions():
+    if config.DB_ASYNC:
+        async with database.AsyncSessionLocal() as db:
+            await db.run_sync(dimensions.warm)
+    else:
+        def warm():
+            with database.SessionLocal() as db:
+                dimensions.warm(db)
+
+        await run_in_threadpool(warm)
+
+
+async def warm_scraper():
+    scraper.get_scraper()
+
+
+async def warm_llm():
+    utility.get_llm()
+
+
+WARMUPS = {
+    "db": warm_db,
+    "dimensions": warm_dimensions,
+    "scraper": warm_scraper,
+    "llm": warm_llm,
+}
+
+
+async def warm_up(names):
+    """Create the named clients now instead of on the first request that needs them."""
+    for name in names:
+        started = time.perf_counter()
+        try:
+            await WARMUPS[name]()
+        except Exception as e:
+            # A cold client is created again on first use; do not refuse to start.
+            print(f"Warm-up of {name} failed: {e}")
+            continue
+        print(f"Warmed up {name} in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up(config.APP_WARMUP)
+    if config.SCRAPE_WORKERS:
+        try:
+            await run_in_threadpool(jobs.start_workers, config.SCRAPE_WORKERS)
+        except Exception as e:
+            print(f"Could not start the scrape workers: {e}")
+    yield
+    await run_in_threadpool(jobs.stop_workers)
+    scraper.shutdown_executors()
+    await utility.close_llm()
+    await database.dispose_engines()
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.sql import func
 from .database import Base
 
 class News(Base):
@@ -10,6 +11,8 @@ class News(Base):
     title = Column(String(255), index=True)
     body = Column(Text)
     link = Column(String(255))
+    # search.search_document(title, body); only read by MATCH ... AGAINST.
+    search_text = deferred(Column(Text(16777215)))
     
     category_id = Column(Integer, ForeignKey('categories.id'))
     reporter_id = Column(Integer, ForeignKey('reporters.id'))
@@ -19,6 +22,14 @@ class News(Base):
     reporter = relationship("Reporter")
     publisher = relationship("Publisher")
 
+    __table_args__ = (
+        # Backs the (datetime, id) ordering used by keyset pagination.
+        Index("ix_news_datetime_id", "datetime", "id"),
+        # One row per article URL; also serves crud.get_existing_links.
+        Index("ux_news_link", "link", unique=True),
+        Index("ix_news_search_text", "search_text", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+
     # @property
     # def category_name(self):
     #     return self.category.name if self.category else None
@@ -62,4 +73,42 @@ class Summary(Base):
     __tablename__ = "summaries"
     id = Column(Integer, primary_key=True, index=True)
     news_id = Column(Integer, ForeignKey('news.id'))
-    summary_text = Column(Text)
\ No newline at end of file
+    summary_text = Column(Text)
+    # summaries.content_hash(body); NULL for summaries stored before it existed.
+    content_hash = Column(String(64))
+    # How it was generated (summaries.SummaryRun.metrics); NULL for older summaries.
+    strategy = Column(String(10))
+    llm_calls = Column(Integer)
+    prompt_tokens = Column(Integer)
+    completion_tokens = Column(Integer)
+    latency_ms = Column(Integer)
+
+    __table_args__ = (
+        # Serves crud.get_summary_by_hash.
+        Index("ix_summaries_news_id_content_hash", "news_id", "content_hash"),
+    )
+
+class ScrapeJob(Base):
+    __tablename__ = "scrape_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    # queued -> running -> done | failed; see app/jobs.py
+    status = Column(String(20), index=True, default="queued")
+    created_at = Column(DateTime, server_default=func.now())
+    finished_at = Column(DateTime, nullable=True)
+    # Claims so far, and the last sign of life of the worker running it.
+    attempts = Column(Integer, default=0)
+    heartbeat_at = Column(DateTime, nullable=True)
+    error = Column(String(255), nullable=True)
+
+    items = relationship("ScrapeJobItem", order_by="ScrapeJobItem.position")
+
+class ScrapeJobItem(Base):
+    __tablename__ = "scrape_job_items"
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey('scrape_jobs.id'), index=True)
+    position = Column(Integer)
+    url = Column(String(2048))
+    # skipped (already stored when queued), or pending -> fetched -> stored | duplicate | failed
+    status = Column(String(20), default="pending")
+    news_id = Column(Integer, ForeignKey('news.id'), nullable=True)
+    error = Column(String(255), nullable=True)
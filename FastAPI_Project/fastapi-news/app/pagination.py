@@ -0,0 +1,25 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+def encode_cursor(news_datetime: Optional[datetime], news_id: int) -> str:
+    """Pack the (datetime, id) position of the last row of a page into an opaque token."""
+    position = [news_datetime.isoformat() if news_datetime else None, news_id]
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Inverse of `encode_cursor`. Raises ValueError for anything it did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        news_datetime, news_id = json.loads(raw)
+        if news_datetime is not None:
+            news_datetime = datetime.fromisoformat(news_datetime)
+        if not isinstance(news_id, int):
+            raise TypeError(news_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    return news_datetime, news_id
@@ -0,0 +1,99 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from . import config
+
+
+class CheckoutStats:
+    """Running totals of how long callers waited to get a connection from a pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_total_ms": self.total_wait * 1000,
+                "checkout_wait_avg_ms": self.total_wait * 1000 / attempts if attempts else 0.0,
+                "checkout_wait_max_ms": self.max_wait * 1000,
+            }
+
+
+class _InstrumentedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    # Pool.connect() is the single entry point used by the engine; timing it
+    # covers queueing for a free slot, opening new connections and pre-ping.
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.checkout_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.checkout_stats.record(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """create_engine() pool arguments taken from the DB_POOL_* settings."""
+    if make_url(url).get_backend_name() == "sqlite":
+        # SQLite stand-ins (tests, benchmarks) keep SQLAlchemy's own pool choice.
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+
+
+def pool_status(engine) -> dict:
+    """Current occupancy of `engine`'s pool plus its checkout wait totals."""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            # QueuePool counts overflow from -size while the pool is filling.
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    if isinstance(pool, _InstrumentedPoolMixin):
+        status.update(pool.checkout_stats.as_dict())
+    return status
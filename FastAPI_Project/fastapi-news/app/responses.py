@@ -0,0 +1,15 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON rendered by orjson: UTF-8 output without escaping the Bengali text,
+    and several times faster than the stdlib encoder on article bodies.
+    FastAPI has already turned the response model into JSON-compatible data.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,48 @@
+from fastapi import APIRouter
+from .. import config, database, pool
+from ..dimensions import dimension_cache
+from ..cache import news_cache
+from ..summaries import summary_stats
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+)
+
+
+@router.get("/cache")
+def read_cache_stats():
+    """
+    Hit, miss and eviction counters of the news/summary read cache.
+    """
+    return news_cache.stats()
+
+
+@router.get("/dimensions")
+def read_dimension_cache_stats():
+    """
+    Size, hit rate, inserts and lost insert races of the category, reporter
+    and publisher name -> id cache.
+    """
+    return dimension_cache.stats()
+
+
+@router.get("/summaries")
+def read_summary_stats():
+    """
+    Stored summaries reused by POST /summaries/, LLM calls made and the LLM
+    calls (and seconds) saved.
+    """
+    return summary_stats.stats()
+
+
+@router.get("/pool")
+def read_pool_stats():
+    """
+    Checked-out connections, overflow and checkout wait times of the
+    connection pools the routers draw from.
+    """
+    stats = {"sync": pool.pool_status(database.get_engine())}
+    if config.DB_ASYNC:
+        stats["async"] = pool.pool_status(database.get_async_engine().sync_engine)
+    return stats
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from .. import crud, models, schemas, dependencies, scraper
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from typing import List, Optional, Union
+import orjson
+from pydantic import ValidationError
+from .. import async_crud, config, crud, models, schemas, dependencies, jobs, conditional
+from ..cache import news_cache, MISSING
 
 router = APIRouter(
     prefix="/news",
@@ -12,16 +14,72 @@ router = APIRouter(
 # def create_news(news: schemas.NewsCreate, db: Session = Depends(dependencies.get_db)):
 #     return crud.create_news(db=db, news=news)
 
-@router.get("/", response_model=List[schemas.News])
-def read_news_list(skip: int = 0, limit: int = 10, db: Session = Depends(dependencies.get_db)):
+def news_response(news, view: schemas.NewsView):
+    # Validated up front so the result can be cached; the ORM rows of a
+    # compact view also refuse to load the columns schemas.News would ask for.
+    if view == schemas.NewsView.compact:
+        return schemas.NewsCompact.model_validate(news)
+    return schemas.News.model_validate(news)
+
+
+# No Last-Modified: news.datetime is the publication date, not the time the
+# row last changed (an edit keeps it, and it is stored without a time zone).
+# An article inserted into or back-dated onto a page also changes the page
+# without raising its newest publication date. Only the ETag tells whether a
+# response is unchanged.
+def news_representation(news, view: schemas.NewsView):
+    return conditional.Representation(
+        body=news_response(news, view),
+        etag=conditional.news_etag(news, view),
+    )
+
+
+def news_list_representation(news_list, view: schemas.NewsView, next_cursor: Optional[str]):
+    return conditional.Representation(
+        body=[news_response(news, view) for news in news_list],
+        etag=conditional.make_etag(next_cursor, *(conditional.news_etag(news, view) for news in news_list)),
+    )
+
+
+@router.get("/", response_model=Union[List[schemas.News], List[schemas.NewsCompact]])
+async def read_news_list(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    view: schemas.NewsView = schemas.NewsView.full,
+    db=Depends(dependencies.get_session),
+):
     """
     Return all news from the database.
+
+    Pass the `X-Next-Cursor` header of a response back as `cursor` to fetch the
+    following page; unlike `skip`, this costs the same at any depth.
+    `view=compact` returns only id, title, link and datetime and never reads
+    the article body from the database.
+    Responses carry an ETag; a matching `If-None-Match` gets an empty 304.
     """
 
-    news_list = crud.get_news_list(db=db, skip=skip, limit=limit)
-    if news_list is None:
-        raise HTTPException(status_code=404, detail="News not found")
-    return news_list
+    key = ("news_list", skip, limit, cursor, view)
+    page = news_cache.get(key)
+    if page is MISSING:
+        try:
+            news_list = await async_crud.get_news_list(db=db, skip=skip, limit=limit, cursor=cursor, view=view)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if news_list is None:
+            raise HTTPException(status_code=404, detail="News not found")
+        next_cursor = crud.next_news_cursor(news_list, limit)
+        page = (news_list_representation(news_list, view, next_cursor), next_cursor)
+        news_cache.set(key, page)
+
+    representation, next_cursor = page
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if conditional.is_not_modified(request, representation):
+        return conditional.not_modified(representation, headers)
+    response.headers.update({**conditional.validator_headers(representation), **headers})
+    return representation.body
     
     # return [
     #     schemas.News(
@@ -38,13 +96,43 @@ def read_news_list(skip: int = 0, limit: int = 10, db: Session = Depends(depende
     # ]
 
 
-@router.get("/{news_id}", response_model=schemas.News)
-def read_news(news_id: int, db: Session = Depends(dependencies.get_db)):
-    news = crud.get_news(db, news_id=news_id)
+@router.get("/search", response_model=Union[List[schemas.News], List[schemas.NewsCompact]])
+async def search_news(
+    q: str,
+    skip: int = 0,
+    limit: int = 10,
+    view: schemas.NewsView = schemas.NewsView.full,
+    db=Depends(dependencies.get_session),
+):
+    """
+    Full-text search over news titles and bodies, best match first.
+    """
+    news_list = await async_crud.search_news(db, q=q, skip=skip, limit=limit, view=view)
+    return [news_response(news, view) for news in news_list]
+
+
+@router.get("/{news_id}", response_model=Union[schemas.News, schemas.NewsCompact])
+async def read_news(
+    request: Request,
+    response: Response,
+    news_id: int,
+    view: schemas.NewsView = schemas.NewsView.full,
+    db=Depends(dependencies.get_session),
+):
+    key = ("news", news_id, view)
+    representation = news_cache.get(key)
+    if representation is MISSING:
+        news = await async_crud.get_news(db, news_id=news_id, view=view)
 
-    if news is None:
-        raise HTTPException(status_code=404, detail="News not found")
-    return news
+        if news is None:
+            raise HTTPException(status_code=404, detail="News not found")
+        representation = news_representation(news, view)
+        news_cache.set(key, representation)
+
+    if conditional.is_not_modified(request, representation):
+        return conditional.not_modified(representation)
+    response.headers.update(conditional.validator_headers(representation))
+    return representation.body
     # return schemas.News(
     #     id=news.id,
     #     title=news.title,
@@ -58,11 +146,102 @@ def read_news(news_id: int, db: Session = Depends(dependencies.get_db)):
 
 
 
-@router.post("/scrape/", response_model=List[schemas.News])
-def scrape_news(urls: List[str], db: Session = Depends(dependencies.get_db)):
-    all_inserted_news = []
-    for url in urls:
-        inserted_news = scraper.scrape_and_store_news(url, db)
-        all_inserted_news.append(inserted_news)
-    return all_inserted_news
-    # return {"message": "News scraping initiated"}
+def invalid_record(line: int, error: ValidationError):
+    first = error.errors(include_url=False)[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return {"line": line, "status": "invalid", "error": f"{location}: {first['msg']}" if location else first["msg"]}
+
+
+@router.post("/bulk", response_class=Response, responses={200: {"content": {"application/x-ndjson": {}}}})
+async def bulk_create_news(request: Request, db=Depends(dependencies.get_session)):
+    """
+    Store articles sent as NDJSON, one `NewsCreate` object per line.
+
+    The body is read and validated as it arrives and stored in batches of
+    BULK_BATCH_SIZE. The response has one NDJSON line per input line, e.g.
+    `{"line": 3, "status": "created", "id": 42}`; status is created,
+    duplicate (the id of the stored article) or invalid (with an error). A
+    line longer than BULK_MAX_RECORD_BYTES is invalid and skipped without
+    being buffered, so the outcomes of the batches already stored are still
+    reported.
+    """
+    outcomes = []
+    batch = []
+    line_number = 0
+    # Skipping the rest of an over-long line.
+    discarding = False
+
+    async def store_batch():
+        outcomes.extend(await async_crud.bulk_create_news(db, list(batch)))
+        batch.clear()
+
+    async def handle(line: bytes):
+        nonlocal line_number
+        line_number += 1
+        if not line.strip():
+            return
+        try:
+            news = schemas.NewsCreate.model_validate_json(line)
+        except ValidationError as e:
+            outcomes.append(invalid_record(line_number, e))
+            return
+        batch.append((line_number, news))
+        if len(batch) >= config.BULK_BATCH_SIZE:
+            await store_batch()
+
+    def too_long():
+        nonlocal line_number
+        line_number += 1
+        outcomes.append({
+            "line": line_number, "status": "invalid",
+            "error": f"line is longer than {config.BULK_MAX_RECORD_BYTES} bytes",
+        })
+
+    buffer = b""
+    async for chunk in request.stream():
+        if discarding:
+            end = chunk.find(b"\n")
+            if end < 0:
+                continue
+            discarding, chunk = False, chunk[end + 1:]
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if len(line) > config.BULK_MAX_RECORD_BYTES:
+                too_long()
+            else:
+                await handle(line)
+        if len(buffer) > config.BULK_MAX_RECORD_BYTES:
+            too_long()
+            buffer, discarding = b"", True
+    if not discarding:
+        await handle(buffer)
+    if batch:
+        await store_batch()
+
+    outcomes.sort(key=lambda outcome: outcome["line"])
+    return Response(b"".join(orjson.dumps(outcome) + b"\n" for outcome in outcomes), media_type="application/x-ndjson")
+
+
+@router.post("/scrape/", response_model=schemas.ScrapeJob, status_code=202)
+async def scrape_news(urls: List[str], db=Depends(dependencies.get_session)):
+    """
+    Queue the given article URLs for scraping and return the job right away.
+    Follow its progress at `GET /news/scrape/jobs/{job_id}`.
+    """
+    # A longer URL could never be stored as the article's link.
+    max_length = models.News.link.type.length
+    too_long = [url for url in urls if len(url) > max_length]
+    if too_long:
+        raise HTTPException(status_code=422, detail=f"URLs may be at most {max_length} characters: {too_long[0][:80]}...")
+    job = await async_crud.create_scrape_job(db, urls)
+    jobs.notify()
+    return job
+
+
+@router.get("/scrape/jobs/{job_id}", response_model=schemas.ScrapeJob)
+async def read_scrape_job(job_id: int, db=Depends(dependencies.get_session)):
+    job = await async_crud.get_scrape_job(db, job_id=job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    return job
@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from .. import crud, schemas, dependencies, utility
+import time
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from .. import async_crud, config, schemas, dependencies, utility, conditional, summaries, tokens
+from ..cache import news_cache, MISSING
+from ..summaries import summary_stats
 
 router = APIRouter(
     prefix="/summaries",
@@ -8,24 +13,191 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=schemas.Summary)
-def create_summary(summary: schemas.SummaryFast, db: Session = Depends(dependencies.get_db)):
+async def create_summary(summary: schemas.SummaryFast, response: Response, db=Depends(dependencies.get_session)):
     news_id = summary.news_id
-    news_body = crud.get_news(db, news_id=news_id).body
-    # summary_text = summary.summary_text
+    news = await async_crud.get_news(db, news_id=news_id)
+    if news is None:
+        raise HTTPException(status_code=404, detail="News not found")
+    news_body = news.body
+    content_hash = summaries.content_hash(news_body)
 
-    summary_text = utility.generate_summary(news_body)
+    if config.SUMMARY_CACHE_ENABLED and not summary.force:
+        db_summary = await async_crud.get_summary_by_hash(db, news_id=news_id, content_hash=content_hash)
+        if db_summary is not None:
+            summary_stats.hit()
+            response.headers["X-Summary-Cache"] = "hit"
+            return db_summary
 
+    # No connection is held while the request waits for the LLM.
+    await async_crud.end_transaction(db)
+    run = await summaries.summarize(news_body)
+    summary_stats.generated(run, forced=summary.force)
+    response.headers["X-Summary-Cache"] = "refresh" if summary.force else "miss"
 
-    return crud.insert_summary(db=db, news_id=news_id, summary_text=summary_text)
+    return await async_crud.insert_summary(
+        db=db, news_id=news_id, summary_text=run.text, content_hash=content_hash, metrics=run.metrics()
+    )
 
 
-@router.get("/{summary_id}", response_model=schemas.Summary)
-def read_summary(summary_id: int, db: Session = Depends(dependencies.get_db)):
-    print(summary_id)
-    db_summary = crud.get_summary(db, summary_id=summary_id)
+def server_sent_event(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+@router.post("/stream", response_class=StreamingResponse)
+async def stream_summary(summary: schemas.SummaryFast, db=Depends(dependencies.get_session)):
+    """
+    POST /summaries/ as Server-Sent Events. `delta` events carry the summary
+    text as the model produces it ({"text": ...}); the final `done` event
+    carries the stored summary ({"id", "news_id", "cache"}) or an `error`
+    event ends the stream. The generated text is stored through the
+    request's session, which FastAPI (>= 0.118) keeps open until the
+    response is sent. A stored summary of the unchanged article is sent
+    as a single delta. For a long article the chunks are summarized first,
+    so only the final merge is streamed.
+    """
+    news_id = summary.news_id
+    news = await async_crud.get_news(db, news_id=news_id)
+    if news is None:
+        raise HTTPException(status_code=404, detail="News not found")
+    news_body = news.body
+    content_hash = summaries.content_hash(news_body)
+
+    db_summary = None
+    if config.SUMMARY_CACHE_ENABLED and not summary.force:
+        db_summary = await async_crud.get_summary_by_hash(db, news_id=news_id, content_hash=content_hash)
     if db_summary is None:
-        raise HTTPException(status_code=404, detail="Summary not found")
-    return db_summary
+        # No connection is held while the stream waits for the LLM.
+        await async_crud.end_transaction(db)
+
+    async def events():
+        if db_summary is not None:
+            summary_stats.hit()
+            yield server_sent_event("delta", {"text": db_summary.summary_text})
+            yield server_sent_event("done", {"id": db_summary.id, "news_id": news_id, "cache": "hit"})
+            return
+
+        parts = []
+        started = time.perf_counter()
+        try:
+            prepared = await summaries.plan(news_body)
+            async for text in utility.stream_completion(prepared.messages):
+                parts.append(text)
+                yield server_sent_event("delta", {"text": text})
+        except Exception as e:
+            yield server_sent_event("error", {"detail": str(e)})
+            return
+        summary_text = "".join(parts)
+        # Streamed completions report no usage; estimate the final call.
+        run = summaries.finish(
+            prepared,
+            summary_text,
+            utility.estimate_prompt_tokens(prepared.messages),
+            tokens.count_tokens(summary_text),
+            time.perf_counter() - started,
+        )
+        summary_stats.generated(run, forced=summary.force)
+
+        stored = await async_crud.insert_summary(
+            db=db, news_id=news_id, summary_text=summary_text, content_hash=content_hash, metrics=run.metrics()
+        )
+        cache = "refresh" if summary.force else "miss"
+        yield server_sent_event("done", {"id": stored.id, "news_id": news_id, "cache": cache})
+
+    # No-cache and no proxy buffering, so every event reaches the client as sent.
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/batch", response_model=schemas.SummaryBatchResult)
+async def create_summaries(batch: schemas.SummaryBatch, db=Depends(dependencies.get_session)):
+    """
+    Summarize many articles at once: the given `news_ids`, or every article
+    published since `since` without a summary (the oldest
+    SUMMARY_BATCH_MAX_SIZE per request; repeat until none are left).
+
+    Stored summaries of unchanged articles are reused unless `force` is set.
+    The rest are generated concurrently, with no database connection held
+    while waiting, and stored with one INSERT per SUMMARY_BATCH_INSERT_SIZE
+    finished summaries. The outcome of every article is reported; one
+    failed LLM call does not fail the batch.
+    """
+    if batch.news_ids is not None:
+        news_ids = list(dict.fromkeys(batch.news_ids))
+        if len(news_ids) > config.SUMMARY_BATCH_MAX_SIZE:
+            raise HTTPException(
+                status_code=422,
+                detail=f"At most {config.SUMMARY_BATCH_MAX_SIZE} news ids per batch",
+            )
+        bodies = await async_crud.get_news_bodies(db, news_ids=news_ids)
+    else:
+        bodies = await async_crud.get_unsummarized_news_bodies(db, since=batch.since, limit=config.SUMMARY_BATCH_MAX_SIZE)
+        news_ids = list(bodies)
+
+    content_hashes = {news_id: summaries.content_hash(body) for news_id, body in bodies.items()}
+    cached = {}
+    if config.SUMMARY_CACHE_ENABLED and not batch.force:
+        cached = await async_crud.get_summary_ids_by_hash(db, content_hashes=content_hashes)
+        summary_stats.hit(len(cached))
+
+    concurrency = min(batch.concurrency or config.SUMMARY_BATCH_CONCURRENCY, config.SUMMARY_BATCH_CONCURRENCY)
+    pending = {news_id: body for news_id, body in bodies.items() if news_id not in cached}
+    # Neither a connection nor a snapshot is held for the whole run; each
+    # insert commits, which returns the connection again.
+    await async_crud.end_transaction(db)
+    generated, created, ready = {}, {}, []
+    async for news_id, run in summaries.generate_each(pending, concurrency, forced=batch.force):
+        generated[news_id] = run
+        if isinstance(run, BaseException):
+            continue
+        ready.append({"news_id": news_id, "summary_text": run.text, "content_hash": content_hashes[news_id], **run.metrics()})
+        if len(ready) >= config.SUMMARY_BATCH_INSERT_SIZE:
+            created.update(await async_crud.insert_summaries(db, summaries=ready))
+            ready = []
+    created.update(await async_crud.insert_summaries(db, summaries=ready))
+
+    items = []
+    for news_id in news_ids:
+        if news_id not in bodies:
+            items.append(schemas.SummaryBatchItem(news_id=news_id, status="not_found"))
+        elif news_id in cached:
+            items.append(schemas.SummaryBatchItem(news_id=news_id, status="cached", summary_id=cached[news_id]))
+        elif news_id in created:
+            items.append(schemas.SummaryBatchItem(news_id=news_id, status="created", summary_id=created[news_id]))
+        else:
+            error = generated[news_id]
+            items.append(schemas.SummaryBatchItem(news_id=news_id, status="failed", error=str(error)[:255] or type(error).__name__))
+    counts = {}
+    for item in items:
+        counts[item.status] = counts.get(item.status, 0) + 1
+    return schemas.SummaryBatchResult(items=items, counts=counts)
+
+
+@router.get("/{summary_id}", response_model=schemas.Summary)
+async def read_summary(
+    request: Request,
+    response: Response,
+    summary_id: int,
+    db=Depends(dependencies.get_session),
+):
+    key = ("summary", summary_id)
+    representation = news_cache.get(key)
+    if representation is MISSING:
+        db_summary = await async_crud.get_summary(db, summary_id=summary_id)
+        if db_summary is None:
+            raise HTTPException(status_code=404, detail="Summary not found")
+        representation = conditional.Representation(
+            body=schemas.Summary.model_validate(db_summary),
+            etag=conditional.summary_etag(db_summary),
+        )
+        news_cache.set(key, representation)
+
+    if conditional.is_not_modified(request, representation):
+        return conditional.not_modified(representation)
+    response.headers.update(conditional.validator_headers(representation))
+    return representation.body
 
 
 
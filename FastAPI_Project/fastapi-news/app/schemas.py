@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from datetime import datetime
+from enum import Enum
 from typing import List, Optional   
 
 
@@ -84,9 +85,27 @@ class News(NewsBase):
         from_attributes = True
 
 
+class NewsView(str, Enum):
+    full = "full"
+    compact = "compact"
+
+
+class NewsCompact(BaseModel):
+    # Listing fields only: no body and no related rows.
+    id: int
+    title: str
+    link: str
+    datetime: datetime
+
+    class Config:
+        from_attributes = True
+
+
 
 class SummaryFast(BaseModel):
     news_id: int
+    # Call the LLM even if a summary of the unchanged article is stored.
+    force: bool = False
 
 class SummaryBase(BaseModel):
     summary_text: str
@@ -99,7 +118,66 @@ class SummaryCreate(SummaryBase):
 
 class Summary(SummaryBase):
     id: int
+    # single or chunked, and what generating it took
+    strategy: Optional[str] = None
+    llm_calls: Optional[int] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    latency_ms: Optional[int] = None
 
     class Config:
         from_attributes = True
 
+class SummaryBatch(BaseModel):
+    # Either these articles, or every article published since `since` that
+    # has no summary yet.
+    news_ids: Optional[List[int]] = None
+    since: Optional[datetime] = None
+    force: bool = False
+    # LLM calls of this batch in flight at once, at most SUMMARY_BATCH_CONCURRENCY.
+    concurrency: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if (self.news_ids is None) == (self.since is None):
+            raise ValueError("pass either news_ids or since")
+        if self.concurrency is not None and self.concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        return self
+
+class SummaryBatchItem(BaseModel):
+    news_id: int
+    # created, cached (stored summary of the unchanged article), not_found or failed
+    status: str
+    summary_id: Optional[int] = None
+    error: Optional[str] = None
+
+class SummaryBatchResult(BaseModel):
+    items: List[SummaryBatchItem]
+    # Number of items per status.
+    counts: dict
+
+
+
+class ScrapeJobItem(BaseModel):
+    url: str
+    # pending, fetched, stored, duplicate, failed or skipped (already stored, not fetched)
+    status: str
+    news_id: Optional[int] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class ScrapeJob(BaseModel):
+    id: int
+    # queued, running, done or failed (gave up after SCRAPE_JOB_MAX_ATTEMPTS, see error)
+    status: str
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    attempts: Optional[int] = None
+    error: Optional[str] = None
+    items: List[ScrapeJobItem] = []
+
+    class Config:
+        from_attributes = True
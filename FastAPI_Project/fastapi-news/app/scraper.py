@@ -1,45 +1,291 @@
 import datetime
-import cloudscraper
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit
+import lxml.html
 from bs4 import BeautifulSoup
+from lxml import etree
+from lxml.cssselect import CSSSelector
+from . import config
 from .database import SessionLocal
 from .crud import create_news
 from .schemas import NewsCreate
-print(NewsCreate.__module__)  # Should output something like 'your_project.schemas'
-# Initialize cloudscraper
-scraper = cloudscraper.create_scraper()
+
+_scraper = None
+_scraper_lock = threading.Lock()
+
+# Fetch workers keep one session each: requests sessions are not thread-safe.
+_local = threading.local()
+_fetch_executor = None
+_parse_executor = None
+_host_limits = {}
+
+
+def get_scraper():
+    """The shared cloudscraper session, created on first use (or by lifespan.warm_up)."""
+    global _scraper
+    if _scraper is None:
+        with _scraper_lock:
+            if _scraper is None:
+                import cloudscraper
+
+                _scraper = cloudscraper.create_scraper()
+    return _scraper
+
+
+def get_thread_scraper():
+    """A cloudscraper session private to the calling fetch worker."""
+    if not hasattr(_local, "scraper"):
+        import cloudscraper
+
+        _local.scraper = cloudscraper.create_scraper()
+    return _local.scraper
+
+
+def get_fetch_executor():
+    global _fetch_executor
+    if _fetch_executor is None:
+        with _scraper_lock:
+            if _fetch_executor is None:
+                _fetch_executor = ThreadPoolExecutor(
+                    max_workers=config.SCRAPER_MAX_WORKERS, thread_name_prefix="scraper-fetch"
+                )
+    return _fetch_executor
+
+
+def get_parse_executor():
+    """The extraction process pool, or None when SCRAPER_PARSE_PROCESSES is 0."""
+    global _parse_executor
+    if _parse_executor is None and config.SCRAPER_PARSE_PROCESSES > 0:
+        with _scraper_lock:
+            if _parse_executor is None:
+                # spawn, not fork: forking a process that runs threads can
+                # copy locks other threads were holding.
+                _parse_executor = ProcessPoolExecutor(
+                    max_workers=config.SCRAPER_PARSE_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+                )
+    return _parse_executor
+
+
+def shutdown_executors():
+    global _fetch_executor, _parse_executor
+    with _scraper_lock:
+        executors = (_fetch_executor, _parse_executor)
+        _fetch_executor = _parse_executor = None
+    for executor in executors:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def discard_parse_executor(executor):
+    """Forget a broken extraction pool so the next scrape starts a new one."""
+    global _parse_executor
+    with _scraper_lock:
+        if _parse_executor is not executor:
+            return
+        _parse_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def host_limit(url: str):
+    """Semaphore capping concurrent requests to the host of `url`."""
+    host = urlsplit(url).netloc.lower()
+    with _scraper_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(config.SCRAPER_PER_HOST_LIMIT)
+        return _host_limits[host]
+
+
+def fetch_page(url: str, session=None):
+    """The raw HTML of `url`, or None if it could not be fetched."""
+    try:
+        with host_limit(url):
+            response = (session or get_scraper()).get(url, timeout=config.SCRAPER_TIMEOUT)
+    except Exception as e:
+        print(f"An error occurred while fetching {url}: {e}")
+        return None
+    if response.status_code != 200:
+        print(f"Failed to fetch the page. Status code: {response.status_code}")
+        return None
+    return response.content
+
+
+def fetch_page_in_worker(url: str):
+    return fetch_page(url, get_thread_scraper())
+
+
+def fetch_pages(urls):
+    """
+    Fetch `urls` concurrently on the fetch executor, at most
+    SCRAPER_PER_HOST_LIMIT at a time per host. The pages (None for failures)
+    come back in the order of `urls`.
+    """
+    return list(get_fetch_executor().map(fetch_page_in_worker, urls))
+
+
+def extract_news(url: str, content: bytes):
+    """parse_news for the process pool: page bytes in, a plain dict (or None) out."""
+    news = parse_news(url, content)
+    return news.model_dump() if news is not None else None
+
+
+class ScrapeResult(NamedTuple):
+    url: str
+    fetched: bool
+    news: Optional[NewsCreate]
+
+
+def _scrape_future(url: str, fetch_executor, parse_executor):
+    """
+    A future for the ScrapeResult of `url`: fetched on a thread, then parsed
+    in a worker process. It is always resolved, even when a step fails or is
+    cancelled by shutdown_executors, since scrape_pages waits on it.
+    """
+    result = Future()
+
+    def parsed(future):
+        try:
+            data = future.result()
+            result.set_result(ScrapeResult(url, True, NewsCreate.model_validate(data) if data else None))
+        except (Exception, CancelledError) as e:
+            if isinstance(e, BrokenProcessPool):
+                discard_parse_executor(parse_executor)
+            print(f"An error occurred while parsing {url}: {e!r}")
+            result.set_result(ScrapeResult(url, True, None))
+
+    def fetched(future):
+        try:
+            content = future.result()
+        except (Exception, CancelledError) as e:
+            print(f"An error occurred while fetching {url}: {e!r}")
+            result.set_result(ScrapeResult(url, False, None))
+            return
+        if content is None:
+            result.set_result(ScrapeResult(url, False, None))
+            return
+        try:
+            if parse_executor is None:
+                result.set_result(ScrapeResult(url, True, parse_news(url, content)))
+            else:
+                parse_executor.submit(extract_news, url, content).add_done_callback(parsed)
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                discard_parse_executor(parse_executor)
+            print(f"An error occurred while parsing {url}: {e!r}")
+            result.set_result(ScrapeResult(url, True, None))
+
+    fetch_executor.submit(fetch_page_in_worker, url).add_done_callback(fetched)
+    return result
+
+
+def scrape_pages(urls, max_in_flight: Optional[int] = None, parse_executor=None):
+    """
+    Yield a ScrapeResult for each of `urls`, in order.
+
+    Pages are fetched on the fetch threads and turned into NewsCreate on the
+    parse process pool, so extraction is not limited to the one core the GIL
+    allows. Only the page bytes and the extracted dict cross the process
+    boundary. At most `max_in_flight` URLs (SCRAPER_PIPELINE_DEPTH) are
+    between being fetched and being consumed: a slow consumer, such as the
+    inserts of a scrape job, holds back fetching instead of piling up pages.
+    """
+    max_in_flight = max_in_flight or config.SCRAPER_PIPELINE_DEPTH
+    fetch_executor = get_fetch_executor()
+    if parse_executor is None:
+        parse_executor = get_parse_executor()
+
+    urls = iter(urls)
+    in_flight = deque(_scrape_future(url, fetch_executor, parse_executor) for url in islice(urls, max_in_flight))
+    while in_flight:
+        result = in_flight.popleft().result()
+        for url in islice(urls, 1):
+            in_flight.append(_scrape_future(url, fetch_executor, parse_executor))
+        yield result
+
 
 def single_news_scraper(url: str):
-    
+    content = fetch_page(url)
+    if content is None:
+        return None
+    return parse_news(url, content)
+
+
+# Selectors for dailyamardesh.com article pages.
+TITLE_SELECTOR = "body > section > div > div:nth-child(2) > div.grid.lg\\:grid-cols-\\[200px_auto_300px\\].gap-6.mb-6 > div:nth-child(2) > div.mb-3 > h1"
+REPORTER_SELECTOR = "div.text-xl.text-\\[\\#292929\\].mb-2.lg\\:mb-2 > span"
+
+# The same selectors compiled once to XPath for the lxml parser. Classes are
+# matched as whitespace-separated tokens, like BeautifulSoup's class_.
+_title_xpath = etree.XPath(f"({CSSSelector(TITLE_SELECTOR).path})[1]")
+_reporter_xpath = etree.XPath(f"({CSSSelector(REPORTER_SELECTOR).path})[1]")
+_body_xpath = etree.XPath("(//div[contains(concat(' ', normalize-space(@class), ' '), ' block-full_richtext ')])[1]")
+_images_xpath = etree.XPath("//img[@src]/@src")
+# BeautifulSoup's get_text leaves out comments and the contents of script,
+# style and template tags; the text() node test already skips comments.
+_text_xpath = etree.XPath("descendant-or-self::text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
+
+def parse_news(url: str, content: bytes):
+    """The NewsCreate for an article page, using the SCRAPER_PARSER backend."""
+    if config.SCRAPER_PARSER == "bs4":
+        return parse_news_bs4(url, content)
+    return parse_news_lxml(url, content)
+
+
+def text_of(element):
+    """BeautifulSoup's get_text(strip=True) for an lxml element."""
+    return "".join(text.strip() for text in _text_xpath(element) if text.strip())
+
+
+def parse_news_lxml(url: str, content: bytes):
     try:
-        # Fetch the page content
-        response = scraper.get(url)
-        if response.status_code != 200:
-            print(f"Failed to fetch the page. Status code: {response.status_code}")
-            return None
+        try:
+            text = content.decode("utf-8")
+        except UnicodeDecodeError:
+            # Let libxml2 go by the page's own charset declaration.
+            document = lxml.html.document_fromstring(content)
+        else:
+            # libxml2 turns CRLF into LF while html.parser keeps it; a
+            # character reference survives parsing as a literal CR.
+            document = lxml.html.document_fromstring(text.replace("\r", "&#13;") if "\r" in text else text)
+
+        title_element = _title_xpath(document)
+        title = text_of(title_element[0]) if title_element else "No Title Found"
+
+        reporter_element = _reporter_xpath(document)
+        reporter = text_of(reporter_element[0]) if reporter_element else "No Reporter Found"
 
-        soup = BeautifulSoup(response.content, "html.parser")
+        body_content = _body_xpath(document)
+        if body_content:
+            content = "\n".join([text_of(p) for p in body_content[0].iter("p")])
+        else:
+            content = "No Content Found"
 
-        # Extract publisher details
-        publisher_website = url.split('/')[2]
-        publisher = publisher_website.split('.')[-2]
+        images = [str(src) for src in _images_xpath(document)]
+
+        return build_news(url, title, reporter, content, images)
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+
+def parse_news_bs4(url: str, content: bytes):
+    """The original BeautifulSoup extraction, kept as the reference for parse_news_lxml."""
+    try:
+        soup = BeautifulSoup(content, "html.parser")
 
         # Extract the title using the updated CSS selector
-        title_element = soup.select_one(
-            "body > section > div > div:nth-child(2) > div.grid.lg\\:grid-cols-\\[200px_auto_300px\\].gap-6.mb-6 > div:nth-child(2) > div.mb-3 > h1"
-        )
+        title_element = soup.select_one(TITLE_SELECTOR)
         title = title_element.get_text(strip=True) if title_element else "No Title Found"
 
         # Extract reporter
-        reporter_element = soup.select_one("div.text-xl.text-\\[\\#292929\\].mb-2.lg\\:mb-2 > span")
+        reporter_element = soup.select_one(REPORTER_SELECTOR)
         reporter = reporter_element.get_text(strip=True) if reporter_element else "No Reporter Found"
 
-        # Extract datetime
-        datetime_element = soup.find('div', class_='text-sm')
-        news_datetime = datetime_element.get_text(strip=True) if datetime_element else "No Date Found"
-
-        # Extract the category from the URL
-        category = url.split('/')[-2].capitalize()
-
         # Extract body
         body_content = soup.find_all('div', class_='block-full_richtext')
         if body_content:
@@ -51,31 +297,42 @@ def single_news_scraper(url: str):
         # Extract images
         images = [img['src'] for img in soup.find_all('img', src=True)]
 
-        # Set current datetime if extraction failed
-        news_datetime = datetime.datetime.now()
-
-        print(f"Scraped news from {url}")
-        print(f"Title: {title}")
-        print(f"Reporter: {reporter}")
-        print(f"Date: {news_datetime}")
-        print(f"Category: {category}")
-        print(f"Images: {images}")
-
-        return NewsCreate(
-            publisher_website=publisher_website,
-            news_publisher=publisher,
-            title=title,
-            news_reporter=reporter,
-            datetime=news_datetime,
-            link=url,
-            news_category=category,
-            body=content,
-            images=images,
-        )
+        return build_news(url, title, reporter, content, images)
     except Exception as e:
         print(f"An error occurred: {e}")
 
 
+def build_news(url: str, title: str, reporter: str, content: str, images):
+    # Extract publisher details
+    publisher_website = url.split('/')[2]
+    publisher = publisher_website.split('.')[-2]
+
+    # Extract the category from the URL
+    category = url.split('/')[-2].capitalize()
+
+    # The page's date line is not parsed yet; the scrape time is stored instead.
+    news_datetime = datetime.datetime.now()
+
+    print(f"Scraped news from {url}")
+    print(f"Title: {title}")
+    print(f"Reporter: {reporter}")
+    print(f"Date: {news_datetime}")
+    print(f"Category: {category}")
+    print(f"Images: {images}")
+
+    return NewsCreate(
+        publisher_website=publisher_website,
+        news_publisher=publisher,
+        title=title,
+        news_reporter=reporter,
+        datetime=news_datetime,
+        link=url,
+        news_category=category,
+        body=content,
+        images=images,
+    )
+
+
 def scrape_and_store_news(url: str, db: SessionLocal):
     # db = SessionLocal()
     news_data = single_news_scraper(url)
@@ -0,0 +1,44 @@
+"""
+Text normalization shared by the stored search document and search queries.
+
+The MySQL FULLTEXT parser splits on anything that is not a word character and
+compares bytes, so Bengali text is brought to one canonical spelling before it
+is stored in `News.search_text` or matched against it.
+"""
+import re
+import unicodedata
+
+BENGALI_DIGITS = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
+
+# Old-style khanda ta (ta + hasant + ZWJ) becomes the dedicated code point
+# before the joiners are dropped.
+KHANDA_TA = ("\u09a4\u09cd\u200d", "\u09ce")
+ZERO_WIDTH = re.compile("[\u200b\u200c\u200d\ufeff]")
+
+# Bengali vowel signs and hasant are combining marks, not \w, so the Bengali
+# block is whitelisted explicitly. Danda (।) and double danda (॥) live in the
+# Devanagari block and therefore count as separators.
+SEPARATORS = re.compile(r"[^\w\u0980-\u09ff]+")
+
+
+def normalize(text: str) -> str:
+    """
+    Canonical form used for indexing and querying: NFC (which also folds the
+    precomposed ড় ঢ় য় into their nukta sequences), no zero-width joiners,
+    ASCII digits, lower case, and single spaces between words.
+    """
+    text = unicodedata.normalize("NFC", text or "")
+    text = text.replace(*KHANDA_TA)
+    text = ZERO_WIDTH.sub("", text)
+    text = text.translate(BENGALI_DIGITS).lower()
+    return SEPARATORS.sub(" ", text).strip()
+
+
+def tokenize(text: str):
+    return normalize(text).split()
+
+
+def search_document(title: str, body: str) -> str:
+    # The title is repeated so its words weigh more in natural-language relevance.
+    title = normalize(title)
+    return f"{title} {title} {normalize(body)}"
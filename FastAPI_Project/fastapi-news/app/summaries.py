@@ -0,0 +1,195 @@
+"""
+Reuse of generated summaries.
+
+A summary is stored with the hash of everything it was generated from: the
+article body and utility.summary_settings() (model, prompts, sampling,
+chunking). A request for an article whose hash matches a stored summary is
+answered from the database; editing the body or changing the settings
+yields a new hash, and therefore new LLM calls.
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from typing import NamedTuple
+
+import orjson
+
+from . import config, tokens, utility
+
+
+def content_hash(news_body: str) -> str:
+    document = {"body": news_body, "settings": utility.summary_settings()}
+    return hashlib.sha256(orjson.dumps(document, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+class SummaryRun(NamedTuple):
+    """A generated summary and what it cost."""
+
+    text: str
+    # "single" (one call) or "chunked" (map-reduce, see plan)
+    strategy: str
+    llm_calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    seconds: float
+
+    def metrics(self) -> dict:
+        """The models.Summary columns recording this run."""
+        return {
+            "strategy": self.strategy,
+            "llm_calls": self.llm_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_ms": round(self.seconds * 1000),
+        }
+
+
+class Plan(NamedTuple):
+    """The messages of the call that writes the summary, and the calls made to prepare them."""
+
+    messages: list
+    strategy: str
+    llm_calls: int
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class SummaryStats:
+    """Thread-safe counters of stored summaries reused versus LLM calls made."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+        # strategy -> generated summaries, LLM calls, seconds and tokens
+        self.strategies = {}
+
+    def hit(self, count: int = 1):
+        with self._lock:
+            self.hits += count
+
+    def generated(self, run: SummaryRun, forced: bool):
+        with self._lock:
+            if forced:
+                self.refreshes += 1
+            else:
+                self.misses += 1
+            self.llm_calls += run.llm_calls
+            self.llm_seconds += run.seconds
+            totals = self.strategies.setdefault(
+                run.strategy, {"summaries": 0, "llm_calls": 0, "seconds": 0.0, "tokens": 0}
+            )
+            totals["summaries"] += 1
+            totals["llm_calls"] += run.llm_calls
+            totals["seconds"] += run.seconds
+            totals["tokens"] += run.prompt_tokens + run.completion_tokens
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            summaries = self.misses + self.refreshes
+            mean_llm_seconds = self.llm_seconds / summaries if summaries else 0.0
+            mean_llm_calls = self.llm_calls / summaries if summaries else 1.0
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "llm_calls": self.llm_calls,
+                "llm_calls_saved": round(self.hits * mean_llm_calls),
+                "mean_llm_seconds": mean_llm_seconds,
+                "llm_seconds_saved": self.hits * mean_llm_seconds,
+                "strategies": {
+                    strategy: {
+                        "summaries": totals["summaries"],
+                        "mean_llm_calls": totals["llm_calls"] / totals["summaries"],
+                        "mean_seconds": totals["seconds"] / totals["summaries"],
+                        "mean_tokens": totals["tokens"] / totals["summaries"],
+                    }
+                    for strategy, totals in self.strategies.items()
+                },
+            }
+
+
+summary_stats = SummaryStats()
+
+
+async def plan(news_body: str) -> Plan:
+    """
+    An article of up to SUMMARY_CHUNK_THRESHOLD estimated tokens is
+    summarized by one call. A longer one is split into chunks of about
+    SUMMARY_CHUNK_TOKENS that are summarized in parallel (map), repeatedly
+    if the partial summaries are still too long, and the last call merges
+    the partial summaries (reduce).
+    """
+    text = news_body
+    llm_calls = prompt_tokens = completion_tokens = 0
+    text_tokens = tokens.count_tokens(text)
+    while text_tokens > config.SUMMARY_CHUNK_THRESHOLD:
+        chunks = tokens.split_into_chunks(text, config.SUMMARY_CHUNK_TOKENS)
+        partials = await asyncio.gather(*(
+            utility.complete(utility.summary_messages(chunk, utility.CHUNK_PROMPT), config.SUMMARY_CHUNK_MAX_TOKENS)
+            for chunk in chunks
+        ))
+        llm_calls += len(partials)
+        prompt_tokens += sum(partial.prompt_tokens for partial in partials)
+        completion_tokens += sum(partial.completion_tokens for partial in partials)
+        text = "\n\n".join(partial.text for partial in partials)
+        shorter_tokens = tokens.count_tokens(text)
+        if shorter_tokens >= text_tokens:
+            # Chunk summaries as long as the chunks; merge what there is.
+            break
+        text_tokens = shorter_tokens
+
+    if llm_calls == 0:
+        return Plan(utility.summary_messages(news_body), "single", 0, 0, 0)
+    return Plan(utility.summary_messages(text, utility.MERGE_PROMPT), "chunked", llm_calls, prompt_tokens, completion_tokens)
+
+
+def finish(prepared: Plan, text: str, prompt_tokens: int, completion_tokens: int, seconds: float) -> SummaryRun:
+    """The run of `prepared` whose final call wrote `text`."""
+    return SummaryRun(
+        text,
+        prepared.strategy,
+        prepared.llm_calls + 1,
+        prepared.prompt_tokens + prompt_tokens,
+        prepared.completion_tokens + completion_tokens,
+        seconds,
+    )
+
+
+async def summarize(news_body: str) -> SummaryRun:
+    started = time.perf_counter()
+    prepared = await plan(news_body)
+    final = await utility.complete(prepared.messages)
+    return finish(prepared, final.text, final.prompt_tokens, final.completion_tokens, time.perf_counter() - started)
+
+
+async def generate_each(bodies: dict, concurrency: int, forced: bool = False):
+    """
+    Summarize `bodies` ({news_id: body}), at most `concurrency` articles at
+    a time, yielding (news_id, SummaryRun or the exception raised) as each
+    one finishes. Articles still running when the caller stops are cancelled.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def generate(news_id, body):
+        async with semaphore:
+            try:
+                run = await summarize(body)
+            except Exception as e:
+                return news_id, e
+            summary_stats.generated(run, forced=forced)
+            return news_id, run
+
+    tasks = [asyncio.create_task(generate(news_id, body)) for news_id, body in bodies.items()]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,65 @@
+"""
+Token estimates for deciding how to summarize an article.
+
+The model's own tokenizer is not available offline, so tokens are estimated
+from words: Latin-script words and numbers take about one token per four
+characters, Bengali (and other non-Latin) words about one per two, and
+each punctuation mark one. For the 128k-vocabulary Llama 3 tokenizer this
+errs on the high side, which is the safe side for a context limit. The
+exact counts of every call are taken from the API's usage report instead.
+"""
+import math
+import re
+
+# \w leaves out combining marks such as Bengali vowel signs, so the Indic
+# blocks (U+0900-U+0DFF) count as word characters as a whole.
+_TOKEN_RE = re.compile(r"[\w\u0900-\u0dff]+|[^\w\s\u0900-\u0dff]")
+_SENTENCE_RE = re.compile(r"(?<=[।.!?])\s+|\n+")
+
+
+def _word_tokens(word: str) -> int:
+    if len(word) == 1 and not word.isalnum():
+        return 1
+    chars_per_token = 4 if word.isascii() else 2
+    return math.ceil(len(word) / chars_per_token)
+
+
+def count_tokens(text: str) -> int:
+    return sum(_word_tokens(word) for word in _TOKEN_RE.findall(text))
+
+
+def split_into_chunks(text: str, max_tokens: int) -> list:
+    """
+    Split `text` into consecutive chunks of at most about `max_tokens`
+    tokens, at sentence boundaries (the Bengali danda included). A single
+    sentence longer than that is split between words.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for sentence in filter(None, (part.strip() for part in _SENTENCE_RE.split(text))):
+        pieces = [sentence]
+        if count_tokens(sentence) > max_tokens:
+            pieces = _split_words(sentence, max_tokens)
+        for piece in pieces:
+            tokens = count_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _split_words(sentence: str, max_tokens: int) -> list:
+    pieces, current, current_tokens = [], [], 0
+    for word in sentence.split():
+        tokens = count_tokens(word)
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
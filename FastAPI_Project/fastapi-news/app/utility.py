@@ -1,30 +1,143 @@
+import asyncio
 import os
-from groq import Groq
+from typing import NamedTuple, Optional
 from dotenv import load_dotenv
 
+from . import config, tokens
+
 load_dotenv()
 
+SUMMARY_PROMPT = "You are expert in news summarization in bengali languages. Please summarize the following news article in top  3-5 bullet points in the bengali language that you get."
+
+# Map and reduce steps of the chunked summary of a long article (see summaries.plan).
+CHUNK_PROMPT = "You are expert in news summarization in bengali languages. The following text is one part of a longer news article. Please summarize this part in 2-4 short bullet points in the bengali language, keeping every name, number and date."
+MERGE_PROMPT = "You are expert in news summarization in bengali languages. The following bullet points summarize consecutive parts of one news article. Please merge them into a summary of the whole article in top 3-5 bullet points in the bengali language."
+
+# (event loop, AsyncGroq client, semaphore) of the loop serving requests.
+_llm = None
+
+
+def summary_settings() -> dict:
+    """Everything besides the article body that shapes a generated summary."""
+    return {
+        "model": config.SUMMARY_MODEL,
+        "prompt": SUMMARY_PROMPT,
+        "temperature": 0,
+        "max_tokens": config.SUMMARY_MAX_TOKENS,
+        "top_p": 1,
+        "chunk_prompt": CHUNK_PROMPT,
+        "merge_prompt": MERGE_PROMPT,
+        "chunk_threshold": config.SUMMARY_CHUNK_THRESHOLD,
+        "chunk_tokens": config.SUMMARY_CHUNK_TOKENS,
+        "chunk_max_tokens": config.SUMMARY_CHUNK_MAX_TOKENS,
+    }
+
+
+class Completion(NamedTuple):
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+
+
+def summary_messages(text: str, prompt: str = SUMMARY_PROMPT) -> list:
+    return [
+        {
+            "role": "system",
+            "content": prompt
+        },
+        {
+            "role": "user",
+            "content": text
+        }
+    ]
+
+
+def estimate_prompt_tokens(messages: list) -> int:
+    return sum(tokens.count_tokens(message["content"]) for message in messages)
+
+
+def load_groq():
+    # Deferred so workers that never summarize do not import the SDK.
+    from groq import AsyncGroq, DefaultAsyncHttpxClient
+
+    return AsyncGroq, DefaultAsyncHttpxClient
+
+
+def get_llm():
+    """
+    The process-wide AsyncGroq client and the semaphore bounding its
+    in-flight completions. The client keeps its HTTP connections alive
+    between calls. Both belong to the running event loop, so a new loop
+    (e.g. each TestClient) gets its own.
+    """
+    global _llm
+    loop = asyncio.get_running_loop()
+    if _llm is None or _llm[0] is not loop:
+        import httpx
+
+        AsyncGroq, DefaultAsyncHttpxClient = load_groq()
+        # The SDK keeps only 20 idle connections; keep one per allowed call.
+        limits = httpx.Limits(
+            max_connections=config.SUMMARY_MAX_CONCURRENCY,
+            max_keepalive_connections=config.SUMMARY_MAX_CONCURRENCY,
+        )
+        client = AsyncGroq(
+            api_key=config.GROQ_API_KEY,
+            base_url=config.GROQ_BASE_URL,
+            timeout=config.SUMMARY_TIMEOUT,
+            max_retries=config.SUMMARY_MAX_RETRIES,
+            http_client=DefaultAsyncHttpxClient(limits=limits),
+        )
+        _llm = (loop, client, asyncio.Semaphore(config.SUMMARY_MAX_CONCURRENCY))
+    return _llm[1], _llm[2]
+
+
+async def close_llm():
+    global _llm
+    if _llm is not None and _llm[0] is asyncio.get_running_loop():
+        await _llm[1].close()
+    _llm = None
+
 
-def generate_summary(news_body):
-    client = Groq(api_key="GROQ_API_KEY")
-    chat_completion = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
-            {
-                "role": "system",
-                "content": "You are expert in news summarization in bengali languages. Please summarize the following news article in top  3-5 bullet points in the bengali language that you get."
-            },
-            {
-                "role": "user",
-                "content": news_body
-            }
-        ],
-        temperature=0,
-        max_tokens=32768,
-        top_p=1,
-        stream=False,
-        stop=None,
-    )
-    return chat_completion.choices[0].message.content
+async def complete(messages: list, max_tokens: Optional[int] = None) -> Completion:
+    """One chat completion with the summary settings, within the concurrency limit."""
+    client, semaphore = get_llm()
+    settings = summary_settings()
+    async with semaphore:
+        chat_completion = await client.chat.completions.create(
+            model=settings["model"],
+            messages=messages,
+            temperature=settings["temperature"],
+            max_tokens=max_tokens or settings["max_tokens"],
+            top_p=settings["top_p"],
+            stream=False,
+            stop=None,
+        )
+    text = chat_completion.choices[0].message.content
+    usage = chat_completion.usage
+    if usage is None:
+        return Completion(text, estimate_prompt_tokens(messages), tokens.count_tokens(text))
+    return Completion(text, usage.prompt_tokens, usage.completion_tokens)
 
 
+async def stream_completion(messages: list, max_tokens: Optional[int] = None):
+    """
+    Like complete, but yields the text as the model produces it. The call
+    holds its concurrency slot until the stream ends or the consumer stops
+    iterating.
+    """
+    client, semaphore = get_llm()
+    settings = summary_settings()
+    async with semaphore:
+        stream = await client.chat.completions.create(
+            model=settings["model"],
+            messages=messages,
+            temperature=settings["temperature"],
+            max_tokens=max_tokens or settings["max_tokens"],
+            top_p=settings["top_p"],
+            stream=True,
+            stop=None,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
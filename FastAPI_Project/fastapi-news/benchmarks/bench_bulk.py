@@ -0,0 +1,76 @@
+"""
+Articles per minute through POST /news/bulk on one uvicorn worker.
+
+The NDJSON body is generated from the synthetic corpus while it is being
+uploaded, so neither side holds the whole payload.
+
+    python -m benchmarks.bench_bulk --articles 50000 --batch-size 500 1000
+"""
+import argparse
+import collections
+import time
+
+import httpx
+import orjson
+
+from benchmarks.bench_load import start_server
+from benchmarks.common import make_engine
+from benchmarks.corpus import Corpus
+
+
+def ndjson(corpus, count, body_words, start):
+    lines = []
+    for article in corpus.articles(count, body_words, start=start):
+        lines.append(orjson.dumps(article) + b"\n")
+        if len(lines) == 200:
+            yield b"".join(lines)
+            lines = []
+    if lines:
+        yield b"".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--async-db-url", default=None)
+    parser.add_argument("--articles", type=int, default=20_000)
+    parser.add_argument("--body-words", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--db-async", choices=["0", "1"], default="1")
+    parser.add_argument("--port", type=int, default=8092)
+    args = parser.parse_args()
+
+    corpus = Corpus()
+    print(f"{args.articles} articles of {args.body_words} words, DB_ASYNC={args.db_async}")
+    print(f"{'batch':>7}{'seconds':>10}{'articles/min':>14}  outcomes")
+    for run, batch_size in enumerate(args.batch_size):
+        # Every run starts from an empty database so all records are inserts.
+        engine = make_engine(args.db_url)
+        db_url = args.db_url or str(engine.url)
+        async_db_url = args.async_db_url or db_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+        server = start_server(args.port, {
+            "DATABASE_URL": db_url,
+            "ASYNC_DATABASE_URL": async_db_url,
+            "DB_ASYNC": args.db_async,
+            "BULK_BATCH_SIZE": str(batch_size),
+            "SCRAPE_WORKERS": "0",
+        })
+        try:
+            started = time.perf_counter()
+            response = httpx.post(
+                f"http://127.0.0.1:{args.port}/news/bulk",
+                content=ndjson(corpus, args.articles, args.body_words, start=run * args.articles),
+                headers={"Content-Type": "application/x-ndjson", "Accept-Encoding": "identity"},
+                timeout=None,
+            )
+            seconds = time.perf_counter() - started
+            response.raise_for_status()
+            outcomes = collections.Counter(orjson.loads(line)["status"] for line in response.content.splitlines())
+            print(f"{batch_size:>7}{seconds:>10.1f}{args.articles / seconds * 60:>14.0f}  {dict(outcomes)}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Latency, LLM calls and tokens per article of summaries.summarize by
+article length, with every article sent in one call ("single", chunking
+disabled) against the default map-reduce over chunks of long articles
+("chunked"), on the fake LLM server.
+
+The server charges --prompt-latency seconds of prefill per 1000 prompt
+tokens on top of --latency, and rejects prompts above --context-limit
+tokens, as a provider does for a request over the context window or the
+tokens-per-minute limit.
+
+    python -m benchmarks.bench_chunked --articles 8 --words 300 2000 4000 8000 16000
+"""
+import argparse
+import asyncio
+import statistics
+
+from benchmarks.corpus import Corpus
+from benchmarks.fake_llm import FakeLLMServer
+
+from app import config, summaries, tokens, utility
+
+
+async def run(bodies):
+    results = await asyncio.gather(*(summaries.summarize(body) for body in bodies), return_exceptions=True)
+    await utility.close_llm()
+    return [result for result in results if not isinstance(result, BaseException)], len(bodies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=8, help="articles per length")
+    parser.add_argument("--words", type=int, nargs="+", default=[300, 2000, 4000, 8000, 16000])
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--prompt-latency", type=float, default=0.2)
+    parser.add_argument("--context-limit", type=int, default=12000)
+    args = parser.parse_args()
+
+    config.GROQ_API_KEY = "fake"
+    config.SUMMARY_MAX_CONCURRENCY = 64
+    server = FakeLLMServer(
+        latency=args.latency, max_concurrent=0, prompt_latency=args.prompt_latency, context_limit=args.context_limit,
+    ).start()
+    config.GROQ_BASE_URL = server.base_url
+    corpus = Corpus()
+    threshold = config.SUMMARY_CHUNK_THRESHOLD
+
+    print(
+        f"{args.articles} articles per length, {args.latency}s + {args.prompt_latency}s per 1000 prompt tokens, "
+        f"context {args.context_limit}, chunks of {config.SUMMARY_CHUNK_TOKENS} above {threshold} tokens"
+    )
+    print(f"{'words':>6}{'~tokens':>8}  {'strategy':<9}{'ok':>4}{'p50 s':>8}{'calls':>7}{'tokens':>8}")
+    try:
+        for words in args.words:
+            bodies = [article["body"] for article in corpus.articles(args.articles, words)]
+            estimate = statistics.mean(tokens.count_tokens(body) for body in bodies)
+            for name, chunk_threshold in (("single", 1 << 30), ("chunked", threshold)):
+                config.SUMMARY_CHUNK_THRESHOLD = chunk_threshold
+                runs, total = asyncio.run(run(bodies))
+                if runs:
+                    seconds = f"{statistics.median(run.seconds for run in runs):8.2f}"
+                    calls = f"{statistics.mean(run.llm_calls for run in runs):7.1f}"
+                    used = f"{statistics.mean(run.prompt_tokens + run.completion_tokens for run in runs):8.0f}"
+                else:
+                    seconds, calls, used = f"{'-':>8}", f"{'-':>7}", f"{'-':>8}"
+                print(f"{words:>6}{estimate:>8.0f}  {name:<9}{len(runs):>2}/{total:<1}{seconds}{calls}{used}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Articles per second through crud.create_news, against the write path it
+replaced: a commit and refresh for every new category, reporter and
+publisher, for the article and for each of its images.
+
+    python -m benchmarks.bench_ingest --articles 10000 --images 3
+"""
+import argparse
+import time
+
+from benchmarks.common import make_engine, make_session
+from benchmarks.corpus import Corpus
+
+from app import crud, models, schemas, search
+
+
+def legacy_get_or_create(db, model, name, **fields):
+    row = db.query(model).filter(model.name == name).first()
+    if row is None:
+        row = model(name=name, **fields)
+        db.add(row)
+        db.commit()
+        db.refresh(row)
+    return row
+
+
+def legacy_create_news(db, news: schemas.NewsCreate):
+    """crud.create_news before the single-transaction write path."""
+    if crud.get_news_by_link(db, news.link) or crud.get_news_existance(db, news_title=news.title):
+        return None
+    category = legacy_get_or_create(db, models.Category, news.news_category, description=f"{news.news_category} description")
+    reporter = legacy_get_or_create(db, models.Reporter, news.news_reporter, email=f"{news.news_reporter}@gmail.com")
+    publisher = legacy_get_or_create(db, models.Publisher, news.news_publisher, website=f"https://{news.publisher_website}.com")
+    db_news = models.News(
+        publisher_website=news.publisher_website,
+        title=news.title,
+        datetime=news.datetime,
+        body=news.body,
+        link=news.link,
+        search_text=search.search_document(news.title, news.body),
+        category_id=category.id,
+        reporter_id=reporter.id,
+        publisher_id=publisher.id,
+    )
+    db.add(db_news)
+    db.commit()
+    db.refresh(db_news)
+    for url in news.images:
+        db_image = models.Image(news_id=db_news.id, url=url)
+        db.add(db_image)
+        db.commit()
+        db.refresh(db_image)
+    return db_news
+
+
+def make_articles(count, body_words, images):
+    articles = []
+    for article in Corpus().articles(count, body_words):
+        article["images"] = [article["link"] + f"/image{i}.jpg" for i in range(images)]
+        articles.append(schemas.NewsCreate(**article))
+    return articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", action="append", default=None,
+                        help="one per path, e.g. twice for two empty databases; defaults to fresh SQLite files")
+    parser.add_argument("--articles", type=int, default=10_000)
+    parser.add_argument("--body-words", type=int, default=300)
+    parser.add_argument("--images", type=int, default=3)
+    args = parser.parse_args()
+
+    articles = make_articles(args.articles, args.body_words, args.images)
+    db_urls = args.db_url or [None, None]
+    print(f"{args.articles} articles with {args.images} images each")
+    print(f"{'path':<8}{'seconds':>10}{'articles/s':>12}{'rows/s':>10}")
+    rows_per_article = 1 + args.images
+    for (name, create), db_url in zip((("before", legacy_create_news), ("after", crud.create_news)), db_urls):
+        db = make_session(make_engine(db_url))
+        started = time.perf_counter()
+        for news in articles:
+            create(db, news)
+        seconds = time.perf_counter() - started
+        db.close()
+        rate = args.articles / seconds
+        print(f"{name:<8}{seconds:>10.1f}{rate:>12.0f}{rate * rows_per_article:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Summaries per second and latency of summaries.summarize against the
+fake LLM server, compared with the client it replaced: a new synchronous
+Groq client per call, run in the threadpool with no concurrency limit.
+
+The server admits --server-limit concurrent completions and answers 429
+beyond that, so an unbounded client burns requests on rejections and
+retries, while the shared client queues at its semaphore.
+
+    python -m benchmarks.bench_llm --calls 200 --latency 0.3 --server-limit 8
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.corpus import Corpus
+
+from app import config, summaries, utility
+
+
+def legacy_generate_summary(news_body):
+    """Summarizing before the shared async client."""
+    from groq import Groq
+
+    settings = utility.summary_settings()
+    client = Groq(api_key=config.GROQ_API_KEY, base_url=config.GROQ_BASE_URL)
+    chat_completion = client.chat.completions.create(
+        model=settings["model"],
+        messages=utility.summary_messages(news_body),
+        temperature=0,
+        max_tokens=32768,
+        top_p=1,
+        stream=False,
+        stop=None,
+    )
+    return chat_completion.choices[0].message.content
+
+
+async def legacy(body):
+    return await run_in_threadpool(legacy_generate_summary, body)
+
+
+async def run(summarize, bodies):
+    latencies, failures = [], 0
+
+    async def one(body):
+        nonlocal failures
+        started = time.perf_counter()
+        try:
+            await summarize(body)
+        except Exception:
+            failures += 1
+            return
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(body) for body in bodies))
+    seconds = time.perf_counter() - started
+    await utility.close_llm()
+    return seconds, latencies, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--server-limit", type=int, default=8, help="concurrent completions the server admits")
+    parser.add_argument("--concurrency", type=int, default=8, help="SUMMARY_MAX_CONCURRENCY of the shared client")
+    args = parser.parse_args()
+
+    config.GROQ_API_KEY = "fake"
+    config.SUMMARY_MAX_CONCURRENCY = args.concurrency
+    bodies = [article["body"] for article in Corpus().articles(args.calls, 300)]
+
+    print(f"{args.calls} concurrent summaries, {args.latency}s per completion, server admits {args.server_limit}")
+    print(f"{'client':<10}{'seconds':>9}{'calls/s':>9}{'p50 s':>8}{'p95 s':>8}{'failed':>8}{'requests':>10}{'429s':>7}{'conns':>7}")
+    for name, summarize in (("before", legacy), ("after", summaries.summarize)):
+        server = FakeLLMServer(latency=args.latency, max_concurrent=args.server_limit).start()
+        config.GROQ_BASE_URL = server.base_url
+        seconds, latencies, failures = asyncio.run(run(summarize, bodies))
+        server.shutdown()
+        stats = server.stats()
+        quantiles = statistics.quantiles(latencies, n=20) if len(latencies) > 1 else [0.0] * 19
+        print(
+            f"{name:<10}{seconds:>9.1f}{len(latencies) / seconds:>9.1f}{quantiles[9]:>8.2f}{quantiles[18]:>8.2f}"
+            f"{failures:>8}{stats['requests']:>10}{stats['rate_limited']:>7}{stats['connections']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
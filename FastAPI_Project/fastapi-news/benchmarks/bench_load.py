@@ -0,0 +1,109 @@
+"""
+Requests per second and p99 latency of the API with DB_ASYNC off and on.
+
+Each mode runs in its own uvicorn process against the same seeded database,
+with the read cache disabled so every request reaches the database.
+
+    python -m benchmarks.bench_load --concurrency 50 100 200 500
+
+Against MySQL, pass both URLs:
+
+    python -m benchmarks.bench_load --no-seed \\
+        --db-url mysql+mysqlconnector://u:p@host/db --async-db-url mysql+aiomysql://u:p@host/db
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import make_engine, seed_news
+
+
+def start_server(port, env):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--ws", "none", "--log-level", "warning"],
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def run_load(url, concurrency, total):
+    latencies = []
+    errors = 0
+    remaining = total
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    p99 = statistics.quantiles(latencies, n=100)[98] * 1000 if len(latencies) > 1 else float("nan")
+    return len(latencies) / elapsed, p99, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--async-db-url", default=None)
+    parser.add_argument("--no-seed", action="store_true", help="use the existing rows of --db-url")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--path", default="/news/?limit=10")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 100, 200, 500])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per concurrency level")
+    parser.add_argument("--port", type=int, default=8091)
+    args = parser.parse_args()
+
+    engine = make_engine(args.db_url)
+    if not args.no_seed:
+        seed_news(engine, args.rows)
+    db_url = args.db_url or str(engine.url)
+    async_db_url = args.async_db_url or db_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+    print(f"{'mode':<7}{'clients':>9}{'req/s':>10}{'p99 ms':>10}{'errors':>8}")
+    for mode, db_async in (("sync", "0"), ("async", "1")):
+        server = start_server(args.port, {
+            "DATABASE_URL": db_url,
+            "ASYNC_DATABASE_URL": async_db_url,
+            "DB_ASYNC": db_async,
+            "NEWS_CACHE_ENABLED": "0",
+        })
+        try:
+            for concurrency in args.concurrency:
+                url = f"http://127.0.0.1:{args.port}{args.path}"
+                rps, p99, errors = asyncio.run(run_load(url, concurrency, args.requests))
+                print(f"{mode:<7}{concurrency:>9}{rps:>10.0f}{p99:>10.1f}{errors:>8}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compare OFFSET and keyset (cursor) pagination of `crud.get_news_list`.
+
+    python -m benchmarks.bench_pagination --rows 100000 --page 10000
+"""
+import argparse
+
+from benchmarks.common import make_engine, make_session, seed_news, timed
+from app import crud
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--page", type=int, default=10_000)
+    args = parser.parse_args()
+
+    if args.rows < args.page * args.limit:
+        parser.error("--rows must cover --page * --limit")
+
+    engine = make_engine(args.db_url)
+    seed_news(engine, args.rows, body_size=200)
+    db = make_session(engine)
+
+    # The cursor a client would hold after walking to the requested page.
+    deep_skip = (args.page - 1) * args.limit
+    previous = crud.get_news_list(db, skip=deep_skip - args.limit, limit=args.limit)
+    deep_cursor = crud.next_news_cursor(previous, args.limit)
+
+    pages = {
+        "offset": {
+            1: lambda: crud.get_news_list(db, skip=0, limit=args.limit),
+            args.page: lambda: crud.get_news_list(db, skip=deep_skip, limit=args.limit),
+        },
+        "cursor": {
+            1: lambda: crud.get_news_list(db, limit=args.limit),
+            args.page: lambda: crud.get_news_list(db, limit=args.limit, cursor=deep_cursor),
+        },
+    }
+    assert [n.id for n in pages["offset"][args.page]()] == [n.id for n in pages["cursor"][args.page]()]
+
+    print(f"{args.rows} rows, {args.limit} per page ({engine.url.get_backend_name()})")
+    print(f"{'mode':<8}{'page':>8}{'median ms':>12}")
+    for mode, by_page in pages.items():
+        for page, fetch in by_page.items():
+            db.expunge_all()
+            print(f"{mode:<8}{page:>8}{timed(fetch):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Throughput of scraper.scrape_pages over a fixture corpus as the parse
+process pool grows from 1 to N processes ("0" parses on the fetch threads,
+as before the pool existed).
+
+Pages are served from memory so that only extraction is measured. Use
+--parser bs4 to see the scaling of the heavier BeautifulSoup backend.
+
+    python -m benchmarks.bench_parse_scaling --processes 0 1 2 4 8 --pages 2000
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.bench_parser import FIXTURES, load_pages
+
+from app import config, scraper
+
+
+class MemorySession:
+    """Stands in for the cloudscraper session of a fetch thread."""
+
+    pages = {}
+
+    def get(self, url, timeout=None):
+        class Page:
+            status_code = 200
+            content = self.pages[url]
+
+        return Page()
+
+
+def silence():
+    sys.stdout = open(os.devnull, "w")
+
+
+def run(urls, processes, depth):
+    executor = None
+    if processes:
+        executor = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn"), initializer=silence)
+        # Start every worker (and its imports) before the clock starts.
+        list(executor.map(scraper.extract_news, [urls[0]] * processes, [MemorySession.pages[urls[0]]] * processes))
+    try:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            parsed = sum(1 for result in scraper.scrape_pages(urls, depth, executor) if result.news)
+        return parsed, time.perf_counter() - started
+    finally:
+        if executor:
+            executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, nargs="+", default=[0, *range(1, (os.cpu_count() or 1) + 1)])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--body-words", type=int, default=600)
+    parser.add_argument("--depth", type=int, default=64)
+    parser.add_argument("--parser", choices=["lxml", "bs4"], default="lxml")
+    args = parser.parse_args()
+
+    # Read by the spawned workers when they import app.config.
+    os.environ["SCRAPER_PARSER"] = config.SCRAPER_PARSER = args.parser
+    pages = load_pages([FIXTURES], args.pages, args.body_words)
+    MemorySession.pages = dict(pages)
+    scraper.get_thread_scraper = MemorySession
+    # Pools are passed in explicitly; without one, parse on the fetch threads.
+    config.SCRAPER_PARSE_PROCESSES = 0
+    urls = [url for url, _ in pages]
+
+    print(f"{len(urls)} pages, {args.parser}, {os.cpu_count()} CPUs")
+    print(f"{'processes':>9}{'pages/s':>10}{'speedup':>9}")
+    baseline = None
+    for processes in args.processes:
+        parsed, seconds = run(urls, processes, args.depth)
+        rate = len(urls) / seconds
+        baseline = baseline or rate
+        print(f"{processes:>9}{rate:>10.0f}{rate / baseline:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
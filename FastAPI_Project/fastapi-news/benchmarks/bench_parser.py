@@ -0,0 +1,73 @@
+"""
+Article extraction time of the two scraper backends, scraper.parse_news_bs4
+(BeautifulSoup + html.parser) and scraper.parse_news_lxml, and whether they
+agree on every page.
+
+Pages come from --pages (a directory of saved article pages, named
+<category>_<anything>.html), the test fixtures, and --generated synthetic
+pages from benchmarks.pages.
+
+    python -m benchmarks.bench_parser --pages ~/saved/dailyamardesh --generated 200
+"""
+import argparse
+import contextlib
+import io
+import pathlib
+
+from benchmarks.common import timed
+from benchmarks.corpus import CATEGORIES, Corpus
+from benchmarks.pages import article_page
+
+from app import scraper
+
+FIXTURES = pathlib.Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "pages"
+
+
+def load_pages(directories, generated, body_words):
+    pages = []
+    for directory in directories:
+        for path in sorted(pathlib.Path(directory).expanduser().glob("*.html")):
+            category = path.stem.split("_")[0]
+            pages.append((f"https://dailyamardesh.com/{category}/{path.stem}", path.read_bytes()))
+    corpus = Corpus()
+    for index in range(generated):
+        category = CATEGORIES[index % len(CATEGORIES)].lower()
+        pages.append((f"https://dailyamardesh.com/{category}/{index}", article_page(corpus.article(index, body_words))))
+    return pages
+
+
+def parse_all(parse, pages):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [parse(url, content) for url, content in pages]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", action="append", default=[])
+    parser.add_argument("--generated", type=int, default=100)
+    parser.add_argument("--body-words", type=int, default=600)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_pages([*args.pages, FIXTURES], args.generated, args.body_words)
+    size = sum(len(content) for _, content in pages)
+    print(f"{len(pages)} pages, {size / len(pages) / 1024:.0f} KiB on average")
+
+    reference = parse_all(scraper.parse_news_bs4, pages)
+    candidate = parse_all(scraper.parse_news_lxml, pages)
+    mismatches = [
+        url for (url, _), a, b in zip(pages, reference, candidate)
+        if (a and a.model_dump(exclude={"datetime"})) != (b and b.model_dump(exclude={"datetime"}))
+    ]
+    print(f"identical output: {len(pages) - len(mismatches)}/{len(pages)}")
+    for url in mismatches:
+        print(f"  differs: {url}")
+
+    print(f"{'backend':<8}{'ms/page':>10}{'pages/s':>10}")
+    for name, parse in (("bs4", scraper.parse_news_bs4), ("lxml", scraper.parse_news_lxml)):
+        ms = timed(lambda: parse_all(parse, pages), args.repeat) / len(pages)
+        print(f"{name:<8}{ms:>10.2f}{1000 / ms:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Wall time of POST /news/scrape/ work for a batch of URLs served by the
+stand-in publisher in benchmarks.pages, with every page delayed by --latency.
+
+"sequential" is the previous handler: fetch, parse and insert one URL at a
+time. "concurrent" is the current one: scraper.fetch_pages, then parse and
+insert in input order. Half of the URLs use the host name "localhost" so the
+per-host limit applies to two hosts.
+
+    python -m benchmarks.bench_scrape --urls 50 --latency 0.2 --per-host 1 4 8
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from benchmarks.common import make_engine, make_session
+from benchmarks.pages import ArticleServer
+
+from app import config, crud, scraper
+
+
+def sequential(db, urls):
+    for url in urls:
+        news_data = scraper.single_news_scraper(url)
+        if news_data:
+            crud.create_news(db, news_data)
+
+
+def concurrent(db, urls):
+    for url, content in zip(urls, scraper.fetch_pages(urls)):
+        news_data = scraper.parse_news(url, content) if content is not None else None
+        if news_data:
+            crud.create_news(db, news_data)
+
+
+def run(fn, db, urls):
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(db, urls)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--urls", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--per-host", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    server = ArticleServer(latency=args.latency).start()
+    db = make_session(make_engine(args.db_url))
+    batches = iter(range(0, 10**9, args.urls))
+
+    def urls():
+        start = next(batches)
+        return [server.url(i, "localhost" if i % 2 else "127.0.0.1") for i in range(start, start + args.urls)]
+
+    print(f"{args.urls} URLs, {args.latency * 1000:.0f} ms per page")
+    print(f"{'mode':<12}{'per host':>10}{'seconds':>10}{'pages/s':>10}")
+    seconds = run(sequential, db, urls())
+    print(f"{'sequential':<12}{'-':>10}{seconds:>10.2f}{args.urls / seconds:>10.1f}")
+    for limit in args.per_host:
+        config.SCRAPER_PER_HOST_LIMIT = limit
+        scraper._host_limits.clear()
+        seconds = run(concurrent, db, urls())
+        print(f"{'concurrent':<12}{limit:>10}{seconds:>10.2f}{args.urls / seconds:>10.1f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
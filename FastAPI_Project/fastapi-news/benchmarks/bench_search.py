@@ -0,0 +1,73 @@
+"""
+Latency of `crud.search_news` over a synthetic Bengali corpus.
+
+The FULLTEXT path needs MySQL; without --db-url the SQLite fallback (a LIKE
+scan) is measured instead, which is only meant for small corpora.
+
+    python -m benchmarks.bench_search --db-url mysql+mysqlconnector://u:p@host/db --rows 1000000
+"""
+import argparse
+import datetime
+import time
+
+from benchmarks.common import make_engine, make_session, timed
+from benchmarks.corpus import Corpus
+from sqlalchemy import insert
+
+from app import crud, models, search
+
+
+def load_corpus(engine, corpus, rows, body_words, batch_size=2000):
+    with engine.begin() as conn:
+        conn.execute(insert(models.Category), [{"id": 1, "name": "National", "description": "National description"}])
+        conn.execute(insert(models.Reporter), [{"id": 1, "name": "Reporter", "email": "reporter@gmail.com"}])
+        conn.execute(insert(models.Publisher), [{"id": 1, "name": "dailyamardesh", "website": "https://dailyamardesh.com.com"}])
+    started = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        batch = []
+        for article in corpus.articles(min(batch_size, rows - offset), body_words, start=offset):
+            batch.append({
+                "publisher_website": article["publisher_website"],
+                "title": article["title"],
+                "body": article["body"],
+                "link": article["link"],
+                "datetime": datetime.datetime.fromisoformat(article["datetime"]),
+                "search_text": search.search_document(article["title"], article["body"]),
+                "category_id": 1, "reporter_id": 1, "publisher_id": 1,
+            })
+        with engine.begin() as conn:
+            conn.execute(insert(models.News), batch)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--body-words", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = make_engine(args.db_url)
+    corpus = Corpus()
+    seconds = load_corpus(engine, corpus, args.rows, args.body_words)
+    print(f"loaded {args.rows} articles in {seconds:.1f} s ({engine.url.get_backend_name()})")
+
+    db = make_session(engine)
+    queries = {
+        "frequent word": corpus.word_at_rank(5),
+        "mid word": corpus.word_at_rank(500),
+        "rare word": corpus.word_at_rank(20_000),
+        "two words": f"{corpus.word_at_rank(50)} {corpus.word_at_rank(5000)}",
+        "deep page": corpus.word_at_rank(50),
+    }
+    print(f"{'query':<16}{'hits':>6}{'median ms':>12}")
+    for name, q in queries.items():
+        skip = 100 if name == "deep page" else 0
+        hits = len(crud.search_news(db, q, skip=skip, limit=args.limit))
+        db.expunge_all()
+        print(f"{name:<16}{hits:>6}{timed(lambda: crud.search_news(db, q, skip=skip, limit=args.limit)):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
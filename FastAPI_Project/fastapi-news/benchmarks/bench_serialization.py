@@ -0,0 +1,83 @@
+"""
+Serialization time and wire size of /news/ pages of 10, 100 and 1000 articles.
+
+Encoders compared, all starting from the validated schemas.News models the
+router hands to FastAPI:
+
+- stdlib: jsonable_encoder + json.dumps (FastAPI's JSONResponse before 0.130)
+- pydantic: TypeAdapter.dump_json (FastAPI's built-in fast path)
+- orjson: dump_python(mode="json") + orjson.dumps (app.responses.FastJSONResponse)
+
+followed by the size and time of each Content-Encoding the middleware offers.
+
+    python -m benchmarks.bench_serialization --body-words 600
+"""
+import argparse
+import gzip
+import json
+from typing import List
+
+from benchmarks.common import timed
+from benchmarks.corpus import Corpus
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app import schemas
+from app.compression import brotli
+from app.responses import FastJSONResponse
+
+
+def make_page(corpus, count, body_words):
+    page = []
+    for index, article in enumerate(corpus.articles(count, body_words), start=1):
+        page.append(schemas.News(
+            id=index,
+            title=article["title"],
+            body=article["body"],
+            link=article["link"],
+            datetime=article["datetime"],
+            category=schemas.Category(id=1, name=article["news_category"], description=f"{article['news_category']} description"),
+            reporter=schemas.Reporter(id=1, name=article["news_reporter"], email="reporter@gmail.com"),
+            publisher=schemas.Publisher(id=1, name=article["news_publisher"], website=article["publisher_website"]),
+        ))
+    return page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--body-words", type=int, default=300)
+    parser.add_argument("--sizes", default="10,100,1000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[schemas.News])
+    response = FastJSONResponse(content=None)
+    encoders = {
+        "stdlib": lambda page: json.dumps(jsonable_encoder(page)).encode("utf-8"),
+        "pydantic": adapter.dump_json,
+        "orjson": lambda page: response.render(adapter.dump_python(page, mode="json")),
+    }
+    encodings = {"gzip-6": lambda body: gzip.compress(body, compresslevel=6, mtime=0)}
+    if brotli is not None:
+        encodings["br-4"] = lambda body: brotli.compress(body, quality=4)
+
+    corpus = Corpus()
+    for count in map(int, args.sizes.split(",")):
+        page = make_page(corpus, count, args.body_words)
+        print(f"\n{count} articles")
+        print(f"{'encoder':<10}{'bytes':>12}{'median ms':>12}")
+        for name, encode in encoders.items():
+            body = encode(page)
+            print(f"{name:<10}{len(body):>12}{timed(lambda: encode(page), args.repeat):>12.2f}")
+
+        body = encoders["orjson"](page)
+        print(f"{'encoding':<10}{'bytes':>12}{'median ms':>12}{'ratio':>8}")
+        print(f"{'identity':<10}{len(body):>12}{0:>12.2f}{1:>8.2f}")
+        for name, compress in encodings.items():
+            compressed = compress(body)
+            ms = timed(lambda: compress(body), args.repeat)
+            print(f"{name:<10}{len(compressed):>12}{ms:>12.2f}{len(body) / len(compressed):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Cold-start cost of the API: the time to `import main` in a fresh interpreter,
+and the time from spawning uvicorn to the first request served.
+
+    python -m benchmarks.bench_startup --runs 5 --warmup "" --warmup db
+
+Each `--warmup` value is passed as APP_WARMUP to one series of runs. Run the
+script on two checkouts to compare them.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import make_engine, seed_news
+
+IMPORT_PROBE = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def import_time(env):
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def first_request_time(env, port, path):
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--ws", "none", "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}{path}", timeout=5)
+                response.raise_for_status()
+                return (time.perf_counter() - started) * 1000
+            except httpx.TransportError:
+                if time.perf_counter() - started > 60:
+                    raise RuntimeError("uvicorn did not start")
+                time.sleep(0.005)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/news/?limit=1")
+    parser.add_argument("--port", type=int, default=8092)
+    parser.add_argument("--warmup", action="append", help="APP_WARMUP value; repeatable")
+    args = parser.parse_args()
+
+    engine = make_engine(args.db_url)
+    seed_news(engine, 100)
+    db_url = args.db_url or str(engine.url)
+    env = {
+        **os.environ,
+        "DATABASE_URL": db_url,
+        "ASYNC_DATABASE_URL": db_url.replace("sqlite://", "sqlite+aiosqlite://", 1),
+    }
+
+    print(f"{'APP_WARMUP':<20}{'import ms':>12}{'first request ms':>18}")
+    for warmup in args.warmup or ["db"]:
+        run_env = {**env, "APP_WARMUP": warmup}
+        imports = [import_time(run_env) for _ in range(args.runs)]
+        firsts = [first_request_time(run_env, args.port, args.path) for _ in range(args.runs)]
+        print(f"{warmup or '(none)':<20}{statistics.median(imports):>12.0f}{statistics.median(firsts):>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
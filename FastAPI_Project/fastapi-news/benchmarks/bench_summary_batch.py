@@ -0,0 +1,75 @@
+"""
+Time to summarize --articles articles with one POST /summaries/batch,
+against one POST /summaries/ after another, on a uvicorn worker talking to
+the fake LLM server.
+
+The sequential time is measured on --sequential-sample other articles and
+scaled up, since at a realistic latency it runs for minutes.
+
+    python -m benchmarks.bench_summary_batch --articles 1000 --latency 0.3 --concurrency 32
+"""
+import argparse
+import time
+
+import httpx
+import orjson
+
+from benchmarks.bench_bulk import ndjson
+from benchmarks.bench_load import start_server
+from benchmarks.common import make_engine
+from benchmarks.corpus import Corpus
+from benchmarks.fake_llm import FakeLLMServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=1000)
+    parser.add_argument("--sequential-sample", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--server-limit", type=int, default=32, help="concurrent completions the fake server admits")
+    parser.add_argument("--concurrency", type=int, default=32, help="SUMMARY_MAX_CONCURRENCY and SUMMARY_BATCH_CONCURRENCY")
+    parser.add_argument("--port", type=int, default=8093)
+    args = parser.parse_args()
+
+    llm = FakeLLMServer(latency=args.latency, max_concurrent=args.server_limit).start()
+    db_url = str(make_engine().url)
+    server = start_server(args.port, {
+        "DATABASE_URL": db_url,
+        "ASYNC_DATABASE_URL": db_url.replace("sqlite://", "sqlite+aiosqlite://", 1),
+        "SCRAPE_WORKERS": "0",
+        "GROQ_API_KEY": "fake",
+        "GROQ_BASE_URL": llm.base_url,
+        "SUMMARY_MAX_CONCURRENCY": str(args.concurrency),
+        "SUMMARY_BATCH_CONCURRENCY": str(args.concurrency),
+        "SUMMARY_BATCH_MAX_SIZE": str(args.articles),
+    })
+    base = f"http://127.0.0.1:{args.port}"
+    try:
+        total = args.articles + args.sequential_sample
+        response = httpx.post(f"{base}/news/bulk", content=ndjson(Corpus(), total, 300, start=0), timeout=None)
+        ids = [orjson.loads(line)["id"] for line in response.content.splitlines()]
+
+        with httpx.Client(base_url=base, timeout=None) as client:
+            started = time.perf_counter()
+            for news_id in ids[args.articles:]:
+                client.post("/summaries/", json={"news_id": news_id}).raise_for_status()
+            per_article = (time.perf_counter() - started) / args.sequential_sample
+
+            started = time.perf_counter()
+            result = client.post("/summaries/batch", json={"news_ids": ids[:args.articles]}).json()
+            batch_seconds = time.perf_counter() - started
+
+        sequential_seconds = per_article * args.articles
+        print(f"{args.articles} articles, {args.latency}s per completion, concurrency {args.concurrency}")
+        print(f"sequential POST /summaries/  {sequential_seconds:8.1f} s  (scaled from {args.sequential_sample})")
+        print(f"POST /summaries/batch        {batch_seconds:8.1f} s  {result['counts']}")
+        print(f"speedup                      {sequential_seconds / batch_seconds:8.1f}x")
+        print(f"fake LLM: {llm.stats()}")
+    finally:
+        server.terminate()
+        server.wait()
+        llm.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Time to first token and to last token of POST /summaries/ against POST
+/summaries/stream, on a uvicorn worker talking to the fake LLM server. For
+the plain endpoint both are the time to the whole response.
+
+    python -m benchmarks.bench_summary_stream --requests 20 --latency 3 --first-token 0.3
+"""
+import argparse
+import statistics
+import time
+
+import httpx
+import orjson
+
+from benchmarks.bench_bulk import ndjson
+from benchmarks.bench_load import start_server
+from benchmarks.common import make_engine
+from benchmarks.corpus import Corpus
+from benchmarks.fake_llm import FakeLLMServer
+
+
+def plain(client, news_id):
+    started = time.perf_counter()
+    client.post("/summaries/", json={"news_id": news_id, "force": True}).raise_for_status()
+    seconds = time.perf_counter() - started
+    return seconds, seconds
+
+
+def streamed(client, news_id):
+    started = time.perf_counter()
+    first = None
+    with client.stream("POST", "/summaries/stream", json={"news_id": news_id, "force": True}) as response:
+        for line in response.iter_lines():
+            if line.startswith("event: delta") and first is None:
+                first = time.perf_counter() - started
+            elif line.startswith("data: ") and "error" in orjson.loads(line[6:]):
+                raise RuntimeError(line)
+    return first, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=3.0)
+    parser.add_argument("--first-token", type=float, default=0.3)
+    parser.add_argument("--port", type=int, default=8094)
+    args = parser.parse_args()
+
+    llm = FakeLLMServer(latency=args.latency, max_concurrent=0, first_token=args.first_token).start()
+    db_url = str(make_engine().url)
+    server = start_server(args.port, {
+        "DATABASE_URL": db_url,
+        "ASYNC_DATABASE_URL": db_url.replace("sqlite://", "sqlite+aiosqlite://", 1),
+        "SCRAPE_WORKERS": "0",
+        "GROQ_API_KEY": "fake",
+        "GROQ_BASE_URL": llm.base_url,
+    })
+    base = f"http://127.0.0.1:{args.port}"
+    try:
+        response = httpx.post(f"{base}/news/bulk", content=ndjson(Corpus(), args.requests, 300, start=0), timeout=None)
+        ids = [orjson.loads(line)["id"] for line in response.content.splitlines()]
+
+        print(f"{args.requests} summaries, model latency {args.latency}s, first token after {args.first_token}s")
+        print(f"{'endpoint':<22}{'first token s':>14}{'last token s':>14}")
+        with httpx.Client(base_url=base, timeout=None) as client:
+            for name, request in (("POST /summaries/", plain), ("POST /summaries/stream", streamed)):
+                timings = [request(client, news_id) for news_id in ids]
+                first = statistics.median(t[0] for t in timings)
+                last = statistics.median(t[1] for t in timings)
+                print(f"{name:<22}{first:>14.2f}{last:>14.2f}")
+    finally:
+        server.terminate()
+        server.wait()
+        llm.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Run the scripts from the fastapi-news directory, e.g.
+`python -m benchmarks.bench_pagination`. They use a throwaway SQLite file
+unless `--db-url` points them at a real database.
+"""
+import datetime
+import os
+import statistics
+import tempfile
+import time
+
+# app.database reads these at import time; the benchmarks bring their own engine.
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "bench")
+os.environ.setdefault("DB_PASS", "bench")
+os.environ.setdefault("DB_NAME", "bench")
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base
+
+
+def make_engine(db_url=None):
+    """Engine with the app schema created. Defaults to a fresh temporary SQLite file."""
+    if db_url is None:
+        fd, path = tempfile.mkstemp(suffix=".db", prefix="news-bench-")
+        os.close(fd)
+        db_url = f"sqlite:///{path}"
+    engine = create_engine(db_url)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def make_session(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def seed_news(engine, count, body_size=2000, batch_size=10000):
+    """Bulk-insert `count` synthetic articles sharing a handful of dimension rows."""
+    with engine.begin() as conn:
+        conn.execute(insert(models.Category), [
+            {"id": i + 1, "name": f"Category {i}", "description": f"Category {i} description"} for i in range(8)
+        ])
+        conn.execute(insert(models.Reporter), [
+            {"id": i + 1, "name": f"Reporter {i}", "email": f"reporter{i}@gmail.com"} for i in range(32)
+        ])
+        conn.execute(insert(models.Publisher), [
+            {"id": 1, "name": "dailyamardesh", "website": "https://dailyamardesh.com.com"}
+        ])
+        start = datetime.datetime(2020, 1, 1)
+        body = ("বাংলাদেশের খবর " * (body_size // 15 + 1))[:body_size]
+        for offset in range(0, count, batch_size):
+            conn.execute(insert(models.News), [
+                {
+                    "publisher_website": "dailyamardesh.com",
+                    "title": f"সংবাদ শিরোনাম {i}",
+                    "datetime": start + datetime.timedelta(minutes=i),
+                    "body": body,
+                    "link": f"https://dailyamardesh.com/national/{i}",
+                    "category_id": i % 8 + 1,
+                    "reporter_id": i % 32 + 1,
+                    "publisher_id": 1,
+                }
+                for i in range(offset, min(offset + batch_size, count))
+            ])
+
+
+def timed(fn, repeat=5):
+    """Median wall time of `fn()` in milliseconds over `repeat` runs."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
@@ -0,0 +1,85 @@
+"""
+Synthetic Bengali news corpus for the benchmarks.
+
+Words are random consonant + vowel-sign syllables drawn with a Zipf
+distribution, so a few words are very common and most are rare, as in real
+text. The output is deterministic for a given seed.
+
+    python -m benchmarks.corpus --count 1000 > corpus.ndjson
+"""
+import argparse
+import datetime
+import itertools
+import json
+import random
+import sys
+
+CONSONANTS = "কখগঘচছজঝটঠডঢণতথদধনপফবভমযরলশষসহ"
+VOWEL_SIGNS = ["", "া", "ি", "ী", "ু", "ূ", "ে", "ো", "ৈ", "ৌ"]
+CATEGORIES = ["National", "Politics", "Economy", "International", "Sports", "Entertainment"]
+
+
+def make_vocabulary(size, rng):
+    vocabulary = set()
+    while len(vocabulary) < size:
+        syllables = rng.randint(2, 4)
+        vocabulary.add("".join(rng.choice(CONSONANTS) + rng.choice(VOWEL_SIGNS) for _ in range(syllables)))
+    return sorted(vocabulary)
+
+
+class Corpus:
+    def __init__(self, vocabulary_size=50_000, seed=42):
+        self.rng = random.Random(seed)
+        self.vocabulary = make_vocabulary(vocabulary_size, self.rng)
+        weights = [1 / rank for rank in range(1, vocabulary_size + 1)]
+        self.cumulative_weights = list(itertools.accumulate(weights))
+
+    def words(self, count):
+        return self.rng.choices(self.vocabulary, cum_weights=self.cumulative_weights, k=count)
+
+    def word_at_rank(self, rank):
+        """The `rank`-th most frequent word (1-based)."""
+        return self.vocabulary[rank - 1]
+
+    def body(self, words):
+        sentences = []
+        remaining = words
+        while remaining > 0:
+            length = min(remaining, self.rng.randint(8, 20))
+            sentences.append(" ".join(self.words(length)) + "।")
+            remaining -= length
+        return " ".join(sentences)
+
+    def article(self, index, body_words=300):
+        """A dict shaped like schemas.NewsCreate."""
+        category = CATEGORIES[index % len(CATEGORIES)]
+        return {
+            "title": " ".join(self.words(self.rng.randint(6, 10))),
+            "body": self.body(body_words),
+            "link": f"https://dailyamardesh.com/{category.lower()}/synthetic{index}",
+            "datetime": (datetime.datetime(2020, 1, 1) + datetime.timedelta(minutes=index)).isoformat(),
+            "news_category": category,
+            "news_reporter": f"Reporter {index % 50}",
+            "news_publisher": "dailyamardesh",
+            "publisher_website": "dailyamardesh.com",
+            "images": [f"https://dailyamardesh.com/images/synthetic{index}.jpg"],
+        }
+
+    def articles(self, count, body_words=300, start=0):
+        for index in range(start, start + count):
+            yield self.article(index, body_words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--body-words", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for article in Corpus(seed=args.seed).articles(args.count, args.body_words):
+        sys.stdout.write(json.dumps(article, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
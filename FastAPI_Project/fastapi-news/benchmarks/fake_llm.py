@@ -0,0 +1,221 @@
+"""
+Stand-in for the Groq chat completions API (the OpenAI-compatible
+/openai/v1/chat/completions), answering after an injected delay and
+rejecting requests beyond a concurrency limit with 429 and Retry-After, the
+way a rate-limited provider does. "stream": true requests get the text as
+chat.completion.chunk events: the first after --first-token seconds, the
+rest spread over the remaining latency. --prompt-latency adds prefill time
+per 1000 prompt tokens, and prompts above --context-limit tokens are
+rejected with 400 context_length_exceeded.
+
+Point the API at it with GROQ_BASE_URL=http://127.0.0.1:8098 and any
+GROQ_API_KEY.
+
+    python -m benchmarks.fake_llm --port 8098 --latency 0.5 --max-concurrent 8
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+
+def count_tokens(text):
+    # Close enough for a stand-in; the real tokenizer is not needed here.
+    # Bengali takes about twice the tokens per character of English.
+    return max(1, len(text) // (4 if text.isascii() else 2))
+
+
+def completion_text(messages):
+    body = messages[-1]["content"]
+    return "\n".join(f"• বিষয় {i}: {body[:40]}" for i in range(1, 4))
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """
+    Counts requests, 429s and TCP connections so a client's connection
+    reuse and retry behaviour can be read off after a run.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, port=0, latency=0.5, max_concurrent=8, retry_after=0.2, first_token=None,
+        prompt_latency=0.0, context_limit=0,
+    ):
+        super().__init__(("127.0.0.1", port), FakeLLMHandler)
+        self.latency = latency
+        self.prompt_latency = prompt_latency
+        self.context_limit = context_limit
+        self.first_token = latency / 10 if first_token is None else first_token
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.too_long = 0
+        self.connections = 0
+        self.prompt_tokens = 0
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def admit(self):
+        with self.lock:
+            self.requests += 1
+            if self.max_concurrent and self.in_flight >= self.max_concurrent:
+                self.rate_limited += 1
+                return False
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return True
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "rate_limited": self.rate_limited,
+                "too_long": self.too_long,
+                "prompt_tokens": self.prompt_tokens,
+                "connections": self.connections,
+                "peak_in_flight": self.peak_in_flight,
+            }
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path != COMPLETIONS_PATH:
+            self.send_json(404, {"error": {"message": f"no route {self.path}"}})
+            return
+        prompt_tokens = sum(count_tokens(message["content"]) for message in request["messages"])
+        if self.server.context_limit and prompt_tokens > self.server.context_limit:
+            with self.server.lock:
+                self.server.too_long += 1
+            self.send_json(400, {"error": {
+                "message": f"{prompt_tokens} prompt tokens exceed the context of {self.server.context_limit}",
+                "type": "invalid_request_error",
+                "code": "context_length_exceeded",
+            }})
+            return
+        if not self.server.admit():
+            self.send_json(
+                429,
+                {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+                {"Retry-After": str(self.server.retry_after)},
+            )
+            return
+        with self.server.lock:
+            self.server.prompt_tokens += prompt_tokens
+        prefill = self.server.prompt_latency * prompt_tokens / 1000
+        try:
+            text = completion_text(request["messages"])
+            if request.get("stream"):
+                self.stream(request, text, prefill)
+                return
+            time.sleep(prefill + self.server.latency)
+            completion_tokens = min(count_tokens(text), request.get("max_tokens") or 1 << 30)
+            self.send_json(200, {
+                "id": f"chatcmpl-{self.server.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+        finally:
+            self.server.release()
+
+    def stream(self, request, text, prefill):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = text.split(" ")
+        time.sleep(prefill + self.server.first_token)
+        gap = max(0.0, self.server.latency - self.server.first_token) / max(1, len(words) - 1)
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(gap)
+            self.send_chunk(self.sse({
+                "id": f"chatcmpl-{self.server.requests}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}],
+            }))
+        self.send_chunk(b"data: [DONE]\n\n")
+        self.send_chunk(b"")
+
+    @staticmethod
+    def sse(payload):
+        return b"data: " + json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n\n"
+
+    def send_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--max-concurrent", type=int, default=8, help="0 for no limit")
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    parser.add_argument("--first-token", type=float, default=None, help="defaults to a tenth of --latency")
+    parser.add_argument("--prompt-latency", type=float, default=0.0, help="seconds per 1000 prompt tokens")
+    parser.add_argument("--context-limit", type=int, default=0, help="prompt tokens; 0 for no limit")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(
+        args.port, args.latency, args.max_concurrent, args.retry_after, args.first_token,
+        args.prompt_latency, args.context_limit,
+    )
+    print(f"serving chat completions at {server.base_url}{COMPLETIONS_PATH} ...")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
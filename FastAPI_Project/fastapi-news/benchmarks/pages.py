@@ -0,0 +1,112 @@
+"""
+Stand-in for a publisher site: article pages laid out like dailyamardesh.com,
+so the selectors in app/scraper.py find every field, served over HTTP with an
+injected delay.
+
+    python -m benchmarks.pages --port 8099 --latency 0.2
+"""
+import argparse
+import html
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.corpus import CATEGORIES, Corpus
+
+
+def article_page(article):
+    """An HTML page for a corpus article (see benchmarks.corpus.Corpus.article)."""
+    paragraphs = "".join(f"<p>{html.escape(sentence)}</p>" for sentence in article["body"].split("। "))
+    images = "".join(f'<img src="{html.escape(url)}" alt="">' for url in article["images"])
+    return f"""<!DOCTYPE html>
+<html lang="bn">
+<head><meta charset="utf-8"><title>{html.escape(article["title"])}</title></head>
+<body>
+<section>
+  <div>
+    <div class="breadcrumb"><a href="/">প্রচ্ছদ</a></div>
+    <div>
+      <div class="grid lg:grid-cols-[200px_auto_300px] gap-6 mb-6">
+        <div class="sidebar"></div>
+        <div>
+          <div class="mb-3"><h1>{html.escape(article["title"])}</h1></div>
+          <div class="text-xl text-[#292929] mb-2 lg:mb-2"><span>{html.escape(article["news_reporter"])}</span></div>
+          <div class="text-sm">{html.escape(article["datetime"])}</div>
+          {images}
+          <div class="block-full_richtext">{paragraphs}</div>
+        </div>
+        <div class="sidebar"></div>
+      </div>
+    </div>
+  </div>
+</section>
+</body>
+</html>
+""".encode("utf-8")
+
+
+class ArticleServer(ThreadingHTTPServer):
+    """
+    Serves `/<category>/<n>` as the page of corpus article n after sleeping
+    `latency` seconds. Pages are rendered once and cached.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0, body_words=300):
+        super().__init__(("127.0.0.1", port), ArticleHandler)
+        self.latency = latency
+        self.body_words = body_words
+        self.corpus = Corpus()
+        self.pages = {}
+        self.lock = threading.Lock()
+
+    def page(self, index):
+        with self.lock:
+            if index not in self.pages:
+                self.pages[index] = article_page(self.corpus.article(index, self.body_words))
+            return self.pages[index]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def url(self, index, host="127.0.0.1"):
+        category = CATEGORIES[index % len(CATEGORIES)].lower()
+        return f"http://{host}:{self.server_address[1]}/{category}/{index}"
+
+
+class ArticleHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        try:
+            index = int(self.path.rstrip("/").rsplit("/", 1)[1])
+        except ValueError:
+            self.send_error(404)
+            return
+        time.sleep(self.server.latency)
+        body = self.server.page(index)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = ArticleServer(args.port, args.latency)
+    print(f"serving articles at {server.url(0)} ...")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
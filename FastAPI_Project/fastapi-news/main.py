@@ -1,7 +1,11 @@
 from fastapi import FastAPI
 import uvicorn
 
-from app.routers import news, summary
+from app import config
+from app.compression import CompressionMiddleware
+from app.lifespan import lifespan
+from app.responses import FastJSONResponse
+from app.routers import internal, news, summary
 
 # app = FastAPI()
 
@@ -21,10 +25,22 @@ app = FastAPI(
     # },
     # redoc_url="/documentation",
     # docs_url="/try-out",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+if config.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=config.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=config.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=config.COMPRESSION_BROTLI_QUALITY,
+        thread_size=config.COMPRESSION_THREAD_SIZE,
+    )
+
 app.include_router(news.router)
 app.include_router(summary.router)
+app.include_router(internal.router)
 
 @app.get("/")
 def read_root():
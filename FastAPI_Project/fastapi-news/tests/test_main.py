@@ -0,0 +1,855 @@
+import asyncio
+import contextlib
+import datetime
+import io
+import multiprocessing
+import os
+import pathlib
+import threading
+import time
+
+# app.database reads these at import time; the tests never touch MySQL.
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASS", "test")
+os.environ.setdefault("DB_NAME", "test")
+os.environ.setdefault("DB_ASYNC", "0")
+
+import orjson
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import config, crud, dependencies, dimensions, jobs, models, schemas, scraper, tokens, utility
+from app.cache import news_cache
+from app.compression import negotiate
+from app.dimensions import dimension_cache
+from app.summaries import summary_stats
+from app.database import Base
+from main import app
+
+
+def use_real_savepoints(engine):
+    """
+    pysqlite's own transaction handling commits at SAVEPOINT and RELEASE;
+    let SQLAlchemy emit BEGIN itself so begin_nested() behaves as on MySQL.
+    The sessions of a test share one connection (StaticPool), so a BEGIN is
+    only sent when no transaction is open yet.
+    """
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin(connection):
+        if not connection.connection.dbapi_connection.in_transaction:
+            connection.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture()
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    use_real_savepoints(engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def db_session(engine):
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[dependencies.get_db] = override_get_db
+    news_cache.clear()
+    dimension_cache.clear()
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def client(db_session):
+    return TestClient(app)
+
+
+@pytest.fixture()
+def statements(engine):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # The BEGIN of use_real_savepoints is not a query.
+        if statement != "BEGIN":
+            executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def seed_news(db, count):
+    """Insert `count` articles, each with its own category, reporter and publisher."""
+    start = datetime.datetime(2025, 1, 1)
+    for i in range(count):
+        category = models.Category(name=f"Category {i}", description=f"Category {i} description")
+        reporter = models.Reporter(name=f"Reporter {i}", email=f"reporter{i}@gmail.com")
+        publisher = models.Publisher(name=f"Publisher {i}", website=f"https://publisher{i}.com")
+        db.add_all([category, reporter, publisher])
+        db.add(models.News(
+            publisher_website=f"publisher{i}.com",
+            title=f"Title {i}",
+            datetime=start + datetime.timedelta(minutes=i),
+            body=f"Body {i}",
+            link=f"https://publisher{i}.com/national/{i}",
+            category=category,
+            reporter=reporter,
+            publisher=publisher,
+        ))
+    db.commit()
+
+
+def news_create(link, **overrides):
+    """A NewsCreate for `link` filed under the dimensions of the first seed_news article."""
+    fields = dict(
+        title="New", body="Body", link=link, datetime=datetime.datetime(2030, 1, 1),
+        news_publisher="Publisher 0", news_reporter="Reporter 0", news_category="Category 0",
+        publisher_website="publisher0.com",
+    )
+    return schemas.NewsCreate(**{**fields, **overrides})
+
+
+def test_read_news_list_uses_constant_number_of_queries(client, db_session, statements):
+    seed_news(db_session, 100)
+    statements.clear()
+
+    response = client.get("/news/?limit=100")
+
+    assert response.status_code == 200
+    news_list = response.json()
+    assert len(news_list) == 100
+    assert news_list[0]["title"] == "Title 99"
+    assert news_list[0]["category"]["name"] == "Category 99"
+    assert news_list[0]["reporter"]["name"] == "Reporter 99"
+    assert news_list[0]["publisher"]["name"] == "Publisher 99"
+    # One SELECT for the page plus one per related table.
+    assert len(statements) <= 4
+
+
+def test_read_news_uses_single_query(client, db_session, statements):
+    seed_news(db_session, 3)
+    statements.clear()
+
+    response = client.get("/news/2")
+
+    assert response.status_code == 200
+    assert response.json()["publisher"]["name"] == "Publisher 1"
+    assert len(statements) == 1
+
+
+def test_cursor_pagination_walks_every_row_once(client, db_session):
+    seed_news(db_session, 7)
+    # Rows sharing a datetime must neither repeat nor drop across pages.
+    news = db_session.query(models.News).order_by(models.News.id).all()
+    news[1].datetime = news[2].datetime = news[3].datetime = news[4].datetime
+    db_session.commit()
+
+    expected = [n["id"] for n in client.get("/news/?limit=100").json()]
+    walked, cursor = [], None
+    while True:
+        response = client.get("/news/", params={"limit": 2, "cursor": cursor} if cursor else {"limit": 2})
+        walked += [n["id"] for n in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert walked == expected
+    assert client.get("/news/?cursor=not-a-cursor").status_code == 400
+
+
+def test_compact_view_never_selects_body(client, db_session, statements):
+    seed_news(db_session, 3)
+    statements.clear()
+
+    news_list = client.get("/news/?view=compact").json()
+    news = client.get("/news/1?view=compact").json()
+
+    assert set(news_list[0]) == {"id", "title", "link", "datetime"}
+    assert set(news) == {"id", "title", "link", "datetime"}
+    assert len(statements) == 2
+    assert not any("news.body" in statement for statement in statements)
+
+
+def test_news_list_is_cached_until_news_is_created(client, db_session, statements):
+    seed_news(db_session, 2)
+    client.get("/news/")
+    statements.clear()
+
+    assert len(client.get("/news/").json()) == 2
+    assert statements == []
+
+    crud.create_news(db_session, news_create("https://publisher0.com/national/fresh", title="Fresh"))
+
+    assert client.get("/news/").json()[0]["title"] == "Fresh"
+
+
+def test_conditional_get_returns_304_for_unchanged_news(client, db_session):
+    seed_news(db_session, 2)
+
+    first = client.get("/news/1")
+    etag = first.headers["ETag"]
+    repeat = client.get("/news/1", headers={"If-None-Match": etag})
+    since = client.get("/news/1", headers={"If-Modified-Since": "Tue, 01 Jan 2100 00:00:00 GMT"})
+    other_view = client.get("/news/1?view=compact", headers={"If-None-Match": etag})
+
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+    assert repeat.headers["ETag"] == etag
+    assert "last-modified" not in first.headers
+    assert since.status_code == 200
+    assert other_view.status_code == 200
+
+    page = client.get("/news/?limit=1")
+    assert client.get("/news/?limit=1", headers={"If-None-Match": page.headers["ETag"]}).status_code == 304
+    assert "last-modified" not in page.headers
+    assert client.get("/news/?limit=1", headers={"If-Modified-Since": "Tue, 01 Jan 2100 00:00:00 GMT"}).status_code == 200
+
+
+def test_async_session_serves_reads_and_scrape(tmp_path, monkeypatch):
+    db_file = tmp_path / "news.db"
+    sync_engine = create_engine(f"sqlite:///{db_file}")
+    Base.metadata.create_all(bind=sync_engine)
+    seed_news(sessionmaker(bind=sync_engine)(), 2)
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_file}")
+    AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    scraped = news_create("https://publisher0.com/national/scraped", title="Scraped")
+    monkeypatch.setattr(scraper, "scrape_pages", lambda urls: (scraper.ScrapeResult(url, True, scraped) for url in urls))
+    app.dependency_overrides[dependencies.get_session] = override_get_async_db
+    news_cache.clear()
+    dimension_cache.clear()
+    try:
+        client = TestClient(app)
+        assert [n["title"] for n in client.get("/news/").json()] == ["Title 1", "Title 0"]
+        assert client.get("/news/1").json()["category"]["name"] == "Category 0"
+
+        queued = client.post("/news/scrape/", json=["https://publisher0.com/national/scraped"])
+        assert queued.status_code == 202
+        jobs.run_next_job(sessionmaker(bind=sync_engine))
+
+        job = client.get(f"/news/scrape/jobs/{queued.json()['id']}").json()
+        assert job["status"] == "done"
+        inserted = client.get(f"/news/{job['items'][0]['news_id']}").json()
+        assert inserted["title"] == "Scraped"
+        assert inserted["publisher"]["name"] == "Publisher 0"
+    finally:
+        app.dependency_overrides.clear()
+        sync_engine.dispose()
+
+
+def test_search_matches_normalized_bengali_words(client, db_session):
+    seed_news(db_session, 2)
+    db_session.add(models.News(
+        title="ঢাকায় ২০২৫ সালের বন্যা",
+        body="নদীর পানি বেড়েছে। উত্‍পাদন কমেছে।",
+        link="https://publisher0.com/national/flood",
+        datetime=datetime.datetime(2025, 6, 1),
+        category_id=1, reporter_id=1, publisher_id=1,
+    ))
+    db_session.commit()
+    assert crud.backfill_search_text(db_session) == 3
+
+    found = client.get("/news/search", params={"q": "বন্যা 2025 উৎপাদন", "view": "compact"}).json()
+    assert [news["link"] for news in found] == ["https://publisher0.com/national/flood"]
+    assert client.get("/news/search", params={"q": "খরা"}).json() == []
+
+
+def test_large_responses_are_compressed_and_still_revalidate(client, db_session):
+    seed_news(db_session, 20)
+
+    small = client.get("/news/1?view=compact", headers={"Accept-Encoding": "gzip, br"})
+    gzipped = client.get("/news/?limit=20", headers={"Accept-Encoding": "gzip"})
+    brotli = client.get("/news/?limit=20", headers={"Accept-Encoding": "gzip;q=0.5, br"})
+    identity = client.get("/news/?limit=20", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in small.headers
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert brotli.headers["Content-Encoding"] == "br"
+    assert "content-encoding" not in identity.headers
+    assert gzipped.json() == brotli.json() == identity.json()
+    assert gzipped.headers["Vary"] == "Accept-Encoding"
+    assert gzipped.headers["ETag"] == "W/" + identity.headers["ETag"]
+
+    repeat = client.get("/news/?limit=20", headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["ETag"]})
+    assert repeat.status_code == 304
+
+
+def test_compression_picks_the_accepted_coding_of_highest_quality():
+    assert negotiate("br;q=0.1, gzip;q=1") == "gzip"
+    assert negotiate("gzip;q=0.5, br") == "br"
+    assert negotiate("gzip, br") == "br"
+    assert negotiate("*;q=0.3, gzip;q=0.2") == "br"
+    assert negotiate("br;q=0, gzip;q=0") is None
+    assert negotiate("identity") is None
+
+
+def test_fetch_pages_keeps_input_order_and_per_host_limit(monkeypatch):
+    in_flight = {}
+    peak = {}
+    lock = threading.Lock()
+
+    class FakeSession:
+        def get(self, url, timeout):
+            host = url.split("/")[2]
+            with lock:
+                in_flight[host] = in_flight.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), in_flight[host])
+            # Later URLs answer first, so completion order differs from input order.
+            time.sleep(0.05 / (int(url.rsplit("/", 1)[1]) + 1))
+            with lock:
+                in_flight[host] -= 1
+
+            class Page:
+                status_code = 404 if url.endswith("/3") else 200
+                content = url.encode()
+
+            return Page()
+
+    monkeypatch.setattr(config, "SCRAPER_PER_HOST_LIMIT", 2)
+    monkeypatch.setattr(scraper, "_host_limits", {})
+    monkeypatch.setattr(scraper, "get_thread_scraper", FakeSession)
+    urls = [f"https://publisher{i % 2}.com/national/{i}" for i in range(8)]
+
+    pages = scraper.fetch_pages(urls)
+
+    assert pages == [None if url.endswith("/3") else url.encode() for url in urls]
+    assert peak == {"publisher0.com": 2, "publisher1.com": 2}
+
+
+def test_scrape_job_reports_item_status_and_resumes_after_restart(client, db_session, engine, monkeypatch):
+    seed_news(db_session, 1)
+    urls = [
+        "https://publisher0.com/national/new",
+        "https://publisher0.com/national/missing",
+        "https://publisher0.com/national/0",
+        "https://publisher0.com/national/renamed",
+    ]
+
+    def parse_news(url):
+        title = "Title 0" if url.endswith("/renamed") else "New"
+        return news_create(url, title=title)
+
+    monkeypatch.setattr(scraper, "scrape_pages", lambda urls: (
+        scraper.ScrapeResult(url, False, None) if "missing" in url else scraper.ScrapeResult(url, True, parse_news(url))
+        for url in urls
+    ))
+
+    queued = client.post("/news/scrape/", json=urls).json()
+    assert queued["status"] == "queued"
+    assert [item["status"] for item in queued["items"]] == ["pending", "pending", "skipped", "pending"]
+
+    # A process that stopped while the job was running leaves it claimed
+    # until its lease expires.
+    monkeypatch.setattr(config, "SCRAPE_JOB_LEASE", 60)
+    TestingSessionLocal = sessionmaker(bind=engine)
+    with TestingSessionLocal() as db:
+        assert crud.claim_scrape_job(db, lease_seconds=60, max_attempts=3) == (queued["id"], 1)
+        assert crud.claim_scrape_job(db, lease_seconds=60, max_attempts=3) is None
+        db.query(models.ScrapeJob).update({"heartbeat_at": datetime.datetime.now() - datetime.timedelta(seconds=61)})
+        db.commit()
+
+    assert jobs.run_next_job(TestingSessionLocal) == queued["id"]
+    assert jobs.run_next_job(TestingSessionLocal) is None
+
+    job = client.get(f"/news/scrape/jobs/{queued['id']}").json()
+    assert (job["status"], job["attempts"]) == ("done", 2)
+    assert [item["url"] for item in job["items"]] == urls
+    assert [item["status"] for item in job["items"]] == ["stored", "failed", "skipped", "duplicate"]
+    assert job["items"][1]["error"] == "could not fetch the page"
+    assert job["items"][2]["news_id"] == job["items"][3]["news_id"] == 1
+    assert client.get(f"/news/{job['items'][0]['news_id']}").json()["title"] == "New"
+    assert client.get("/news/scrape/jobs/999").status_code == 404
+
+
+def test_scrape_item_losing_a_race_on_its_link_is_a_duplicate(db_session, monkeypatch):
+    seed_news(db_session, 1)
+    item = models.ScrapeJobItem(url="https://publisher0.com/national/0", status="fetched")
+    news_data = news_create(item.url, title="Another title")
+    # The article was stored after the job checked for it.
+    monkeypatch.setattr(crud, "get_news_by_link", lambda db, link: None)
+
+    jobs.store_item(db_session, item, news_data)
+
+    assert (item.status, item.news_id, item.error) == ("duplicate", 1, None)
+    assert db_session.query(models.News).count() == 1
+
+
+def test_scrape_job_that_keeps_raising_ends_failed(client, engine, monkeypatch):
+    def scrape_pages(urls):
+        raise RuntimeError("parser crashed")
+        yield
+
+    monkeypatch.setattr(scraper, "scrape_pages", scrape_pages)
+    monkeypatch.setattr(config, "SCRAPE_JOB_MAX_ATTEMPTS", 2)
+    queued = client.post("/news/scrape/", json=["https://publisher0.com/national/poison"]).json()
+    TestingSessionLocal = sessionmaker(bind=engine)
+
+    assert jobs.run_next_job(TestingSessionLocal) == queued["id"]
+    assert client.get(f"/news/scrape/jobs/{queued['id']}").json()["status"] == "queued"
+    assert jobs.run_next_job(TestingSessionLocal) == queued["id"]
+    assert jobs.run_next_job(TestingSessionLocal) is None
+
+    job = client.get(f"/news/scrape/jobs/{queued['id']}").json()
+    assert (job["status"], job["attempts"], job["error"]) == ("failed", 2, "parser crashed")
+    assert job["finished_at"] is not None
+
+
+def test_scrape_rejects_urls_longer_than_a_news_link(client, db_session):
+    url = "https://publisher0.com/national/" + "a" * 224
+    response = client.post("/news/scrape/", json=["https://publisher0.com/national/ok", url])
+    assert response.status_code == 422
+    assert db_session.query(models.ScrapeJob).count() == 0
+    assert client.post("/news/scrape/", json=[url[:255]]).status_code == 202
+
+
+def test_scrape_worker_stops_once_its_job_is_claimed_again(client, engine, monkeypatch):
+    monkeypatch.setattr(scraper, "scrape_pages", lambda urls: pytest.fail(f"fetched {urls}"))
+    queued = client.post("/news/scrape/", json=["https://publisher0.com/national/slow"]).json()
+    TestingSessionLocal = sessionmaker(bind=engine)
+    with TestingSessionLocal() as db:
+        job_id, attempts = crud.claim_scrape_job(db, lease_seconds=60, max_attempts=3)
+        # The worker stalls past its lease and another one takes the job over.
+        db.query(models.ScrapeJob).update({"heartbeat_at": datetime.datetime.now() - datetime.timedelta(seconds=61)})
+        db.commit()
+        assert crud.claim_scrape_job(db, lease_seconds=60, max_attempts=3) == (job_id, attempts + 1)
+
+    with pytest.raises(jobs.LeaseLost):
+        jobs.process_job(TestingSessionLocal, job_id, attempts)
+    with TestingSessionLocal() as db:
+        assert crud.release_scrape_job(db, job_id, attempts, "stalled", max_attempts=3) is None
+
+    job = client.get(f"/news/scrape/jobs/{queued['id']}").json()
+    assert (job["status"], job["attempts"], job["error"]) == ("running", 2, None)
+    assert [item["status"] for item in job["items"]] == ["pending"]
+
+
+FIXTURE_PAGES = sorted((pathlib.Path(__file__).parent / "fixtures" / "pages").glob("*.html"))
+
+
+@pytest.mark.parametrize("page", FIXTURE_PAGES, ids=lambda page: page.stem)
+def test_lxml_extraction_matches_beautifulsoup(page):
+    url = f"https://dailyamardesh.com/{page.stem.split('_')[0]}/{page.stem}"
+    with contextlib.redirect_stdout(io.StringIO()):
+        reference = scraper.parse_news_bs4(url, page.read_bytes())
+        extracted = scraper.parse_news_lxml(url, page.read_bytes())
+
+    assert extracted.model_dump(exclude={"datetime"}) == reference.model_dump(exclude={"datetime"})
+    if page.stem == "national_article":
+        assert extracted.title == "সংসদ নির্বাচনেরতফসিল   ঘোষণা& প্রতিক্রিয়া"
+        assert extracted.body.count("\n") == 4
+        assert "" in extracted.images
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_scrape_pipeline_parses_in_order_with_bounded_lookahead(monkeypatch, processes):
+    pages = {f"https://dailyamardesh.com/{page.stem.split('_')[0]}/{page.stem}": page.read_bytes() for page in FIXTURE_PAGES}
+    urls = [*pages, "https://dailyamardesh.com/national/missing"] * 3
+    fetched = []
+
+    class FakeSession:
+        def get(self, url, timeout):
+            fetched.append(url)
+
+            class Page:
+                status_code = 200 if url in pages else 404
+                content = pages.get(url)
+
+            return Page()
+
+    monkeypatch.setattr(scraper, "get_thread_scraper", FakeSession)
+    parse_executor = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn")) if processes else None
+    monkeypatch.setattr(scraper, "get_parse_executor", lambda: parse_executor)
+    try:
+        results = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for consumed, result in enumerate(scraper.scrape_pages(urls, max_in_flight=3)):
+                time.sleep(0.01)
+                assert len(fetched) <= consumed + 1 + 3
+                results.append(result)
+            expected = [scraper.parse_news_bs4(url, pages[url]) if url in pages else None for url in urls]
+    finally:
+        if parse_executor:
+            parse_executor.shutdown()
+
+    assert [result.url for result in results] == urls
+    assert [result.fetched for result in results] == [url in pages for url in urls]
+    assert [result.news and result.news.model_dump(exclude={"datetime"}) for result in results] == [
+        news and news.model_dump(exclude={"datetime"}) for news in expected
+    ]
+
+
+def test_scrape_pipeline_resolves_every_url_when_a_step_breaks(monkeypatch):
+    urls = [f"https://dailyamardesh.com/national/{i}" for i in range(3)]
+
+    def no_session():
+        raise RuntimeError("cloudscraper is down")
+
+    monkeypatch.setattr(scraper, "get_thread_scraper", no_session)
+    monkeypatch.setattr(scraper, "get_parse_executor", lambda: None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert [result.fetched for result in scraper.scrape_pages(urls)] == [False] * 3
+
+    # A pool whose worker died is dropped, so the next scrape starts a new one.
+    class BrokenPool:
+        def submit(self, *args):
+            raise BrokenProcessPool("a worker died")
+
+        def shutdown(self, wait, cancel_futures):
+            pass
+
+    broken = BrokenPool()
+    monkeypatch.setattr(scraper, "_parse_executor", broken)
+    monkeypatch.setattr(scraper, "fetch_page_in_worker", lambda url: b"<html></html>")
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = list(scraper.scrape_pages(urls, parse_executor=broken))
+    assert [(result.fetched, result.news) for result in results] == [(True, None)] * 3
+    assert scraper._parse_executor is None
+
+
+def test_known_urls_are_skipped_before_fetching(client, db_session, monkeypatch):
+    seed_news(db_session, 3)
+    known = [f"https://publisher{i}.com/national/{i}" for i in range(3)]
+    monkeypatch.setattr(scraper, "scrape_pages", lambda urls: pytest.fail(f"fetched {urls}"))
+
+    assert crud.get_existing_links(db_session, [*known, "https://publisher0.com/national/new"], chunk_size=2) == {
+        url: i + 1 for i, url in enumerate(known)
+    }
+    job = client.post("/news/scrape/", json=known).json()
+    assert job["status"] == "done"
+    assert [(item["status"], item["news_id"]) for item in job["items"]] == [("skipped", 1), ("skipped", 2), ("skipped", 3)]
+    assert jobs.run_next_job(sessionmaker(bind=db_session.get_bind())) is None
+
+    db_session.add(models.News(title="Copy", link=known[0]))
+    with pytest.raises(IntegrityError):
+        db_session.commit()
+
+
+def test_create_news_writes_article_in_one_transaction(db_session, engine, statements):
+    commits = []
+
+    def record(conn):
+        commits.append(conn)
+
+    event.listen(engine, "commit", record)
+    news = news_create(
+        "https://publisher0.com/national/new", images=[f"https://publisher0.com/images/{i}.jpg" for i in range(3)]
+    )
+    try:
+        db_news = crud.create_news(db_session, news)
+    finally:
+        event.remove(engine, "commit", record)
+
+    assert len(commits) == 1
+    assert len([s for s in statements if s.startswith("INSERT INTO images")]) == 1
+    assert [image.url for image in db_session.query(models.Image).filter_by(news_id=db_news.id)] == news.images
+
+
+def test_dimension_ids_are_cached_after_commit_and_inserted_once(client, db_session, monkeypatch):
+    before = dimension_cache.stats()["tables"]["categories"]
+    for i in range(3):
+        crud.create_news(db_session, news_create(f"https://publisher0.com/national/new{i}", title=f"New {i}"))
+    after = dimension_cache.stats()["tables"]["categories"]
+    assert (after["misses"] - before["misses"], after["hits"] - before["hits"], after["inserts"] - before["inserts"]) == (1, 2, 1)
+
+    # Rows of a rolled-back transaction never reach the cache, even once a
+    # later SAVEPOINT in the same transaction has been released.
+    crud.get_or_create_category(db_session, "Rolled back", "description")
+    crud.get_or_create_reporter(db_session, "Rolled back reporter", "rolled@back.com")
+    db_session.rollback()
+    assert dimension_cache.get(models.Category, "Rolled back") is None
+    assert dimension_cache.get(models.Reporter, "Rolled back reporter") is None
+    assert db_session.query(models.Category).filter_by(name="Rolled back").count() == 0
+
+    # Another process inserts "Sports" between our lookup and our insert.
+    other = sessionmaker(bind=db_session.get_bind())()
+    other.add(models.Category(name="Sports", description="Sports description"))
+    other.commit()
+    find_id = dimensions.find_id
+    monkeypatch.setattr(dimensions, "find_id", lambda db, model, name, locking=False: find_id(db, model, name, locking) if locking else None)
+
+    sports_id = crud.get_or_create_category(db_session, "Sports", "Sports description")
+    db_session.commit()
+    assert sports_id == other.query(models.Category.id).filter_by(name="Sports").scalar()
+    assert db_session.query(models.Category).filter_by(name="Sports").count() == 1
+    assert client.get("/internal/dimensions").json()["tables"]["categories"]["conflicts"] == 1
+    other.close()
+
+
+def test_bulk_ndjson_ingest_reports_outcome_per_line(client, db_session, monkeypatch):
+    seed_news(db_session, 1)
+    monkeypatch.setattr(config, "BULK_BATCH_SIZE", 2)
+
+    def record(i):
+        return news_create(
+            f"https://publisher0.com/national/bulk{i}", title=f"Bulk {i}", images=[f"https://publisher0.com/images/bulk{i}.jpg"]
+        ).model_dump_json().encode()
+
+    lines = [
+        record(1),
+        b'{"title": "no body"}',
+        record(2),
+        b"",
+        record(3).replace(b"national/bulk3", b"national/bulk1"),
+        b"{not json",
+        record(4).replace(b"national/bulk4", b"national/0"),
+        record(5),
+    ]
+
+    def body():
+        # Split records across chunks to exercise incremental parsing.
+        payload = b"\n".join(lines)
+        for start in range(0, len(payload), 7):
+            yield payload[start:start + 7]
+
+    response = client.post("/news/bulk", content=body(), headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    outcomes = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [(o["line"], o["status"]) for o in outcomes] == [
+        (1, "created"), (2, "invalid"), (3, "created"), (5, "duplicate"), (6, "invalid"), (7, "duplicate"), (8, "created"),
+    ]
+    assert outcomes[1]["error"] == "body: Field required"
+    assert outcomes[3]["id"] == outcomes[0]["id"]
+    assert outcomes[5]["id"] == 1
+    assert db_session.query(models.News).count() == 4
+    assert db_session.query(models.Image.url).filter_by(news_id=outcomes[6]["id"]).scalar() == "https://publisher0.com/images/bulk5.jpg"
+    assert client.get(f"/news/{outcomes[2]['id']}").json()["category"]["name"] == "Category 0"
+
+
+def test_bulk_ingest_reports_rows_that_lose_a_race_as_duplicates(client, db_session, monkeypatch):
+    seed_news(db_session, 1)
+    get_existing_links = crud.get_existing_links
+    checks = []
+
+    def stale_first_check(db, links, *args, **kwargs):
+        # The first check runs before a concurrent writer stored news 1's link.
+        checks.append(links)
+        return {} if len(checks) == 1 else get_existing_links(db, links, *args, **kwargs)
+
+    monkeypatch.setattr(crud, "get_existing_links", stale_first_check)
+    monkeypatch.setattr(config, "BULK_MAX_RECORD_BYTES", 1000)
+
+    def record(link, image):
+        return news_create(link, title=link, images=[image]).model_dump_json().encode()
+
+    lines = [
+        record("https://publisher0.com/national/0", "https://publisher0.com/images/lost.jpg"),
+        b'{"title": "' + b"x" * 2000 + b'"}',
+        record("https://publisher0.com/national/new", "https://publisher0.com/images/new.jpg"),
+    ]
+    response = client.post("/news/bulk", content=iter([b"\n".join(lines)[start:start + 300] for start in range(0, 3000, 300)]))
+
+    outcomes = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [(o["line"], o["status"], o.get("id")) for o in outcomes] == [
+        (1, "duplicate", 1), (2, "invalid", None), (3, "created", 2),
+    ]
+    assert db_session.query(models.Image.news_id, models.Image.url).all() == [(2, "https://publisher0.com/images/new.jpg")]
+
+
+def test_summary_is_reused_until_body_or_settings_change(client, db_session, engine, monkeypatch):
+    seed_news(db_session, 1)
+    checked_out = count_checkouts(engine)
+    calls = []
+
+    async def complete(messages, max_tokens=None):
+        # The request gave its connection back before calling the LLM.
+        assert checked_out[0] == 0
+        calls.append(messages[-1]["content"])
+        return utility.Completion(f"summary {len(calls)}", 10, 5)
+
+    monkeypatch.setattr(utility, "complete", complete)
+    hits_before = summary_stats.stats()["hits"]
+
+    def summarize(**options):
+        response = client.post("/summaries/", json={"news_id": 1, **options})
+        return response.headers["X-Summary-Cache"], response.json()["summary_text"]
+
+    assert summarize() == ("miss", "summary 1")
+    assert summarize() == ("hit", "summary 1")
+    assert summarize(force=True) == ("refresh", "summary 2")
+    assert summarize() == ("hit", "summary 2")
+
+    db_session.query(models.News).filter_by(id=1).update({"body": "Edited body"})
+    db_session.commit()
+    assert summarize() == ("miss", "summary 3")
+
+    monkeypatch.setattr(config, "SUMMARY_MODEL", "another-model")
+    assert summarize() == ("miss", "summary 4")
+
+    assert calls == ["Body 0", "Body 0", "Edited body", "Edited body"]
+    assert summary_stats.stats()["hits"] - hits_before == 2
+
+
+def test_summary_batch_reuses_generates_and_reports_per_id(client, db_session, engine, monkeypatch):
+    seed_news(db_session, 4)
+    checked_out = count_checkouts(engine)
+    in_flight, peak = 0, 0
+
+    async def complete(messages, max_tokens=None):
+        nonlocal in_flight, peak
+        assert checked_out[0] == 0
+        body = messages[-1]["content"]
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if body == "Body 2":
+            raise RuntimeError("rate limited")
+        return utility.Completion(f"summary of {body}", 10, 5)
+
+    monkeypatch.setattr(utility, "complete", complete)
+    monkeypatch.setattr(config, "SUMMARY_BATCH_CONCURRENCY", 2)
+    client.post("/summaries/", json={"news_id": 1})
+
+    response = client.post("/summaries/batch", json={"news_ids": [1, 2, 3, 99, 2], "concurrency": 5})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert [(item["news_id"], item["status"]) for item in result["items"]] == [
+        (1, "cached"), (2, "created"), (3, "failed"), (99, "not_found"),
+    ]
+    assert result["counts"] == {"cached": 1, "created": 1, "failed": 1, "not_found": 1}
+    assert result["items"][2]["error"] == "rate limited"
+    assert peak == 2
+    assert client.get(f"/summaries/{result['items'][1]['summary_id']}").json()["summary_text"] == "summary of Body 1"
+
+    since = client.post("/summaries/batch", json={"since": "2025-01-01T00:01:00"}).json()
+    assert [(item["news_id"], item["status"]) for item in since["items"]] == [(3, "failed"), (4, "created")]
+    assert client.post("/summaries/batch", json={}).status_code == 422
+
+
+def test_summary_batch_keeps_the_chunks_stored_before_a_failure(client, db_session, monkeypatch):
+    seed_news(db_session, 5)
+
+    async def complete(messages, max_tokens=None):
+        return utility.Completion(f"summary of {messages[-1]['content']}", 10, 5)
+
+    chunks = []
+    insert_summaries = crud.insert_summaries
+
+    def insert_until_the_database_goes_away(db, summaries):
+        if len(chunks) == 2:
+            raise RuntimeError("database went away")
+        chunks.append(len(summaries))
+        return insert_summaries(db, summaries)
+
+    monkeypatch.setattr(utility, "complete", complete)
+    monkeypatch.setattr(config, "SUMMARY_BATCH_INSERT_SIZE", 2)
+    monkeypatch.setattr(crud, "insert_summaries", insert_until_the_database_goes_away)
+
+    with pytest.raises(RuntimeError):
+        client.post("/summaries/batch", json={"news_ids": [1, 2, 3, 4, 5]})
+    assert chunks == [2, 2]
+    assert db_session.query(models.Summary).count() == 4
+
+
+def count_checkouts(engine):
+    """A list whose only item is the number of connections checked out of `engine`'s pool."""
+    checked_out = [0]
+    event.listen(engine, "checkout", lambda *args: checked_out.__setitem__(0, checked_out[0] + 1))
+    event.listen(engine, "checkin", lambda *args: checked_out.__setitem__(0, checked_out[0] - 1))
+    return checked_out
+
+
+def read_events(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), orjson.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_summary_stream_forwards_deltas_and_stores_the_text(client, db_session, engine, monkeypatch):
+    seed_news(db_session, 2)
+    checked_out = count_checkouts(engine)
+
+    async def stream_completion(messages, max_tokens=None):
+        assert checked_out[0] == 0
+        if messages[-1]["content"] == "Body 1":
+            yield "• এক"
+            raise RuntimeError("connection reset")
+        for text in ["• এক", "\n• দুই"]:
+            yield text
+
+    monkeypatch.setattr(utility, "stream_completion", stream_completion)
+
+    response = client.post("/summaries/stream", json={"news_id": 1})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = read_events(response)
+    assert events[:2] == [("delta", {"text": "• এক"}), ("delta", {"text": "\n• দুই"})]
+    assert events[2][0] == "done" and events[2][1]["cache"] == "miss"
+    assert client.get(f"/summaries/{events[2][1]['id']}").json()["summary_text"] == "• এক\n• দুই"
+
+    assert read_events(client.post("/summaries/stream", json={"news_id": 1})) == [
+        ("delta", {"text": "• এক\n• দুই"}), ("done", {"id": events[2][1]["id"], "news_id": 1, "cache": "hit"}),
+    ]
+    assert read_events(client.post("/summaries/stream", json={"news_id": 2}))[-1] == ("error", {"detail": "connection reset"})
+    assert db_session.query(models.Summary).count() == 1
+    assert client.post("/summaries/stream", json={"news_id": 99}).status_code == 404
+
+
+def test_long_article_is_summarized_chunk_by_chunk_and_merged(client, db_session, monkeypatch):
+    seed_news(db_session, 2)
+    sentences = [f"Sentence number {i} of the long article." for i in range(40)]
+    db_session.query(models.News).filter_by(id=2).update({"body": " ".join(sentences)})
+    db_session.commit()
+    monkeypatch.setattr(config, "SUMMARY_CHUNK_THRESHOLD", 200)
+    monkeypatch.setattr(config, "SUMMARY_CHUNK_TOKENS", 100)
+    calls = []
+
+    async def complete(messages, max_tokens=None):
+        calls.append((messages[0]["content"], messages[-1]["content"], max_tokens))
+        return utility.Completion(f"part {len(calls)}.", tokens.count_tokens(messages[-1]["content"]), 3)
+
+    monkeypatch.setattr(utility, "complete", complete)
+
+    short = client.post("/summaries/", json={"news_id": 1}).json()
+    assert (short["strategy"], short["llm_calls"], short["prompt_tokens"]) == ("single", 1, tokens.count_tokens("Body 0"))
+    assert calls[0][0] == utility.SUMMARY_PROMPT
+
+    calls.clear()
+    long = client.post("/summaries/", json={"news_id": 2}).json()
+    chunks = tokens.split_into_chunks(" ".join(sentences), 100)
+    assert len(chunks) > 2 and all(tokens.count_tokens(chunk) <= 100 for chunk in chunks)
+    assert sorted(call[1] for call in calls[:-1]) == sorted(chunks)
+    assert {call[0] for call in calls[:-1]} == {utility.CHUNK_PROMPT}
+    assert {call[2] for call in calls[:-1]} == {config.SUMMARY_CHUNK_MAX_TOKENS}
+    assert calls[-1][0] == utility.MERGE_PROMPT
+    assert calls[-1][1].count("part") == len(chunks)
+    assert long["summary_text"] == f"part {len(chunks) + 1}."
+    assert (long["strategy"], long["llm_calls"], long["completion_tokens"]) == ("chunked", len(chunks) + 1, 3 * (len(chunks) + 1))
+    assert long["prompt_tokens"] == sum(tokens.count_tokens(call[1]) for call in calls)
+    assert long["latency_ms"] >= 0
+    assert summary_stats.stats()["strategies"]["chunked"]["mean_llm_calls"] >= 3
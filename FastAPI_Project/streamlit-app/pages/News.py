@@ -1,5 +1,9 @@
 import streamlit as st
-from utils import get_news_list, get_news_by_id, scrape_news
+import time
+from utils import get_news_page, get_news_by_id, get_scrape_job, scrape_news
+
+# Seconds to wait for a scrape job before showing what it has stored so far.
+SCRAPE_JOB_TIMEOUT = 600
 
 st.title("News Page")
 
@@ -10,10 +14,11 @@ option = st.selectbox(
 
 if option == "All News":
     limit = 10
-    if 'skip' not in st.session_state:
-        st.session_state.skip = 0
+    # Cursors of the pages visited so far; None is the first page.
+    if 'cursors' not in st.session_state:
+        st.session_state.cursors = [None]
 
-    news_list = get_news_list(skip=st.session_state.skip, limit=limit)
+    news_list, next_cursor = get_news_page(cursor=st.session_state.cursors[-1], limit=limit)
     st.write(f"Displaying {len(news_list)} news articles")
 
     col1, col2 = st.columns(2)
@@ -32,13 +37,14 @@ if option == "All News":
     col1, col2, col3 = st.columns(3)
     with col1:
         if st.button("Previous"):
-            if st.session_state.skip >= limit:
-                st.session_state.skip -= limit
+            if len(st.session_state.cursors) > 1:
+                st.session_state.cursors.pop()
                 st.experimental_rerun()
     with col3:
         if st.button("Next"):
-            st.session_state.skip += limit
-            st.experimental_rerun()
+            if next_cursor:
+                st.session_state.cursors.append(next_cursor)
+                st.experimental_rerun()
 
 elif option == "News by ID":
     news_id = st.number_input("Enter News ID", min_value=1, step=1)
@@ -60,18 +66,42 @@ elif option == "Scrape News":
     urls = st.text_area("Enter URLs (comma-separated)")
     if st.button("Scrape"):
         url_list = [url.strip() for url in urls.split(",")]
-        scraped_news = scrape_news(url_list)
-        st.success("News scraping initiated")
+        job = scrape_news(url_list)
+        if job is None:
+            st.error("Could not start scraping")
+        else:
+            st.success(f"News scraping initiated (job {job['id']})")
+            progress = st.progress(0.0)
+            deadline = time.monotonic() + SCRAPE_JOB_TIMEOUT
+            while job["status"] not in ("done", "failed") and time.monotonic() < deadline:
+                time.sleep(1)
+                job = get_scrape_job(job["id"]) or job
+                finished = [item for item in job["items"] if item["status"] in ("stored", "duplicate", "failed", "skipped")]
+                progress.progress(len(finished) / max(len(job["items"]), 1))
+            if job["status"] == "failed":
+                st.error(f"Scrape job {job['id']} failed: {job.get('error')}")
+            elif job["status"] != "done":
+                st.warning(f"Scrape job {job['id']} is still {job['status']}; showing what is stored so far")
+            else:
+                progress.progress(1.0)
+
+            skipped = [item["url"] for item in job["items"] if item["status"] == "skipped"]
+            if skipped:
+                st.info(f"Already stored, not scraped again: {', '.join(skipped)}")
+            for item in job["items"]:
+                if item["status"] == "failed":
+                    st.warning(f"{item['url']}: {item['error']}")
+            scraped_news = [get_news_by_id(item["news_id"]) for item in job["items"] if item["news_id"]]
 
-        col1, col2 = st.columns(2)
-        half = len(scraped_news) // 2
+            col1, col2 = st.columns(2)
+            half = len(scraped_news) // 2
 
-        for i, news in enumerate(scraped_news):
-            with (col1 if i < half else col2):
-                with st.expander(news['title']):
-                    st.markdown(f"**Body:** {news['body']}")
-                    st.code(news['link'], language='text')
-                    st.markdown(f"**Date:** {news['datetime']}")
-                    st.caption(f"**Category:** {news['category']['name']} - {news['category']['description']}")
-                    st.caption(f"**Reporter:** {news['reporter']['name']} ({news['reporter']['email']})")
-                    st.caption(f"**Publisher:** {news['publisher']['name']} ({news['publisher']['email']})")
+            for i, news in enumerate(scraped_news):
+                with (col1 if i < half else col2):
+                    with st.expander(news['title']):
+                        st.markdown(f"**Body:** {news['body']}")
+                        st.code(news['link'], language='text')
+                        st.markdown(f"**Date:** {news['datetime']}")
+                        st.caption(f"**Category:** {news['category']['name']} - {news['category']['description']}")
+                        st.caption(f"**Reporter:** {news['reporter']['name']} ({news['reporter']['email']})")
+                        st.caption(f"**Publisher:** {news['publisher']['name']} ({news['publisher']['email']})")
@@ -1,16 +1,18 @@
 import streamlit as st
 import requests
-from utils import get_news_list, get_summary
+from utils import get_news_list, get_news_by_id, stream_summary
 
 # def app():
 st.title("Summary Page")
 
-news_list = get_news_list()
+# Titles only for the dropdown; the full article is fetched once selected.
+news_list = get_news_list(view="compact")
 news_titles = {news['title']: news for news in news_list}
 selected_title = st.selectbox("Select News Title", list(news_titles.keys()))
 
-if selected_title:
-    news = news_titles[selected_title]
+news = get_news_by_id(news_titles[selected_title]['id']) if selected_title else None
+
+if news:
     st.write(news['id'])
     st.write(news['title'])
     st.write(news['body'])
@@ -20,7 +22,14 @@ if selected_title:
     st.write(f"Reporter: {news['reporter']}")
     st.write(f"Publisher: {news['publisher']}")
 
+    force = st.checkbox("Regenerate", help="Ask the model again even if this article was summarized before.")
     if st.button("Generate Summary", type='primary'):
-        summary = get_summary(news['id'])
         st.write("Summary:")
-        st.write(summary['summary_text'])
+        # Rendered as the model writes it instead of after the last token.
+        result = {}
+        st.write_stream(stream_summary(news['id'], force=force, result=result))
+        if "done" in result:
+            if result['done']['cache'] == "hit":
+                st.caption("Stored summary of this article; tick Regenerate for a new one.")
+        else:
+            st.error(f"Failed to generate the summary: {result.get('error', {}).get('detail', 'no response')}")
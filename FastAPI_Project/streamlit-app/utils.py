@@ -1,41 +1,128 @@
+import json
 import requests
 
 API_BASE_URL = "http://localhost:8011"
 
-def get_news_list(skip=0, limit=10):
-    response = requests.get(f"{API_BASE_URL}/news/?skip={skip}&limit={limit}")
-    if response.status_code == 200:
-        return response.json()
+# Last body and validators per GET URL. Streamlit reruns the page scripts but
+# keeps imported modules, so these survive across reruns.
+_validated = {}
+_VALIDATED_MAX = 256
+
+def conditional_get(url, params=None):
+    """
+    GET that sends the ETag / Last-Modified of the previous response for the
+    same URL, reusing the stored body on 304. Returns (status_code, json, headers).
+    """
+    url = requests.Request("GET", url, params=params).prepare().url
+    cached = _validated.get(url)
+    response = requests.get(url, headers=cached["validators"] if cached else {})
+    if response.status_code == 304 and cached:
+        return 200, cached["data"], cached["headers"]
+    if response.status_code != 200:
+        return response.status_code, None, response.headers
+
+    data = response.json()
+    validators = {}
+    if "ETag" in response.headers:
+        validators["If-None-Match"] = response.headers["ETag"]
+    if "Last-Modified" in response.headers:
+        validators["If-Modified-Since"] = response.headers["Last-Modified"]
+    if validators:
+        _validated.pop(url, None)
+        _validated[url] = {"validators": validators, "data": data, "headers": response.headers}
+        if len(_validated) > _VALIDATED_MAX:
+            del _validated[next(iter(_validated))]
+    return 200, data, response.headers
+
+def get_news_list(skip=0, limit=10, view="full"):
+    status_code, data, _ = conditional_get(
+        f"{API_BASE_URL}/news/", params={"skip": skip, "limit": limit, "view": view}
+    )
+    if status_code == 200:
+        return data
     else:
         return []
 
+def get_news_page(cursor=None, limit=10):
+    params = {"limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+    status_code, data, headers = conditional_get(f"{API_BASE_URL}/news/", params=params)
+    if status_code == 200:
+        return data, headers.get("X-Next-Cursor")
+    else:
+        return [], None
+
 def get_news_by_id(news_id):
-    response = requests.get(f"{API_BASE_URL}/news/{news_id}")
-    if response.status_code == 200:
-        return response.json()
+    status_code, data, _ = conditional_get(f"{API_BASE_URL}/news/{news_id}")
+    if status_code == 200:
+        return data
     else:
         return None
 
 def scrape_news(urls):
+    """Queue a scrape job; returns the job (id, status, items) or None."""
     response = requests.post(f"{API_BASE_URL}/news/scrape/", json=urls)
+    if response.status_code == 202:
+        return response.json()
+    else:
+        return None
+
+def get_scrape_job(job_id):
+    response = requests.get(f"{API_BASE_URL}/news/scrape/jobs/{job_id}")
     if response.status_code == 200:
         return response.json()
     else:
-        return []
+        return None
 
-def get_summary(news_id):
+def get_summary(news_id, force=False):
+    """
+    Summary of a news article. The API reuses the stored summary unless the
+    article changed or `force` asks for a new one; the "cache" key of the
+    result says which ("hit", "miss" or "refresh").
+    """
     summary_data = {
-        "news_id": news_id
+        "news_id": news_id,
+        "force": force
     }
     response = requests.post(f"{API_BASE_URL}/summaries/", json=summary_data)
     if response.status_code == 200:
-        return response.json()
+        summary = response.json()
+        summary["cache"] = response.headers.get("X-Summary-Cache")
+        return summary
     else:
         return None
 
+def stream_summary(news_id, force=False, result=None):
+    """
+    Yield the summary text of a news article as the API streams it (Server-
+    Sent Events from POST /summaries/stream), for st.write_stream. The final
+    event (stored summary id and cache status, or the error) is put in the
+    `result` dict if one is passed.
+    """
+    summary_data = {
+        "news_id": news_id,
+        "force": force
+    }
+    with requests.post(f"{API_BASE_URL}/summaries/stream", json=summary_data, stream=True) as response:
+        if response.status_code != 200:
+            if result is not None:
+                result["error"] = {"detail": f"Status code {response.status_code}"}
+            return
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+                if event == "delta":
+                    yield data["text"]
+                elif result is not None:
+                    result[event] = data
+
 def get_summary_by_id(summary_id):
-    response = requests.get(f"{API_BASE_URL}/summaries/{summary_id}")
-    if response.status_code == 200:
-        return response.json()
+    status_code, data, _ = conditional_get(f"{API_BASE_URL}/summaries/{summary_id}")
+    if status_code == 200:
+        return data
     else:
         return None